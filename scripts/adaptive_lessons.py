@@ -0,0 +1,215 @@
+import argparse
+import glob
+import json
+import os
+
+try:
+    from syllable_inventory import SYLLABLES, SYMBOL_KEYS, WEIGHTS
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(__file__))
+    from syllable_inventory import SYLLABLES, SYMBOL_KEYS, WEIGHTS
+
+# Learner model for adaptive lessons. Ingests session logs exported from the
+# app ("Export Sessions", src/utils/SessionLog.ts) and keeps per-key and
+# per-syllable error and latency statistics that decay with a half-life, so
+# old mistakes fade. generate_lessons.py --model turns it into lesson weights.
+#
+# Every statistic is decayed lazily, only when it is touched: ingesting a
+# session costs O(keystrokes in the session), whatever the history length.
+# Session ids are remembered, so re-ingesting an export is a no-op.
+#
+# Session log: {"id", "started" (epoch ms), "syllables": [...],
+#               "keystrokes": [[syllableIndex, charIndex, key, ok, ms], ...]}
+# with ms counted from the session start.
+
+MODEL_FILE = os.path.join(os.path.dirname(__file__), '.adaptive_model.json')
+MODEL_VERSION = 1
+
+HALF_LIFE_DAYS = 7.0
+DAY_MS = 86400000
+PRIOR_STRENGTH = 3.0 # pseudo-attempts at the overall error rate
+MAX_GAP_MS = 5000 # longer pauses aren't typing latency
+LATENCY_WEIGHT = 0.5 # how much slowness counts next to errors
+MAX_BOOST = 4.0 # a weak syllable is drawn at most this much more often
+
+# stat = [attempts, errors, latency_sum_ms, latency_n, updated_ms]
+ATTEMPTS, ERRORS, LATENCY_SUM, LATENCY_N, UPDATED = range(5)
+
+def new_stat(t):
+    return [0.0, 0.0, 0.0, 0.0, t]
+
+class AdaptiveModel:
+    def __init__(self, half_life_days=HALF_LIFE_DAYS):
+        self.half_life_ms = half_life_days * DAY_MS
+        self.keys = {}
+        self.syllables = {}
+        self.overall = new_stat(0)
+        self.sessions = set()
+
+    @classmethod
+    def load(cls, path=MODEL_FILE):
+        model = cls()
+        if not os.path.exists(path):
+            return model
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') != MODEL_VERSION:
+            print(f"Ignoring {path}: model version {data.get('version')} != {MODEL_VERSION}")
+            return model
+        model.half_life_ms = data['half_life_days'] * DAY_MS
+        model.keys = data['keys']
+        model.syllables = data['syllables']
+        model.overall = data['overall']
+        model.sessions = set(data['sessions'])
+        return model
+
+    def save(self, path=MODEL_FILE):
+        data = {
+            'version': MODEL_VERSION,
+            'half_life_days': self.half_life_ms / DAY_MS,
+            'overall': self.overall,
+            'keys': self.keys,
+            'syllables': self.syllables,
+            'sessions': sorted(self.sessions),
+        }
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp, path)
+
+    def decay(self, dt_ms):
+        return 0.5 ** (dt_ms / self.half_life_ms)
+
+    def _add(self, stat, t, attempts=0.0, errors=0.0, latency=None):
+        # Bring the stat forward to t, or (for a session older than the stat)
+        # discount the new observation instead, so ingest order doesn't matter
+        scale = 1.0
+        if t > stat[UPDATED]:
+            d = self.decay(t - stat[UPDATED])
+            for i in (ATTEMPTS, ERRORS, LATENCY_SUM, LATENCY_N):
+                stat[i] *= d
+            stat[UPDATED] = t
+        else:
+            scale = self.decay(stat[UPDATED] - t)
+        stat[ATTEMPTS] += attempts * scale
+        stat[ERRORS] += errors * scale
+        if latency is not None:
+            stat[LATENCY_SUM] += latency * scale
+            stat[LATENCY_N] += scale
+
+    def ingest(self, session):
+        """Add one session log; returns False if it was already ingested."""
+        session_id = str(session['id'])
+        if session_id in self.sessions:
+            return False
+        self.sessions.add(session_id)
+
+        t = session['started']
+        syllables = session['syllables']
+        positions = {} # (syllable, char) -> [errored, latency]
+        prev_ms = None
+        for s, c, _key, ok, ms in session['keystrokes']:
+            position = positions.setdefault((s, c), [False, None])
+            if not ok:
+                position[0] = True
+            elif prev_ms is not None and ms - prev_ms <= MAX_GAP_MS:
+                position[1] = ms - prev_ms
+            prev_ms = ms
+
+        per_syllable = {}
+        for (s, c), (errored, latency) in positions.items():
+            if s >= len(syllables) or c >= len(syllables[s]):
+                continue
+            char = syllables[s][c]
+            self._add(self.keys.setdefault(char, new_stat(t)), t, 1, errored, latency)
+            self._add(self.overall, t, 1, errored, latency)
+            totals = per_syllable.setdefault(s, [False, 0.0, 0])
+            totals[0] |= errored
+            if latency is not None:
+                totals[1] += latency
+                totals[2] += 1
+
+        for s, (errored, latency_sum, latency_n) in per_syllable.items():
+            latency = latency_sum / latency_n if latency_n else None # per key
+            self._add(self.syllables.setdefault(syllables[s], new_stat(t)), t, 1, errored, latency)
+        return True
+
+    def _ratios(self, stat, now):
+        """(error ratio, latency ratio) against the overall rates, smoothed by the prior."""
+        d = self.decay(max(0, now - stat[UPDATED]))
+        overall_d = self.decay(max(0, now - self.overall[UPDATED]))
+        overall_rate = (self.overall[ERRORS] * overall_d + 1) / (self.overall[ATTEMPTS] * overall_d + 2)
+        rate = (stat[ERRORS] * d + PRIOR_STRENGTH * overall_rate) / (stat[ATTEMPTS] * d + PRIOR_STRENGTH)
+
+        latency_ratio = 1.0
+        if stat[LATENCY_N] and self.overall[LATENCY_N]:
+            mean = self.overall[LATENCY_SUM] / self.overall[LATENCY_N]
+            n = stat[LATENCY_N] * d
+            # Decay cancels in the mean; shrink towards 1 while there is little data
+            latency_ratio = (stat[LATENCY_SUM] / stat[LATENCY_N] / mean * n + PRIOR_STRENGTH) / (n + PRIOR_STRENGTH)
+        return rate / overall_rate, latency_ratio
+
+    def weakness(self, stat, now):
+        error_ratio, latency_ratio = self._ratios(stat, now)
+        return error_ratio * latency_ratio ** LATENCY_WEIGHT
+
+    def now(self):
+        return self.overall[UPDATED]
+
+    def syllable_weights(self, base=WEIGHTS, now=None):
+        """Integer lesson weights: `base` scaled up for syllables with weak keys."""
+        now = self.now() if now is None else now
+        key_weakness = {char: self.weakness(stat, now) for char, stat in self.keys.items()}
+        weights = []
+        for syllable, weight in zip(SYLLABLES, base):
+            score = sum(key_weakness.get(c, 1.0) for c in syllable) / len(syllable)
+            if syllable in self.syllables:
+                score *= self.weakness(self.syllables[syllable], now)
+            weights.append(round(weight * min(MAX_BOOST, max(1.0, score))))
+        return weights
+
+    def weakest_keys(self, n=10, now=None):
+        now = self.now() if now is None else now
+        ranked = sorted(self.keys, key=lambda char: -self.weakness(self.keys[char], now))
+        return [(char, self.weakness(self.keys[char], now), self.keys[char]) for char in ranked[:n]]
+
+def read_sessions(paths):
+    """Session logs from files holding one session or a list of them."""
+    for pattern in paths:
+        for path in sorted(glob.glob(pattern)) or [pattern]:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            yield from (data if isinstance(data, list) else [data])
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Update the adaptive lesson model from exported session logs.")
+    parser.add_argument('sessions', nargs='*', help="Session log JSON files (exports from the app)")
+    parser.add_argument('--model', default=MODEL_FILE)
+    parser.add_argument('--half-life', type=float, default=None,
+                        help=f"Days for old sessions to count half (new models default to {HALF_LIFE_DAYS})")
+    parser.add_argument('--top', type=int, default=10, help="Weakest keys to list")
+    args = parser.parse_args(argv)
+
+    model = AdaptiveModel.load(args.model)
+    if args.half_life:
+        model.half_life_ms = args.half_life * DAY_MS
+
+    added = skipped = 0
+    for session in read_sessions(args.sessions):
+        if model.ingest(session):
+            added += 1
+        else:
+            skipped += 1
+    model.save(args.model)
+    print(f"Ingested {added} sessions ({skipped} already seen); model has {len(model.sessions)} sessions -> {args.model}")
+
+    if model.keys:
+        print("\nWeakest keys (weakness = error/latency vs. your average):")
+        for char, weakness, stat in model.weakest_keys(args.top):
+            mean = stat[LATENCY_SUM] / stat[LATENCY_N] if stat[LATENCY_N] else 0
+            print(f"  {char} [{SYMBOL_KEYS.get(char, '?')}]  weakness {weakness:.2f}  "
+                  f"errors {stat[ERRORS]:.1f}/{stat[ATTEMPTS]:.1f}  {mean:.0f} ms")
+
+if __name__ == "__main__":
+    main()
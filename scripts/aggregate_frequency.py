@@ -0,0 +1,353 @@
+import argparse
+import collections
+import gzip
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+try:
+    from audio_jobs import add_jobs_argument
+    from process_frequency import MAX_RANK, OUTPUT_FILE, read_ranked_chars
+    from zhuyin_readings import CACHE_FILE, LEARNED_FILE, ReadingCache, load_phrases, read_phrases, strip_tones
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(__file__))
+    from audio_jobs import add_jobs_argument
+    from process_frequency import MAX_RANK, OUTPUT_FILE, read_ranked_chars
+    from zhuyin_readings import CACHE_FILE, LEARNED_FILE, ReadingCache, load_phrases, read_phrases, strip_tones
+
+# Streaming syllable frequency builder for large inputs (raw text corpora,
+# usage logs, count-bearing TSVs), as opposed to process_frequency.py's
+# 5000-line ranked list. Inputs are split into byte-range shards, counted
+# line by line in a process pool (memory per worker is bounded by the number
+# of distinct characters, not the input size) and the partial counters merged.
+#
+# Input formats (--format, or detected per file):
+#   text    any UTF-8 text; every CJK character counts once
+#   counts  TSV of "token<TAB>count" (token = character or word)
+#   ranked  rank-ordered list like frequency.tsv, weighted like process_frequency
+#
+# Polyphones are read in context: each occurrence in text (or multi-character
+# token in a count TSV) is taken with up to CONTEXT_CHARS neighbours on each
+# side and segmented into Moedict words, whose reading decides. Distinct
+# windows are read once, in batches. An occurrence no Moedict word covers is
+# not learned from; it counts as a polyphone without context. The
+# per-reading counts are stored in polyphone_readings.json and used to split
+# the weight of polyphones that come without context (ranked lists,
+# single-character tokens, unmatched windows), here and in
+# process_frequency.py.
+
+CJK_FIRST, CJK_LAST = 0x4E00, 0x9FFF
+SHARD_BYTES = 64 << 20
+LINE_LIMIT = 1 << 20 # a "line" longer than this is read in pieces
+MAX_PAIRS = 500000 # flush character pairs to syllable bigrams past this
+MAX_CONTEXTS = 200000 # convert polyphone context windows past this
+CONTEXT_CHARS = 3
+SNIFF_LINES = 50
+
+FORMATS = ['text', 'counts', 'ranked']
+INT_RE = re.compile(r'^\d+$')
+
+_readings = {}
+_polyphones = frozenset()
+_polyphone_re = None
+_phrases = {}
+
+def reading_tables(cache):
+    """({char: toned reading}, polyphones) for every CJK character pypinyin can read."""
+    chars = [chr(c) for c in range(CJK_FIRST, CJK_LAST + 1)]
+    readings = {c: r for c, r in cache.lookup(chars).items() if r and r != c}
+    polyphones = cache.polyphones(readings)
+    cache.save()
+    return readings, polyphones
+
+def _open(path):
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rb')
+    return open(path, 'rb')
+
+def iter_lines(path, start=0, end=None):
+    """Decoded lines whose first byte lies in [start, end)."""
+    with _open(path) as f:
+        if start:
+            # Land on the first line that starts at or after `start`
+            f.seek(start - 1)
+            f.readline()
+        pos = f.tell()
+        while end is None or pos < end:
+            line = f.readline(LINE_LIMIT)
+            if not line:
+                break
+            pos += len(line)
+            yield line.decode('utf-8', 'ignore').rstrip('\r\n')
+
+def count_column(row):
+    for col in row[1:]:
+        if INT_RE.match(col):
+            return int(col)
+    return None
+
+def detect_format(path):
+    """text unless it's a TSV; TSVs with a rising integer column are ranked lists."""
+    name = path[:-3] if path.endswith('.gz') else path
+    if not name.endswith('.tsv'):
+        return 'text'
+    numbers = []
+    for i, line in enumerate(iter_lines(path)):
+        if i >= SNIFF_LINES:
+            break
+        n = count_column(line.split('\t'))
+        if n is not None:
+            numbers.append(n)
+    # A rank column goes 1, 2, 3...; counts fall (or are unsorted)
+    if len(numbers) > 1 and all(a < b for a, b in zip(numbers, numbers[1:])):
+        return 'ranked'
+    return 'counts'
+
+def make_shards(path, fmt):
+    if fmt == 'ranked' or path.endswith('.gz'):
+        return [(path, fmt, 0, None)]
+    size = os.path.getsize(path)
+    return [(path, fmt, start, min(start + SHARD_BYTES, size)) for start in range(0, max(size, 1), SHARD_BYTES)]
+
+def _flush_pairs(pairs, bigrams):
+    # Pairs touching a polyphone are counted from its context window instead
+    for (a, b), n in pairs.items():
+        ra = _readings.get(a)
+        rb = _readings.get(b)
+        if ra and rb and a not in _polyphones and b not in _polyphones:
+            bigrams[(strip_tones(ra), strip_tones(rb))] += n
+    pairs.clear()
+
+def _context_readings(text):
+    """Readings of a window: from Moedict words, else the only reading a non-polyphone has."""
+    return [reading or (None if char in _polyphones else _readings[char])
+            for char, reading in zip(text, read_phrases(text, _phrases))]
+
+def _flush_contexts(contexts, reading_counts, unread, bigrams):
+    """Read every distinct window in context and count its polyphone readings.
+
+    A key is (text, center): center is the polyphone's offset, or -1 for a
+    whole token whose every character (and internal pair) is counted.
+    Polyphones no Moedict word covers go to unread, as if seen alone.
+    """
+    resolved = {text: _context_readings(text) for text in dict.fromkeys(text for text, _ in contexts)}
+
+    def pair(a, b, n):
+        if a and b:
+            bigrams[(strip_tones(a), strip_tones(b))] += n
+
+    for (text, center), n in contexts.items():
+        readings = resolved[text]
+        if center < 0:
+            for char, reading in zip(text, readings):
+                if reading:
+                    reading_counts[(char, reading)] += n
+                else:
+                    unread[char] += n
+            for a, b in zip(readings, readings[1:]):
+                pair(a, b, n)
+            continue
+
+        if not readings[center]:
+            unread[text[center]] += n
+            continue
+        reading_counts[(text[center], readings[center])] += n
+        # Each pair is counted once: by its left polyphone, else its right one
+        if center + 1 < len(text):
+            pair(readings[center], readings[center + 1], n)
+        if center > 0 and text[center - 1] not in _polyphones:
+            pair(readings[center - 1], readings[center], n)
+    contexts.clear()
+
+def context_window(line, i):
+    """(window, center) around line[i]: up to CONTEXT_CHARS readable chars each side."""
+    left = i
+    while left > 0 and i - left < CONTEXT_CHARS and line[left - 1] in _readings:
+        left -= 1
+    right = i + 1
+    while right < len(line) and right - i <= CONTEXT_CHARS and line[right] in _readings:
+        right += 1
+    return line[left:right], i - left
+
+def _init_worker(readings, polyphones, phrases):
+    global _readings, _polyphones, _polyphone_re, _phrases
+    _readings = readings
+    _polyphones = frozenset(polyphones)
+    _phrases = phrases
+    _polyphone_re = re.compile('[' + ''.join(sorted(_polyphones)) + ']') if _polyphones else None
+
+def count_shard(shard, with_bigrams=False):
+    """Count one shard of a text/counts file.
+
+    Returns (char weights, {(polyphone, reading): count}, syllable bigrams,
+    lines). Polyphones read in context land in the second counter; the
+    first only keeps polyphones that had no context (single-char tokens,
+    windows no Moedict word covers).
+    """
+    path, fmt, start, end = shard
+    chars = collections.Counter()
+    pairs = collections.Counter()
+    contexts = collections.Counter()
+    reading_counts = collections.Counter()
+    unread = collections.Counter()
+    bigrams = collections.Counter()
+    lines = 0
+
+    for line in iter_lines(path, start, end):
+        lines += 1
+        if fmt == 'text':
+            chars.update(line)
+            if with_bigrams:
+                pairs.update(zip(line, line[1:]))
+            if _polyphone_re:
+                for match in _polyphone_re.finditer(line):
+                    contexts[context_window(line, match.start())] += 1
+        else:
+            row = line.split('\t')
+            count = count_column(row)
+            if count is None:
+                continue # header or malformed
+            token = row[0]
+            if (len(token) > 1 and any(c in _polyphones for c in token)
+                    and all(c in _readings for c in token)):
+                contexts[(token, -1)] += count
+                continue
+            for char in token:
+                chars[char] += count
+            if with_bigrams:
+                for pair in zip(token, token[1:]):
+                    pairs[pair] += count
+        if len(pairs) > MAX_PAIRS:
+            _flush_pairs(pairs, bigrams)
+        if len(contexts) > MAX_CONTEXTS:
+            _flush_contexts(contexts, reading_counts, unread, bigrams)
+    _flush_pairs(pairs, bigrams)
+    _flush_contexts(contexts, reading_counts, unread, bigrams)
+
+    # Only characters with a reading matter; in text every polyphone
+    # occurrence was already counted in context
+    drop = _polyphones if fmt == 'text' else ()
+    chars = collections.Counter({c: n for c, n in chars.items() if c in _readings and c not in drop})
+    chars.update(unread)
+    if not with_bigrams:
+        bigrams.clear()
+    return chars, reading_counts, bigrams, lines
+
+def _count_item(item):
+    shard, with_bigrams = item
+    return count_shard(shard, with_bigrams)
+
+def ranked_weights(path, max_rank):
+    chars = read_ranked_chars(path, max_rank)
+    return collections.Counter({char: max_rank - rank + 1 for rank, char in enumerate(chars, 1)})
+
+def aggregate(inputs, fmt=None, jobs=1, with_bigrams=False, max_rank=MAX_RANK, cache_file=CACHE_FILE, learned_file=LEARNED_FILE):
+    """Return (toneless, toned, bigram weights, lines read) over all inputs."""
+    cache = ReadingCache(cache_file, learned_file)
+    readings, polyphones = reading_tables(cache)
+    phrases = load_phrases(cache.mapping_file)
+    _init_worker(readings, polyphones, phrases)
+
+    chars = collections.Counter()
+    reading_counts = collections.Counter()
+    bigrams = collections.Counter()
+    lines = 0
+    shards = []
+    for path in inputs:
+        path_fmt = fmt or detect_format(path)
+        print(f"  {path}: {path_fmt}")
+        if path_fmt == 'ranked':
+            chars.update(ranked_weights(path, max_rank))
+        else:
+            shards.extend(make_shards(path, path_fmt))
+
+    def merge(partial):
+        nonlocal lines
+        partial_chars, partial_readings, partial_bigrams, partial_lines = partial
+        chars.update(partial_chars)
+        reading_counts.update(partial_readings)
+        bigrams.update(partial_bigrams)
+        lines += partial_lines
+
+    items = [(shard, with_bigrams) for shard in shards]
+    if jobs <= 1 or len(items) <= 1:
+        for item in items:
+            merge(_count_item(item))
+    else:
+        print(f"  Counting {len(items)} shards on {jobs} workers...")
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(readings, polyphones, phrases)) as pool:
+            for future in as_completed([pool.submit(_count_item, item) for item in items]):
+                merge(future.result())
+
+    # Polyphones read in context teach the split for those without context
+    cache.learn({key: n for key, n in reading_counts.items() if key[0] in polyphones})
+    shares = cache.distributions([c for c in chars if c in polyphones])
+    cache.save()
+
+    toneless, toned = syllable_tables(chars, reading_counts, shares)
+    return toneless, toned, bigrams, lines
+
+def syllable_tables(chars, reading_counts, shares):
+    """(toneless, toned) syllable weights from character and reading weights."""
+    toneless = collections.Counter()
+    toned = collections.Counter()
+
+    def add(reading, n):
+        toneless[strip_tones(reading)] += n
+        toned[reading] += n
+
+    for char, n in chars.items():
+        for reading, share in shares.get(char, {_readings[char]: 1.0}).items():
+            add(reading, n * share)
+    for (_, reading), n in reading_counts.items():
+        add(reading, n)
+    return toneless, toned
+
+def write_table(path, rows):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(rows, f, ensure_ascii=False, indent=2)
+
+def ranked_rows(counter):
+    # Weight desc, then name, so shard order never changes the output
+    rows = [[key, round(n)] for key, n in counter.items() if round(n) > 0]
+    return sorted(rows, key=lambda x: (-x[1], x[0]))
+
+def main():
+    parser = argparse.ArgumentParser(description="Aggregate syllable frequencies from large text/TSV inputs.")
+    parser.add_argument('inputs', nargs='+', help="Text, count TSV or ranked TSV files (.gz ok)")
+    parser.add_argument('--format', choices=FORMATS, help="Input format for all files (default: detect per file)")
+    parser.add_argument('-o', '--output', default=OUTPUT_FILE)
+    parser.add_argument('--tones', help="Also write tone-aware syllable weights to this file")
+    parser.add_argument('--bigrams', help="Also write syllable bigram weights to this file")
+    parser.add_argument('--top-bigrams', type=int, default=5000, help="Bigrams to keep (0 = all)")
+    parser.add_argument('--max-rank', type=int, default=MAX_RANK, help="Rank cutoff for ranked lists")
+    parser.add_argument('--reading-cache', default=CACHE_FILE)
+    parser.add_argument('--learned-readings', default=LEARNED_FILE, help="Where the polyphones' per-reading counts are stored (commit it)")
+    add_jobs_argument(parser)
+    args = parser.parse_args()
+
+    start = time.time()
+    print(f"Aggregating {len(args.inputs)} inputs...")
+    toneless, toned, bigrams, lines = aggregate(args.inputs, args.format, args.jobs, bool(args.bigrams), args.max_rank, args.reading_cache, args.learned_readings)
+
+    write_table(args.output, ranked_rows(toneless))
+    print(f"Generated {len(toneless)} distinct syllables with weights to {args.output}")
+    if args.tones:
+        write_table(args.tones, ranked_rows(toned))
+        print(f"Wrote {len(toned)} toned syllables to {args.tones}")
+    if args.bigrams:
+        rows = [[a, b, n] for (a, b), n in ranked_rows(bigrams)]
+        if args.top_bigrams:
+            rows = rows[:args.top_bigrams]
+        write_table(args.bigrams, rows)
+        print(f"Wrote {len(rows)} of {len(bigrams)} syllable bigrams to {args.bigrams}")
+
+    print(f"Read {lines} lines, total weight {round(sum(toneless.values()))} in {time.time() - start:.1f}s")
+    print(f"Top 5: {ranked_rows(toneless)[:5]}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+import random
+
+# Walker/Vose alias method: O(n) setup, then every weighted draw is one
+# random number, one table lookup and one comparison, with no search.
+#
+# The table is built in integer arithmetic from integer weights, so it is
+# exact and identical on every machine. Cell i holds `threshold[i]` out of
+# `total` for itself and the rest for `alias[i]`; the app samples the same
+# serialized table (src/data/syllable_inventory.json).
+
+def build_alias_table(weights):
+    """(threshold, alias, total) for non-negative integer weights."""
+    n = len(weights)
+    total = sum(weights)
+    if not n or total <= 0:
+        raise ValueError("Alias table needs at least one positive weight")
+
+    # Each cell holds total/n probability mass, so compare w*n against total
+    scaled = [w * n for w in weights]
+    small = [i for i, w in enumerate(scaled) if w < total]
+    large = [i for i, w in enumerate(scaled) if w >= total]
+    threshold = [total] * n
+    alias = list(range(n))
+
+    while small and large:
+        s = small.pop()
+        l = large[-1]
+        threshold[s] = scaled[s]
+        alias[s] = l
+        scaled[l] -= total - scaled[s]
+        if scaled[l] < total:
+            small.append(large.pop())
+    # Integer arithmetic leaves no rounding residue: whatever remains is full
+    return threshold, alias, total
+
+class AliasSampler:
+    def __init__(self, items, weights):
+        self.items = list(items)
+        self.threshold, self.alias, self.total = build_alias_table(list(weights))
+        # Thresholds as fractions of a cell, for the one-random-number draw
+        self.cutoff = [t / self.total for t in self.threshold]
+
+    def sample(self, k, rng=random):
+        n = len(self.items)
+        items, cutoff, alias = self.items, self.cutoff, self.alias
+        rand = rng.random
+        result = []
+        for _ in range(k):
+            u = rand() * n
+            i = int(u)
+            result.append(items[i] if u - i < cutoff[i] else items[alias[i]])
+        return result
@@ -1,106 +1,53 @@
 import os
-import subprocess
-import wave
-import struct
-import math
 import sys
 
+try:
+    from audio_analysis import analyze_pcm, gap_trim_time
+    from audio_io import ANALYSIS_RATE, decode_pcm
+except ImportError:
+    sys.path.append(os.path.dirname(__file__))
+    from audio_analysis import analyze_pcm, gap_trim_time
+    from audio_io import ANALYSIS_RATE, decode_pcm
+
 def analyze_audio(ogg_path):
     print(f"Analyzing {ogg_path}")
-    temp_wav = "temp_analyze.wav"
     
-    # Convert to WAV
-    cmd = ["ffmpeg", "-y", "-i", ogg_path, "-ac", "1", "-ar", "16000", temp_wav]
-    subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    # Decode to 16k mono PCM straight from ffmpeg's stdout
+    frames = decode_pcm(ogg_path)
     
-    if not os.path.exists(temp_wav):
-        print("Failed to convert to WAV")
+    if frames is None:
+        print("Failed to decode audio")
         return
 
-    wav = wave.open(temp_wav, 'r')
-    frames = wav.readframes(wav.getnframes())
-    framerate = wav.getframerate()
-    sampwidth = wav.getsampwidth()
-    wav.close()
-    
     # Process audio
     # 16-bit audio, 16000Hz
     # Expect 2 bytes per sample
     
-    samples = struct.unpack_from(f"{len(frames)//2}h", frames)
-    
-    chunk_ms = 50
-    chunk_size = int(framerate * chunk_ms / 1000)
-    
-    max_amp = 0
-    rms_values = []
-    
-    for i in range(0, len(samples), chunk_size):
-        chunk = samples[i:i+chunk_size]
-        if not chunk: break
-        
-        # Calculate RMS
-        sum_sq = sum(s*s for s in chunk)
-        rms = math.sqrt(sum_sq / len(chunk))
-        rms_values.append(rms)
-        max_amp = max(max_amp, rms)
+    analysis = analyze_pcm(frames, ANALYSIS_RATE, chunk_ms=50, gap_ms=200) # 200ms gap
+    chunk_sec = analysis.chunk_ms / 1000
         
-    print(f"Max RMS: {max_amp}")
-    
-    # Threshold for silence (e.g., 5% of max volume or fixed value)
-    threshold = max_amp * 0.1 
-    silence_threshold = max_amp * 0.05
+    print(f"Max RMS: {analysis.max_rms}")
+    print(f"Silence Threshold: {analysis.silence_threshold}")
     
-    print(f"Silence Threshold: {silence_threshold}")
-    
-    # State machine: 
-    # 1. Wait for sound (start > threshold)
-    # 2. Wait for silence (drop < silence_threshold for X duration)
-    
-    state = "WAIT_START"
-    start_speech_idx = 0
-    end_speech_idx = 0
-    
-    consecutive_silence = 0
-    required_silence_chunks = 4 # 200ms
-    
-    for idx, rms in enumerate(rms_values):
-        time_sec = idx * (chunk_ms / 1000)
-        # bar = "#" * int(rms / max_amp * 50)
-        # print(f"{time_sec:.2f}s: {int(rms)} {bar}")
+    # Speech starts above 10% of max volume, a gap is 200ms below 5% of it
+    if analysis.start_idx is not None:
+        print(f"Speech detected at {analysis.start_idx * chunk_sec:.2f}s")
         
-        if state == "WAIT_START":
-            if rms > threshold:
-                state = "SPEAKING"
-                start_speech_idx = idx
-                print(f"Speech detected at {time_sec:.2f}s")
-                
-        elif state == "SPEAKING":
-            if rms < silence_threshold:
-                consecutive_silence += 1
-                if consecutive_silence >= required_silence_chunks:
-                    # Found gap!
-                    end_speech_time = (idx - required_silence_chunks) * (chunk_ms / 1000)
-                    print(f"Speech ended at {end_speech_time:.2f}s (Gap found)")
-                    
-                    # We found the first gap.
-                    # Suggest a trim point slightly after end of speech
-                    trim_point = end_speech_time + 0.2
-                    print(f"Suggested trim point: {trim_point:.2f}s")
-                    
-                    try:
-                        os.remove(temp_wav)
-                    except: pass
-                    return trim_point
-            else:
-                consecutive_silence = 0
+    if analysis.end_idx is not None:
+        end_speech_time = analysis.end_idx * chunk_sec
+        print(f"Speech ended at {end_speech_time:.2f}s (Gap found)")
+        
+        # We found the first gap.
+        # Suggest a trim point slightly after end of speech
+        trim_point = gap_trim_time(analysis, 0.2)
+        print(f"Suggested trim point: {trim_point:.2f}s")
+        return trim_point
                 
     print("No clear gap found.")
-    try:
-        os.remove(temp_wav)
-    except: pass
     return None
 
 if __name__ == "__main__":
-    target = os.path.join(os.path.dirname(__file__), '../public/audio/syllables_ogg/ㄒㄧㄝ.ogg')
-    analyze_audio(target)
+    # Files to inspect (default: the clip this was written for); corpus_report.py covers them all
+    targets = sys.argv[1:] or [os.path.join(os.path.dirname(__file__), '../public/audio/syllables_ogg/ㄒㄧㄝ.ogg')]
+    for target in targets:
+        analyze_audio(target)
@@ -0,0 +1,129 @@
+import collections
+
+import numpy as np
+
+# Shared RMS / silence detection for the syllable audio scripts.
+# Works on raw 16-bit little-endian mono PCM (what the scripts decode to).
+
+# Speech starts when a chunk rises above 10% of the loudest chunk,
+# and a gap is a run of chunks below 5% of it.
+START_RATIO = 0.1
+SILENCE_RATIO = 0.05
+
+# Tail-trim settings used by the batch scripts: RMS chunk size, length of
+# the gap that ends a syllable, buffer kept after speech, minimum peak RMS.
+TRIM_PROFILES = {
+    'trim': {'chunk_ms': 20, 'gap_ms': 300, 'buffer_sec': 0.1, 'min_rms': 100}, # process_audio_trim
+    'fix_long': {'chunk_ms': 10, 'gap_ms': 250, 'buffer_sec': 0.15, 'min_rms': 0}, # batch_fix_long
+}
+
+# Head trim: speech onset is the first ONSET frame above ratio x the loudest
+# frame whose next hold_ms stay above it on average (so a click doesn't count);
+# pre_roll_ms before it is kept so the attack isn't clipped.
+ONSET = {'frame_ms': 5, 'ratio': 0.03, 'hold_ms': 20, 'pre_roll_ms': 30}
+
+GapAnalysis = collections.namedtuple(
+    'GapAnalysis',
+    ['chunk_ms', 'rms', 'max_rms', 'threshold', 'silence_threshold', 'start_idx', 'end_idx']
+)
+
+def pcm_samples(frames):
+    """View a raw s16le PCM buffer as an int16 array without copying."""
+    return np.frombuffer(frames, dtype='<i2', count=len(frames) // 2)
+
+def frame_rms(samples, framerate, chunk_ms):
+    """RMS per chunk_ms chunk. The last chunk may be shorter, like the old loops."""
+    chunk_size = int(framerate * chunk_ms / 1000)
+    if len(samples) == 0 or chunk_size <= 0:
+        return np.zeros(0)
+
+    x = samples.astype(np.float64)
+    starts = np.arange(0, len(x), chunk_size)
+    sums = np.add.reduceat(x * x, starts)
+    lengths = np.diff(np.append(starts, len(x)))
+    return np.sqrt(sums / lengths)
+
+def find_gap(rms, gap_chunks, start_ratio=START_RATIO, silence_ratio=SILENCE_RATIO):
+    """Return (start_idx, end_idx) of the first speech segment followed by a gap.
+
+    start_idx is the first chunk above the start threshold, end_idx is the last
+    chunk before a run of gap_chunks quiet chunks. Either is None if not found.
+    This is the WAIT_START -> SPEAKING -> gap state machine, done on arrays.
+    """
+    if len(rms) == 0:
+        return None, None
+
+    max_amp = rms.max()
+    loud = np.flatnonzero(rms > max_amp * start_ratio)
+    if len(loud) == 0:
+        return None, None
+    start_idx = int(loud[0])
+
+    # The chunk that starts speech is never counted as silence
+    quiet = rms[start_idx + 1:] < max_amp * silence_ratio
+    gap_chunks = max(1, gap_chunks)
+    if len(quiet) < gap_chunks:
+        return start_idx, None
+
+    counts = np.concatenate(([0], np.cumsum(quiet, dtype=np.int64)))
+    runs = np.flatnonzero(counts[gap_chunks:] - counts[:-gap_chunks] == gap_chunks)
+    if len(runs) == 0:
+        return start_idx, None
+
+    # A gap starting at start_idx + 1 + k means speech ended at start_idx + k
+    return start_idx, start_idx + int(runs[0])
+
+def analyze_pcm(frames, framerate, chunk_ms, gap_ms):
+    """Run RMS framing and gap detection over a raw s16le mono PCM buffer."""
+    rms = frame_rms(pcm_samples(frames), framerate, chunk_ms)
+    max_rms = float(rms.max()) if len(rms) else 0.0
+    start_idx, end_idx = find_gap(rms, int(gap_ms / chunk_ms))
+    return GapAnalysis(
+        chunk_ms=chunk_ms,
+        rms=rms,
+        max_rms=max_rms,
+        threshold=max_rms * START_RATIO,
+        silence_threshold=max_rms * SILENCE_RATIO,
+        start_idx=start_idx,
+        end_idx=end_idx,
+    )
+
+def gap_trim_time(analysis, buffer_sec):
+    """Trim point in seconds: end of the first speech segment plus a buffer."""
+    if analysis.end_idx is None:
+        return None
+    return (analysis.end_idx * analysis.chunk_ms / 1000) + buffer_sec
+
+def profile_trim_time(frames, framerate, profile):
+    """Trim point for one of TRIM_PROFILES, or None if too quiet / no gap."""
+    settings = TRIM_PROFILES[profile]
+    analysis = analyze_pcm(frames, framerate, settings['chunk_ms'], settings['gap_ms'])
+    if analysis.max_rms < settings['min_rms']:
+        return None
+    return gap_trim_time(analysis, settings['buffer_sec'])
+
+def find_onset(rms, ratio, hold_frames):
+    """Index of the first frame where speech starts, or None if there is none."""
+    if len(rms) == 0 or rms.max() <= 0:
+        return None
+    threshold = rms.max() * ratio
+    hold_frames = max(1, min(hold_frames, len(rms)))
+    # Mean of each frame and the hold_frames - 1 after it
+    sums = np.concatenate(([0.0], np.cumsum(rms)))
+    held = (sums[hold_frames:] - sums[:-hold_frames]) / hold_frames
+    candidates = np.flatnonzero((rms[:len(held)] > threshold) & (held > threshold))
+    return int(candidates[0]) if len(candidates) else None
+
+def onset_time(frames, framerate, onset=ONSET):
+    """Seconds from the start of raw s16le PCM to the speech onset, or None."""
+    rms = frame_rms(pcm_samples(frames), framerate, onset['frame_ms'])
+    idx = find_onset(rms, onset['ratio'], int(onset['hold_ms'] / onset['frame_ms']))
+    if idx is None:
+        return None
+    return idx * onset['frame_ms'] / 1000
+
+def head_trim_time(onset_sec, pre_roll_ms=ONSET['pre_roll_ms']):
+    """Where to cut the head: pre_roll_ms before the onset (0 = nothing to cut)."""
+    if onset_sec is None:
+        return 0.0
+    return max(0.0, onset_sec - pre_roll_ms / 1000)
@@ -0,0 +1,145 @@
+import hashlib
+import json
+import os
+
+try:
+    from audio_analysis import ONSET, TRIM_PROFILES, analyze_pcm, onset_time, pcm_samples, profile_trim_time
+    from audio_io import ANALYSIS_RATE, decode_pcm_with_peak
+    from audio_jobs import run_jobs
+    from loudness import measure as measure_loudness
+    from syllable_vad import VAD, first_syllable
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(__file__))
+    from audio_analysis import ONSET, TRIM_PROFILES, analyze_pcm, onset_time, pcm_samples, profile_trim_time
+    from audio_io import ANALYSIS_RATE, decode_pcm_with_peak
+    from audio_jobs import run_jobs
+    from loudness import measure as measure_loudness
+    from syllable_vad import VAD, first_syllable
+
+# Persistent per-file measurements for the syllable corpus, keyed by content
+# hash + analysis version, so unchanged files never hit ffmpeg again.
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+CACHE_FILE = os.path.join(os.path.dirname(__file__), '.audio_cache.json')
+
+# Bump when measure_file() changes; profile changes are picked up automatically
+SCHEMA_VERSION = 6
+ENVELOPE_MS = 10
+
+def analysis_version():
+    params = json.dumps({'profiles': TRIM_PROFILES, 'onset': ONSET, 'vad': VAD, 'envelope_ms': ENVELOPE_MS, 'rate': ANALYSIS_RATE}, sort_keys=True)
+    return f"{SCHEMA_VERSION}-{hashlib.sha1(params.encode()).hexdigest()[:10]}"
+
+def file_hash(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+def cache_key(path):
+    return os.path.relpath(os.path.abspath(path), ROOT_DIR)
+
+def measure_file(path):
+    """Decode once and measure everything the batch scripts need."""
+    frames, peak_db = decode_pcm_with_peak(path)
+    if frames is None:
+        return {'error': 'decode failed'}
+
+    envelope = analyze_pcm(frames, ANALYSIS_RATE, ENVELOPE_MS, TRIM_PROFILES['fix_long']['gap_ms'])
+    speech_start = None
+    speech_end = None
+    if envelope.start_idx is not None:
+        speech_start = envelope.start_idx * ENVELOPE_MS / 1000
+    if envelope.end_idx is not None:
+        speech_end = (envelope.end_idx + 1) * ENVELOPE_MS / 1000
+
+    samples = pcm_samples(frames)
+    boundary = first_syllable(samples, ANALYSIS_RATE)
+    # Loudness from the same PCM as the trim analysis. Its true peak is
+    # oversampled from 16 kHz, which misses content above 8 kHz, so it is
+    # never taken below the source's own sample peak (volumedetect runs at
+    # the native rate).
+    loudness = measure_loudness(samples, ANALYSIS_RATE)
+    if peak_db is not None and loudness['true_peak_db'] is not None:
+        loudness['true_peak_db'] = max(loudness['true_peak_db'], peak_db)
+    return {
+        'duration': len(samples) / ANALYSIS_RATE,
+        'peak_db': peak_db,
+        **loudness,
+        'rms_envelope': [round(float(v), 1) for v in envelope.rms],
+        'speech': [speech_start, speech_end],
+        'onset': onset_time(frames, ANALYSIS_RATE), # time to first speech energy
+        'trim': {name: profile_trim_time(frames, ANALYSIS_RATE, name) for name in TRIM_PROFILES},
+        # End of the first syllable, found even without a silence gap (syllable_vad.py)
+        'vad': boundary._asdict() if boundary else None,
+    }
+
+def _measure_item(item):
+    _, path = item
+    return measure_file(path)
+
+class AudioCache:
+    def __init__(self, path=CACHE_FILE):
+        self.path = path
+        self.version = analysis_version()
+        self.entries = {}
+        self.dirty = False
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == self.version:
+                    self.entries = data.get('entries', {})
+            except (OSError, ValueError):
+                pass
+
+    def get(self, path, digest=None):
+        entry = self.entries.get(cache_key(path))
+        if entry is None:
+            return None
+        if (digest or file_hash(path)) != entry['sha1']:
+            return None
+        return entry['data']
+
+    def put(self, path, data, digest=None):
+        self.entries[cache_key(path)] = {'sha1': digest or file_hash(path), 'data': data}
+        self.dirty = True
+
+    def invalidate(self, path):
+        """Drop a file's entry, e.g. after trim/normalize rewrote it."""
+        if self.entries.pop(cache_key(path), None) is not None:
+            self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'version': self.version, 'entries': self.entries}, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp, self.path)
+        self.dirty = False
+
+    def measure_all(self, paths, jobs=1):
+        """Return {path: measurements}, measuring only new or changed files.
+
+        Cache misses are measured in a process pool; hits cost one hash each.
+        Failed decodes are returned but not cached, so a transient ffmpeg
+        failure is retried on the next run.
+        """
+        results = {}
+        misses = []
+        for path in paths:
+            digest = file_hash(path)
+            data = self.get(path, digest)
+            if data is None:
+                misses.append((digest, path))
+            else:
+                results[path] = data
+
+        if misses:
+            print(f"Measuring {len(misses)} new/changed files ({len(paths) - len(misses)} cached)...")
+            for (digest, path), data in run_jobs(_measure_item, misses, jobs):
+                if 'error' not in data:
+                    self.put(path, data, digest)
+                results[path] = data
+            self.save()
+
+        return results
@@ -0,0 +1,218 @@
+import collections
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import quote
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Shared download engine for the audio scripts: a small thread pool where each
+# worker keeps one pooled requests.Session (keep-alive, so no TCP/TLS handshake
+# per file), a token bucket instead of fixed sleeps, retries with backoff,
+# atomic writes, and a resume journal so an interrupted run picks up where it
+# stopped.
+#
+# The hosts can be overridden (e.g. to point at fixture_audio_server.py):
+#   TTS_URL=http://127.0.0.1:8765/translate_tts MOEDICT_AUDIO_URL=http://127.0.0.1:8765
+
+TTS_URL = os.environ.get('TTS_URL', 'https://translate.google.com/translate_tts')
+MOEDICT_AUDIO_URL = os.environ.get('MOEDICT_AUDIO_URL', 'http://a.moedict.tw')
+
+JOURNAL_DIR = os.path.join(os.path.dirname(__file__), '.fetch_journal')
+
+HEADERS = {'User-Agent': 'Mozilla/5.0'}
+TIMEOUT = (5, 30) # connect, read (seconds)
+DEFAULT_JOBS = 4
+MAX_ATTEMPTS = 4
+BACKOFF_SEC = 0.5
+MAX_RETRY_AFTER_SEC = 30
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+FetchTask = collections.namedtuple('FetchTask', ['url', 'dest', 'label'], defaults=(None,))
+FetchResult = collections.namedtuple('FetchResult', ['ok', 'status', 'size', 'error', 'skipped', 'attempts'])
+
+def tts_url(text):
+    return f"{TTS_URL}?ie=UTF-8&q={quote(text)}&tl=zh-TW&client=tw-ob"
+
+def moedict_url(audio_id):
+    return f"{MOEDICT_AUDIO_URL}/{audio_id}.ogg"
+
+def journal_path(name):
+    return os.path.join(JOURNAL_DIR, f"{name}.jsonl")
+
+def add_fetch_arguments(parser, rate):
+    parser.add_argument(
+        '-j', '--jobs', type=int, default=DEFAULT_JOBS,
+        help=f"Concurrent downloads (default: {DEFAULT_JOBS})"
+    )
+    parser.add_argument(
+        '--rate', type=float, default=rate,
+        help=f"Max requests per second across all workers, 0 = unlimited (default: {rate})"
+    )
+
+class TokenBucket:
+    """Thread-safe limiter: `rate` requests/sec on average, bursts of up to `burst`."""
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or max(1.0, rate or 0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        if not self.rate:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+class FetchJournal:
+    """Append-only log of finished downloads for the current run.
+
+    A task counts as done if it was logged with the same URL and the file is
+    still there at the logged size. The journal is removed once a run
+    completes without failures, so the next run starts fresh.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.done = {}
+        self._file = None
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue # torn last line from a killed run
+                    self.done[entry['dest']] = entry
+
+    def is_done(self, task):
+        entry = self.done.get(os.path.normpath(task.dest))
+        return (entry is not None and entry['url'] == task.url
+                and os.path.exists(task.dest) and os.path.getsize(task.dest) == entry['size'])
+
+    def record(self, task, size):
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._file = open(self.path, 'a', encoding='utf-8')
+        entry = {'url': task.url, 'dest': os.path.normpath(task.dest), 'size': size}
+        self._file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        self._file.flush()
+        self.done[entry['dest']] = entry
+
+    def close(self, completed=False):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if completed and os.path.exists(self.path):
+            os.remove(self.path)
+
+_local = threading.local()
+
+def _session():
+    # One session per worker thread: its connections stay alive across tasks
+    session = getattr(_local, 'session', None)
+    if session is None:
+        session = requests.Session()
+        session.headers.update(HEADERS)
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        _local.session = session
+    return session
+
+def _write_atomic(dest, data):
+    os.makedirs(os.path.dirname(dest) or '.', exist_ok=True)
+    tmp = f"{dest}.{os.getpid()}-{threading.get_ident()}.part"
+    try:
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, dest)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+def _retry_after(response):
+    try:
+        return min(float(response.headers['Retry-After']), MAX_RETRY_AFTER_SEC)
+    except (KeyError, ValueError):
+        return None
+
+def fetch_one(task, bucket):
+    """Download one task with retries. Never raises for network/HTTP errors."""
+    session = _session()
+    status, error = None, None
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        bucket.acquire()
+        delay = None
+        try:
+            response = session.get(task.url, timeout=TIMEOUT)
+        except requests.RequestException as e:
+            status, error = None, str(e)
+        else:
+            status = response.status_code
+            if status == 200 and response.content:
+                try:
+                    _write_atomic(task.dest, response.content)
+                except OSError as e:
+                    return FetchResult(False, status, 0, str(e), False, attempt)
+                return FetchResult(True, status, len(response.content), None, False, attempt)
+            error = f"Status {status}" if status != 200 else "Empty response"
+            if status not in RETRY_STATUSES:
+                break
+            delay = _retry_after(response)
+
+        if attempt < MAX_ATTEMPTS:
+            if delay is None:
+                delay = BACKOFF_SEC * 2 ** (attempt - 1) * random.uniform(0.5, 1.5)
+            time.sleep(delay)
+    return FetchResult(False, status, 0, error, False, attempt)
+
+def fetch_all(tasks, jobs=DEFAULT_JOBS, rate=None, burst=None, journal=None):
+    """Yield (task, FetchResult) as downloads finish (not in input order).
+
+    Tasks already recorded in `journal` (a path) are yielded as skipped
+    without a request. Stopping early (Ctrl-C, breaking out of the loop)
+    cancels queued downloads and keeps the journal for the next run.
+    """
+    tasks = list(tasks)
+    log = FetchJournal(journal) if journal else None
+    bucket = TokenBucket(rate, burst)
+
+    pending = []
+    for task in tasks:
+        if log and log.is_done(task):
+            yield task, FetchResult(True, None, os.path.getsize(task.dest), None, True, 0)
+        else:
+            pending.append(task)
+
+    failed = 0
+    completed = False
+    pool = ThreadPoolExecutor(max_workers=max(1, jobs))
+    try:
+        futures = {pool.submit(fetch_one, task, bucket): task for task in pending}
+        for future in as_completed(futures):
+            task = futures[future]
+            result = future.result()
+            if result.ok:
+                if log:
+                    log.record(task, result.size)
+            else:
+                failed += 1
+            yield task, result
+        completed = failed == 0
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+        if log:
+            log.close(completed)
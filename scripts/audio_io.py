@@ -0,0 +1,77 @@
+import os
+import re
+import subprocess
+
+# ffmpeg helpers shared by the audio scripts.
+
+# Analysis always runs on 16 kHz mono 16-bit PCM
+ANALYSIS_RATE = 16000
+
+def parse_max_volume(output):
+    # Parse max_volume: -20.5 dB
+    match = re.search(r"max_volume: ([\-\d\.]+) dB", output)
+    if match:
+        return float(match.group(1))
+    return None
+
+def _decode(path, rate, audio_filter=None, capture_log=False):
+    cmd = ["ffmpeg", "-hide_banner", "-nostats", "-v", "info" if capture_log else "error", "-i", path]
+    if audio_filter:
+        cmd += ["-af", audio_filter]
+    cmd += ["-ac", "1"]
+    if rate:
+        cmd += ["-ar", str(rate)]
+    cmd += ["-f", "s16le", "-"]
+    try:
+        proc = subprocess.run(
+            cmd, stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE if capture_log else subprocess.DEVNULL
+        )
+    except OSError:
+        return None, ""
+
+    log = proc.stderr.decode('utf-8', 'replace') if capture_log else ""
+    if proc.returncode != 0:
+        return None, log
+    return bytearray(proc.stdout), log
+
+def decode_pcm(path, rate=ANALYSIS_RATE):
+    """Decode an audio file to raw s16le mono PCM over ffmpeg's stdout.
+
+    Nothing is written to disk. Returns a bytearray (usable directly with
+    numpy.frombuffer), or None if ffmpeg failed.
+    """
+    frames, _ = _decode(path, rate)
+    return frames
+
+def decode_pcm_with_peak(path, rate=ANALYSIS_RATE):
+    """Like decode_pcm, but also returns the source peak in dB from volumedetect.
+
+    volumedetect runs on the decoded source before resampling, so the peak is
+    the same number the standalone `-af volumedetect -f null -` pass reports.
+    Returns (frames, max_volume); either may be None.
+    """
+    frames, log = _decode(path, rate, audio_filter="volumedetect", capture_log=True)
+    return frames, parse_max_volume(log)
+
+def decode_pcm_native(path):
+    """Decode to s16le mono PCM at the file's own sample rate.
+
+    Returns (frames, rate), or (None, None) if ffmpeg failed. Used where the
+    PCM is written back out, so it is not resampled down to ANALYSIS_RATE.
+    """
+    frames, log = _decode(path, None, capture_log=True)
+    # Output #0, s16le, to 'pipe:': ... Stream #0:0: Audio: pcm_s16le, 22000 Hz, mono, s16
+    match = re.search(r"Audio: pcm_s16le, (\d+) Hz", log)
+    if frames is None or not match:
+        return None, None
+    return frames, int(match.group(1))
+
+def encode_pcm(frames, rate, out_path, codec_args=("-c:a", "libvorbis")):
+    """Encode raw s16le mono PCM from memory into out_path with one ffmpeg run."""
+    cmd = ["ffmpeg", "-y", "-v", "error", "-f", "s16le", "-ar", str(rate), "-ac", "1", "-i", "-", *codec_args, out_path]
+    try:
+        result = subprocess.run(cmd, input=bytes(frames), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    except OSError:
+        return False
+    return result.returncode == 0 and os.path.exists(out_path)
@@ -0,0 +1,52 @@
+import itertools
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+# Process pool + private temp files for the per-file ffmpeg batch scripts.
+# Each run gets its own temp dir and every task gets a unique file name in it,
+# so several scripts (or several workers) never collide on "temp_*.wav".
+
+_temp_dir = None
+_temp_counter = itertools.count()
+
+def default_jobs():
+    return os.cpu_count() or 1
+
+def add_jobs_argument(parser):
+    parser.add_argument(
+        '-j', '--jobs', type=int, default=default_jobs(),
+        help=f"Number of worker processes (default: {default_jobs()})"
+    )
+
+def _init_worker(temp_dir):
+    global _temp_dir
+    _temp_dir = temp_dir
+
+def temp_path(suffix):
+    """Unique (not yet created) file path in this run's private temp dir."""
+    if _temp_dir is None:
+        raise RuntimeError("temp_path() called outside of run_jobs()")
+    return os.path.join(_temp_dir, f"{os.getpid()}-{next(_temp_counter)}{suffix}")
+
+def run_jobs(func, items, jobs=1):
+    """Yield (item, func(item)) in input order, fanning out to a process pool.
+
+    func must be a module-level function so it can be sent to the workers.
+    """
+    items = list(items)
+    if not items:
+        return
+    with tempfile.TemporaryDirectory(prefix='zhuyin-audio-') as temp_dir:
+        if jobs <= 1:
+            _init_worker(temp_dir)
+            try:
+                for item in items:
+                    yield item, func(item)
+            finally:
+                _init_worker(None)
+            return
+
+        chunksize = max(1, len(items) // (jobs * 8))
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(temp_dir,)) as pool:
+            yield from zip(items, pool.map(func, items, chunksize=chunksize))
@@ -0,0 +1,88 @@
+import struct
+
+# Container-level probing (duration, sample rate) in pure Python, for tools
+# that only need metadata and should not require ffmpeg.
+
+# MPEG audio tables, indexed by [version][bitrate_idx] for Layer III
+_MP3_BITRATES = {
+    'mpeg1': [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 0],
+    'mpeg2': [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160, 0],
+}
+_MP3_RATES = {3: [44100, 48000, 32000], 2: [22050, 24000, 16000], 0: [11025, 12000, 8000]}
+
+def ogg_duration(data):
+    """Duration in seconds of an Ogg Vorbis/Opus stream, from the last granule position."""
+    if not data.startswith(b'OggS'):
+        return None
+
+    idx = data.find(b'\x01vorbis')
+    if idx >= 0:
+        rate = struct.unpack_from('<I', data, idx + 12)[0]
+        pre_skip = 0
+    else:
+        idx = data.find(b'OpusHead')
+        if idx < 0:
+            return None
+        pre_skip = struct.unpack_from('<H', data, idx + 10)[0]
+        rate = 48000 # Opus granules always count 48 kHz samples
+
+    last = data.rfind(b'OggS')
+    while last >= 0:
+        granule = struct.unpack_from('<q', data, last + 6)[0]
+        if granule >= 0:
+            return max(0, granule - pre_skip) / rate
+        last = data.rfind(b'OggS', 0, last)
+    return None
+
+def mp3_duration(data):
+    """Duration in seconds of an MPEG Layer III stream, by walking its frame headers."""
+    pos = 0
+    if data[:3] == b'ID3' and len(data) >= 10:
+        size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+        pos = 10 + size
+
+    samples = 0
+    rate = None
+    first = True
+    while pos + 4 <= len(data):
+        header = struct.unpack_from('>I', data, pos)[0]
+        if (header >> 21) & 0x7FF != 0x7FF:
+            pos += 1
+            continue
+        version = (header >> 19) & 3 # 3 = MPEG1, 2 = MPEG2, 0 = MPEG2.5
+        layer = (header >> 17) & 3 # 1 = Layer III
+        bitrate_idx = (header >> 12) & 0xF
+        rate_idx = (header >> 10) & 3
+        if version == 1 or layer != 1 or rate_idx == 3 or bitrate_idx in (0, 15):
+            pos += 1
+            continue
+
+        bitrate = _MP3_BITRATES['mpeg1' if version == 3 else 'mpeg2'][bitrate_idx] * 1000
+        rate = _MP3_RATES[version][rate_idx]
+        padding = (header >> 9) & 1
+        frame_samples = 1152 if version == 3 else 576
+        frame_len = frame_samples // 8 * bitrate // rate + padding
+
+        # A leading Xing/Info frame carries metadata, not audio
+        if first and (b'Xing' in data[pos:pos + frame_len] or b'Info' in data[pos:pos + frame_len]):
+            first = False
+            pos += frame_len
+            continue
+        first = False
+
+        samples += frame_samples
+        pos += frame_len
+
+    if not rate:
+        return None
+    return samples / rate
+
+def probe_duration(path):
+    """Duration in seconds for .ogg/.opus/.mp3 files, or None if unknown."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if path.endswith(('.ogg', '.opus', '.oga')):
+        return ogg_duration(data)
+    if path.endswith('.mp3'):
+        return mp3_duration(data)
+    return None
@@ -0,0 +1,120 @@
+import json
+import os
+
+import numpy as np
+
+try:
+    from audio_analysis import TRIM_PROFILES
+    from audio_io import encode_pcm
+    from audio_jobs import run_jobs
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(__file__))
+    from audio_analysis import TRIM_PROFILES
+    from audio_io import encode_pcm
+    from audio_jobs import run_jobs
+
+# Synthetic syllable corpus for benchmarks: Ogg clips made of tone-contoured
+# harmonic bursts, joined directly or separated by short (< gap) and long
+# (>= gap) silences, like Moedict recordings of a syllable followed by the
+# rest of a compound word.
+# Everything is seeded, and the true end of the first speech segment (what
+# the 'trim' profile should find) is recorded next to the audio.
+
+CORPUS_VERSION = 2
+CORPUS_RATE = 22050
+GAP_SEC = TRIM_PROFILES['trim']['gap_ms'] / 1000
+NOISE_FLOOR = 30 # ~ -60 dBFS
+ATTACK_SEC = 0.01
+RELEASE_SEC = 0.03
+
+# Pitch contours over a syllable, as multipliers of f0 (Mandarin tones 1-4)
+TONE_CONTOURS = [
+    lambda x: np.ones_like(x),
+    lambda x: 0.85 + 0.35 * x,
+    lambda x: 1.0 - 0.6 * x + 0.55 * x * x,
+    lambda x: 1.25 - 0.5 * x,
+]
+
+def synth_syllable(rng, rate, duration, amplitude):
+    n = int(rate * duration)
+    x = np.linspace(0, 1, n, endpoint=False)
+    f0 = rng.uniform(110, 260) * TONE_CONTOURS[rng.integers(len(TONE_CONTOURS))](x)
+    phase = 2 * np.pi * np.cumsum(f0) / rate
+    wave = sum(np.sin(k * phase) / k for k in range(1, 7))
+
+    envelope = np.ones(n)
+    attack, release = int(rate * ATTACK_SEC), int(rate * RELEASE_SEC)
+    envelope[:attack] = np.linspace(0, 1, attack)
+    envelope[n - release:] = np.linspace(1, 0, release)
+    return wave / np.abs(wave).max() * envelope * amplitude
+
+def synth_clip(rng, rate=CORPUS_RATE):
+    """One clip as (int16 samples, segments [(start, end) sec], speech_end sec)."""
+    pieces = [np.zeros(int(rate * rng.uniform(0.02, 0.15)))]
+    t = len(pieces[0]) / rate
+    segments = []
+    speech_end = None
+
+    n_segments = int(rng.integers(1, 4))
+    for i in range(n_segments):
+        duration = rng.uniform(0.18, 0.45)
+        pieces.append(synth_syllable(rng, rate, duration, rng.uniform(0.3, 0.95) * 32767))
+        segments.append((round(t, 4), round(t + duration, 4)))
+        t += duration
+
+        kind = rng.random()
+        if i == n_segments - 1:
+            silence = rng.uniform(GAP_SEC + 0.05, 0.6) # always ends on a gap
+        elif kind < 0.3:
+            silence = 0.0 # next syllable follows with no gap
+        elif kind < 0.6:
+            silence = rng.uniform(0.06, GAP_SEC - 0.1) # inside a word
+        else:
+            silence = rng.uniform(GAP_SEC + 0.05, 0.7) # before the rest of a compound
+        if speech_end is None and silence >= GAP_SEC:
+            speech_end = t
+        pieces.append(np.zeros(int(rate * silence)))
+        t += silence
+
+    samples = np.concatenate(pieces)
+    samples += rng.normal(0, NOISE_FLOOR, len(samples))
+    return np.clip(samples, -32768, 32767).astype('<i2'), segments, round(speech_end, 4)
+
+def _encode_item(item):
+    frames, rate, path = item
+    return encode_pcm(frames, rate, path)
+
+def load_corpus(corpus_dir):
+    manifest = os.path.join(corpus_dir, 'corpus.json')
+    if not os.path.exists(manifest):
+        return None
+    with open(manifest, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def build_corpus(corpus_dir, count, seed=0, rate=CORPUS_RATE, jobs=1):
+    """Generate (or reuse, if the parameters match) a corpus; returns its manifest."""
+    params = {'version': CORPUS_VERSION, 'count': count, 'seed': seed, 'rate': rate}
+    corpus = load_corpus(corpus_dir)
+    if (corpus and corpus['params'] == params
+            and all(os.path.exists(os.path.join(corpus_dir, name)) for name in corpus['clips'])):
+        return corpus
+
+    os.makedirs(corpus_dir, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    clips = {}
+    items = []
+    for i in range(count):
+        samples, segments, speech_end = synth_clip(rng, rate)
+        name = f"clip-{i:04d}.ogg"
+        clips[name] = {'duration': round(len(samples) / rate, 4), 'segments': segments, 'speech_end': speech_end}
+        items.append((samples.tobytes(), rate, os.path.join(corpus_dir, name)))
+
+    for (_, _, path), ok in run_jobs(_encode_item, items, jobs):
+        if not ok:
+            raise RuntimeError(f"ffmpeg failed to encode {path}")
+
+    corpus = {'params': params, 'clips': clips}
+    with open(os.path.join(corpus_dir, 'corpus.json'), 'w', encoding='utf-8') as f:
+        json.dump(corpus, f, indent=2)
+    return corpus
@@ -0,0 +1,358 @@
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+try:
+    from audio_analysis import TRIM_PROFILES, onset_time, pcm_samples, profile_trim_time
+    from audio_io import ANALYSIS_RATE, decode_pcm, decode_pcm_native, encode_pcm
+    from audio_jobs import add_jobs_argument, run_jobs
+    from bench_corpus import CORPUS_RATE, build_corpus
+    from moedict_index import MAPPING_FILE, MoedictIndex, build_index
+    from syllable_inventory import SYLLABLES
+    from syllable_vad import first_syllable
+    import normalize_audio
+except ImportError:
+    sys.path.append(os.path.dirname(__file__))
+    from audio_analysis import TRIM_PROFILES, onset_time, pcm_samples, profile_trim_time
+    from audio_io import ANALYSIS_RATE, decode_pcm, decode_pcm_native, encode_pcm
+    from audio_jobs import add_jobs_argument, run_jobs
+    from bench_corpus import CORPUS_RATE, build_corpus
+    from moedict_index import MAPPING_FILE, MoedictIndex, build_index
+    from syllable_inventory import SYLLABLES
+    from syllable_vad import first_syllable
+    import normalize_audio
+
+# Offline benchmark for the scripts/ pipeline. Generates a seeded synthetic
+# corpus (bench_corpus.py), times each stage per file and in aggregate,
+# writes the results to JSON and compares them to a saved baseline:
+#
+#   python3 scripts/benchmark_pipeline.py --save-baseline   # on the old code
+#   python3 scripts/benchmark_pipeline.py                   # on the change
+#
+# Per-file stages keep the fastest of --repeat runs for each file; whole-run
+# stages (map loading, frequency aggregation) keep every run. Stages are
+# compared on their median. Timings run serially so they are comparable.
+
+BENCH_DIR = os.path.join(os.path.dirname(__file__), '.bench')
+RESULTS_FILE = os.path.join(BENCH_DIR, 'latest.json')
+BASELINE_FILE = os.path.join(BENCH_DIR, 'baseline.json')
+
+DEFAULT_FILES = 200
+DEFAULT_REPEAT = 3
+MIN_RUN_REPEAT = 5 # whole-run stages are single samples, so take a few more
+DEFAULT_THRESHOLD = 0.10
+MIN_DELTA_SEC = 0.0005 # ignore changes below timer noise
+TRIM_TOLERANCE_SEC = 0.04 # two 'trim' chunks
+ONSET_TOLERANCE_SEC = 0.01 # two onset frames
+VAD_TOLERANCE_SEC = 0.04
+
+FILE_STAGES = ['decode', 'analysis', 'onset', 'vad', 'get_trim_point', 'encode', 'normalize_file']
+RUN_STAGES = ['map_json', 'map_index_build', 'map_index_load', 'frequency', 'frequency_cached']
+STAGES = FILE_STAGES + RUN_STAGES
+
+def summarize(times):
+    times = sorted(times)
+    return {
+        'count': len(times),
+        'total': sum(times),
+        'min': times[0],
+        'median': statistics.median(times),
+        'mean': statistics.fmean(times),
+        'p95': times[min(len(times) - 1, int(len(times) * 0.95))],
+        'max': times[-1],
+    }
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+# Per-file stages: each takes (path, scratch_dir) and returns (seconds, result).
+# Module-level so run_jobs() can provide the temp dir encode needs.
+
+def bench_decode(item):
+    path, _ = item
+    return timed(decode_pcm, path)[0], None
+
+def bench_analysis(item):
+    path, _ = item
+    frames = decode_pcm(path)
+    return timed(profile_trim_time, frames, ANALYSIS_RATE, 'trim')
+
+def bench_onset(item):
+    path, _ = item
+    frames = decode_pcm(path)
+    return timed(onset_time, frames, ANALYSIS_RATE)
+
+def bench_vad(item):
+    path, _ = item
+    samples = pcm_samples(decode_pcm(path))
+    seconds, boundary = timed(first_syllable, samples, ANALYSIS_RATE)
+    return seconds, boundary.end if boundary else None
+
+def get_trim_point(path):
+    """Per-file decode + 'trim' analysis, as process_audio_trim.py ran it before the analysis cache."""
+    frames = decode_pcm(path)
+    return None if frames is None else profile_trim_time(frames, ANALYSIS_RATE, 'trim')
+
+def bench_get_trim_point(item):
+    path, _ = item
+    return timed(get_trim_point, path)
+
+def bench_encode(item):
+    path, scratch = item
+    frames, rate = decode_pcm_native(path)
+    out = os.path.join(scratch, os.path.basename(path))
+    seconds, ok = timed(encode_pcm, frames, rate, out)
+    os.remove(out)
+    return seconds, ok
+
+def bench_normalize_file(item):
+    path, _ = item
+    seconds, entry = timed(normalize_audio.normalize_file, path)
+    return seconds, entry is not None
+
+FILE_BENCHES = {
+    'decode': bench_decode,
+    'analysis': bench_analysis,
+    'onset': bench_onset,
+    'vad': bench_vad,
+    'get_trim_point': bench_get_trim_point,
+    'encode': bench_encode,
+    'normalize_file': bench_normalize_file,
+}
+
+# Whole-run stages: take the scratch dir, return seconds
+
+def bench_map_json(scratch):
+    def load():
+        with open(MAPPING_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return timed(load)[0]
+
+def bench_map_index_build(scratch):
+    return timed(build_index, MAPPING_FILE, os.path.join(scratch, 'moedict.bin'))[0]
+
+def bench_map_index_load(scratch):
+    index_file = os.path.join(scratch, 'moedict.bin')
+    if not os.path.exists(index_file):
+        build_index(MAPPING_FILE, index_file)
+
+    def load():
+        index = MoedictIndex(index_file)
+        return [index.candidates(s) for s in SYLLABLES]
+    return timed(load)[0]
+
+def bench_frequency(scratch, cached=False):
+    import process_frequency # needs pypinyin unless the reading cache is warm
+    cache_file = os.path.join(scratch, 'reading_cache.json')
+    if not cached and os.path.exists(cache_file):
+        os.remove(cache_file)
+    argv = ['--output', os.path.join(scratch, 'syllable_frequency.json'), '--reading-cache', cache_file]
+    with contextlib.redirect_stdout(io.StringIO()):
+        return timed(process_frequency.main, argv)[0]
+
+def bench_frequency_cached(scratch):
+    return bench_frequency(scratch, cached=True)
+
+RUN_BENCHES = {
+    'map_json': bench_map_json,
+    'map_index_build': bench_map_index_build,
+    'map_index_load': bench_map_index_load,
+    'frequency': bench_frequency,
+    'frequency_cached': bench_frequency_cached,
+}
+
+def trim_accuracy(corpus, trims):
+    """How many 'trim' points land on the known end of the first speech segment."""
+    buffer_sec = TRIM_PROFILES['trim']['buffer_sec']
+    hits = 0
+    for name, trim in trims.items():
+        expected = corpus['clips'][name]['speech_end']
+        if trim is not None and abs(trim - buffer_sec - expected) <= TRIM_TOLERANCE_SEC:
+            hits += 1
+    return {'files': len(trims), 'within_tolerance': hits, 'tolerance_sec': TRIM_TOLERANCE_SEC}
+
+def onset_accuracy(corpus, onsets):
+    """How many onsets land on the known start of the first speech segment."""
+    hits = 0
+    for name, onset in onsets.items():
+        expected = corpus['clips'][name]['segments'][0][0]
+        if onset is not None and abs(onset - expected) <= ONSET_TOLERANCE_SEC:
+            hits += 1
+    return {'files': len(onsets), 'within_tolerance': hits, 'tolerance_sec': ONSET_TOLERANCE_SEC}
+
+def vad_accuracy(corpus, ends):
+    """How many first-syllable boundaries land on the end of the first syllable.
+
+    A cut in the silence after it (up to the next syllable) counts too.
+    """
+    hits = 0
+    for name, end in ends.items():
+        clip = corpus['clips'][name]
+        expected = clip['segments'][0][1]
+        latest = clip['segments'][1][0] if len(clip['segments']) > 1 else clip['duration']
+        if end is not None and expected - VAD_TOLERANCE_SEC <= end <= max(expected + VAD_TOLERANCE_SEC, latest):
+            hits += 1
+    return {'files': len(ends), 'within_tolerance': hits, 'tolerance_sec': VAD_TOLERANCE_SEC}
+
+def environment():
+    def first_line(cmd):
+        try:
+            out = subprocess.run(cmd, capture_output=True, text=True, cwd=os.path.dirname(__file__) or '.')
+            return out.stdout.splitlines()[0] if out.returncode == 0 and out.stdout else None
+        except OSError:
+            return None
+    return {
+        'time': datetime.datetime.now().isoformat(timespec='seconds'),
+        'commit': first_line(['git', 'rev-parse', '--short', 'HEAD']),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'ffmpeg': first_line(['ffmpeg', '-version']),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+    }
+
+def run_benchmarks(corpus, corpus_dir, stages, repeat):
+    names = sorted(corpus['clips'])
+    results = {}
+    with tempfile.TemporaryDirectory(prefix='zhuyin-bench-') as scratch:
+        items = [(os.path.join(corpus_dir, name), scratch) for name in names]
+        for stage in stages:
+            print(f"  {stage}...", flush=True)
+            if stage in FILE_BENCHES:
+                best = {}
+                outputs = {}
+                for _ in range(repeat):
+                    for (path, _), (seconds, output) in run_jobs(FILE_BENCHES[stage], items):
+                        name = os.path.basename(path)
+                        best[name] = min(seconds, best.get(name, seconds))
+                        outputs[name] = output
+                results[stage] = summarize(best.values())
+                results[stage]['per_file'] = best
+                if stage in ('analysis', 'get_trim_point'):
+                    results[stage]['accuracy'] = trim_accuracy(corpus, outputs)
+                elif stage == 'onset':
+                    results[stage]['accuracy'] = onset_accuracy(corpus, outputs)
+                elif stage == 'vad':
+                    results[stage]['accuracy'] = vad_accuracy(corpus, outputs)
+            else:
+                try:
+                    runs = [RUN_BENCHES[stage](scratch) for _ in range(max(repeat, MIN_RUN_REPEAT))]
+                except ImportError as e:
+                    results[stage] = {'skipped': str(e)}
+                    continue
+                results[stage] = summarize(runs)
+    return results
+
+def compare(results, baseline, threshold):
+    """Return rows of (stage, current median, baseline median, change, regressed)."""
+    rows = []
+    for stage in STAGES:
+        current = results['stages'].get(stage)
+        if not current or 'median' not in current:
+            continue
+        base = baseline['stages'].get(stage) if baseline else None
+        if not base or 'median' not in base:
+            rows.append((stage, current['median'], None, None, False))
+            continue
+        change = current['median'] / base['median'] - 1 if base['median'] else 0.0
+        regressed = change > threshold and current['median'] - base['median'] > MIN_DELTA_SEC
+        rows.append((stage, current['median'], base['median'], change, regressed))
+    return rows
+
+def print_report(results, rows):
+    print(f"\n{'stage':<16} {'n':>5} {'median ms':>10} {'p95 ms':>9} {'total s':>8} {'baseline ms':>12} {'change':>8}")
+    for stage, median, base, change, regressed in rows:
+        stats = results['stages'][stage]
+        base_text = f"{base * 1000:12.2f}" if base is not None else f"{'-':>12}"
+        change_text = f"{change:+8.1%}" if change is not None else f"{'-':>8}"
+        flag = '  REGRESSION' if regressed else ''
+        print(f"{stage:<16} {stats['count']:>5} {median * 1000:10.2f} {stats['p95'] * 1000:9.2f} "
+              f"{stats['total']:8.2f} {base_text} {change_text}{flag}")
+
+    for stage, stats in results['stages'].items():
+        if 'skipped' in stats:
+            print(f"{stage:<16} skipped: {stats['skipped']}")
+        if 'accuracy' in stats:
+            acc = stats['accuracy']
+            if stage == 'vad':
+                print(f"{stage}: {acc['within_tolerance']}/{acc['files']} boundaries within {acc['tolerance_sec'] * 1000:.0f} ms "
+                      f"of the true first-syllable end (or in the silence after it)")
+                continue
+            target = 'onsets' if stage == 'onset' else 'trim points'
+            edge = 'start' if stage == 'onset' else 'end'
+            print(f"{stage}: {acc['within_tolerance']}/{acc['files']} {target} within {acc['tolerance_sec'] * 1000:.0f} ms of the true speech {edge}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the audio/data pipeline on a synthetic corpus.")
+    parser.add_argument('--files', type=int, default=DEFAULT_FILES, help="Synthetic clips to generate")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--rate', type=int, default=CORPUS_RATE, help="Corpus sample rate")
+    parser.add_argument('--corpus-dir', default=os.path.join(BENCH_DIR, 'corpus'))
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    parser.add_argument('--stages', default=','.join(STAGES), help="Comma-separated subset of: " + ', '.join(STAGES))
+    parser.add_argument('-o', '--output', default=RESULTS_FILE)
+    parser.add_argument('--baseline', default=BASELINE_FILE, help="Results file to compare against")
+    parser.add_argument('--save-baseline', action='store_true', help="Also write the results as the new baseline")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help="Allowed median slowdown (0.10 = 10%%)")
+    add_jobs_argument(parser) # corpus generation only
+    args = parser.parse_args()
+
+    stages = [s for s in args.stages.split(',') if s]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(sorted(unknown))}")
+
+    print(f"Preparing {args.files} synthetic clips in {args.corpus_dir}...")
+    corpus = build_corpus(args.corpus_dir, args.files, args.seed, args.rate, args.jobs)
+
+    print(f"Running {len(stages)} stages x {args.repeat}...")
+    results = {
+        'environment': environment(),
+        'corpus': corpus['params'],
+        'repeat': args.repeat,
+        'stages': run_benchmarks(corpus, args.corpus_dir, stages, args.repeat),
+    }
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"Wrote {args.output}")
+
+    baseline = None
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('corpus') != results['corpus']:
+            print(f"Warning: baseline corpus {baseline.get('corpus')} differs from this run's")
+
+    rows = compare(results, baseline, args.threshold)
+    print_report(results, rows)
+
+    if args.save_baseline:
+        if os.path.abspath(args.output) != os.path.abspath(args.baseline):
+            shutil.copyfile(args.output, args.baseline)
+        print(f"\nSaved baseline to {args.baseline}")
+        return 0
+
+    regressions = [row[0] for row in rows if row[4]]
+    if regressions:
+        print(f"\n{len(regressions)} stage(s) slower than baseline by more than {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+import hashlib
+import json
+import os
+
+try:
+    from audio_probe import probe_duration
+    from loudness import load_loudness
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(__file__))
+    from audio_probe import probe_duration
+    from loudness import load_loudness
+
+# Generates src/data/audio_manifest.json: for every key and syllable sound,
+# the best file that actually exists, so the app never probes for a missing
+# MP3 before falling back to the OGG. The content hash is appended to the URL,
+# so a changed file gets a new URL and unchanged ones can be cached forever.
+# Playback gains from normalize_audio.py (src/data/audio_loudness.json) are
+# included for files whose content still matches. Size-optimized Opus/MP3
+# copies from transcode_audio.py are listed as variants of the clip they were
+# made from (gain already baked in), while that source is unchanged.
+# Pure Python (no ffmpeg), so it can run anywhere the app is built.
+
+PUBLIC_AUDIO_DIR = os.path.join(os.path.dirname(__file__), '../public/audio')
+OUTPUT_FILE = os.path.join(os.path.dirname(__file__), '../src/data/audio_manifest.json')
+
+# Same priority as the app: Google TTS MP3 first, Moedict OGG otherwise
+SYLLABLE_SOURCES = [
+    ('syllables', 'mp3'),
+    ('syllables_ogg', 'ogg'),
+]
+TRANSCODE_INDEX = os.path.join(PUBLIC_AUDIO_DIR, 'syllables_opus', 'transcode.json')
+
+def describe(rel_path, loudness):
+    path = os.path.join(PUBLIC_AUDIO_DIR, rel_path)
+    with open(path, 'rb') as f:
+        digest = hashlib.sha1(f.read()).hexdigest()
+    duration = probe_duration(path)
+    entry = {
+        'file': rel_path,
+        'format': rel_path.rsplit('.', 1)[-1],
+        'duration': round(duration, 3) if duration is not None else None,
+        'bytes': os.path.getsize(path),
+        'hash': digest[:10],
+    }
+    measured = loudness['files'].get(rel_path)
+    if measured and measured['hash'] == entry['hash'] and measured['gain']:
+        entry['gain'] = measured['gain']
+    return entry
+
+def load_variants(path=TRANSCODE_INDEX):
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)['clips']
+
+def add_variants(entry, transcoded):
+    """Attach transcoded copies made from exactly this file."""
+    if transcoded and transcoded['source'] == entry['file'] and transcoded['source_hash'] == entry['hash']:
+        variants = {
+            fmt: {'file': f['file'], 'bytes': f['bytes'], 'hash': f['hash']}
+            for fmt, f in transcoded['formats'].items()
+            if os.path.exists(os.path.join(PUBLIC_AUDIO_DIR, f['file']))
+        }
+        if variants:
+            entry['variants'] = variants
+    return entry
+
+def main():
+    loudness = load_loudness()
+    keys = {}
+    for f in sorted(os.listdir(PUBLIC_AUDIO_DIR)):
+        if f.endswith('.mp3'):
+            keys[f[:-4]] = describe(f, loudness)
+
+    variants = load_variants()
+    syllables = {}
+    for subdir, ext in SYLLABLE_SOURCES:
+        directory = os.path.join(PUBLIC_AUDIO_DIR, subdir)
+        if not os.path.isdir(directory):
+            continue
+        for f in sorted(os.listdir(directory)):
+            name = f[:-(len(ext) + 1)]
+            if f.endswith(f'.{ext}') and name not in syllables:
+                syllables[name] = add_variants(describe(f"{subdir}/{f}", loudness), variants.get(name))
+
+    manifest = {
+        'keys': keys,
+        'syllables': dict(sorted(syllables.items())),
+    }
+
+    os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
+    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    formats = {}
+    for entry in syllables.values():
+        formats[entry['format']] = formats.get(entry['format'], 0) + 1
+    print(f"Wrote {len(keys)} key and {len(syllables)} syllable entries to {OUTPUT_FILE}")
+    print(f"Syllable formats: {formats}")
+    gained = sum('gain' in e for e in list(keys.values()) + list(syllables.values()))
+    print(f"Entries with a loudness gain: {gained}")
+    print(f"Syllables with transcoded variants: {sum('variants' in e for e in syllables.values())}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+import os
+import argparse
+import json
+
+try:
+    from audio_io import encode_pcm, decode_pcm
+    from audio_jobs import add_jobs_argument, run_jobs
+    from loudness import apply_gain_pcm, file_gain, load_loudness
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(__file__))
+    from audio_io import encode_pcm, decode_pcm
+    from audio_jobs import add_jobs_argument, run_jobs
+    from loudness import apply_gain_pcm, file_gain, load_loudness
+
+# Packs every syllable and key sound into one (or a few) Ogg sprite files plus
+# a JSON manifest of offsets, so the app fetches and decodes the audio once
+# and plays slices from memory (see src/utils/AudioSprites.ts). Loudness gains
+# recorded by normalize_audio.py are baked in, since the packs are encoded anyway.
+
+PUBLIC_AUDIO_DIR = os.path.join(os.path.dirname(__file__), '../public/audio')
+SYLLABLE_DIR_MP3 = os.path.join(PUBLIC_AUDIO_DIR, 'syllables')
+SYLLABLE_DIR_OGG = os.path.join(PUBLIC_AUDIO_DIR, 'syllables_ogg')
+OUTPUT_DIR = os.path.join(PUBLIC_AUDIO_DIR, 'sprites')
+MANIFEST_FILE = os.path.join(OUTPUT_DIR, 'manifest.json')
+
+SPRITE_RATE = 22050
+# Silence between clips so codec overlap never bleeds into the next slice
+GAP_SEC = 0.05
+BYTES_PER_SAMPLE = 2
+
+def collect_sources(prefer_mp3=True):
+    """Return [(kind, name, path)] for every key and syllable sound.
+
+    Syllables use the same priority as the app: Google TTS MP3 when present,
+    Moedict OGG otherwise.
+    """
+    sources = []
+    for f in sorted(os.listdir(PUBLIC_AUDIO_DIR)):
+        if f.endswith('.mp3'):
+            sources.append(('keys', f[:-4], os.path.join(PUBLIC_AUDIO_DIR, f)))
+
+    syllables = {}
+    if os.path.isdir(SYLLABLE_DIR_OGG):
+        for f in os.listdir(SYLLABLE_DIR_OGG):
+            if f.endswith('.ogg'):
+                syllables[f[:-4]] = os.path.join(SYLLABLE_DIR_OGG, f)
+    if prefer_mp3 and os.path.isdir(SYLLABLE_DIR_MP3):
+        for f in os.listdir(SYLLABLE_DIR_MP3):
+            if f.endswith('.mp3'):
+                syllables[f[:-4]] = os.path.join(SYLLABLE_DIR_MP3, f)
+
+    for name in sorted(syllables):
+        sources.append(('syllables', name, syllables[name]))
+    return sources
+
+def decode_source(item):
+    _, _, path = item
+    return decode_pcm(path, rate=SPRITE_RATE)
+
+def build_packs(decoded, max_pack_sec):
+    """Lay clips out back to back. Returns (packs, manifest entries)."""
+    gap = bytes(int(GAP_SEC * SPRITE_RATE) * BYTES_PER_SAMPLE)
+    packs = []
+    entries = {'keys': {}, 'syllables': {}}
+    current = bytearray(gap)
+
+    for (kind, name, _), frames in decoded:
+        pack_sec = len(current) / BYTES_PER_SAMPLE / SPRITE_RATE
+        clip_sec = len(frames) / BYTES_PER_SAMPLE / SPRITE_RATE
+        if max_pack_sec and len(current) > len(gap) and pack_sec + clip_sec > max_pack_sec:
+            packs.append(current)
+            current = bytearray(gap)
+
+        entries[kind][name] = {
+            'pack': len(packs),
+            'offset': round(len(current) / BYTES_PER_SAMPLE / SPRITE_RATE, 4),
+            'duration': round(clip_sec, 4),
+        }
+        current += frames
+        current += gap
+
+    packs.append(current)
+    return packs, entries
+
+def main():
+    parser = argparse.ArgumentParser(description="Build audio sprite packs and their manifest.")
+    parser.add_argument('--max-pack-sec', type=float, default=0, help="Split into packs of at most this many seconds (default: one pack)")
+    parser.add_argument('--ogg-only', action='store_true', help="Ignore Google TTS MP3 syllables")
+    add_jobs_argument(parser)
+    args = parser.parse_args()
+
+    sources = collect_sources(prefer_mp3=not args.ogg_only)
+    print(f"Decoding {len(sources)} clips...")
+
+    loudness = load_loudness()
+    decoded = []
+    failed = gained = 0
+    for item, frames in run_jobs(decode_source, sources, args.jobs):
+        if frames is None or len(frames) == 0:
+            print(f"Skipping {item[2]}: decode failed")
+            failed += 1
+            continue
+        gain = file_gain(loudness, item[2])
+        if gain:
+            frames = apply_gain_pcm(frames, gain, SPRITE_RATE)
+            gained += 1
+        decoded.append((item, frames))
+    print(f"Applied loudness gains to {gained} clips.")
+
+    packs, entries = build_packs(decoded, args.max_pack_sec)
+
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    pack_files = []
+    for idx, frames in enumerate(packs):
+        filename = f"sprites-{idx}.ogg"
+        if not encode_pcm(frames, SPRITE_RATE, os.path.join(OUTPUT_DIR, filename), ("-c:a", "libvorbis", "-q:a", "4")):
+            print(f"Failed to encode {filename}")
+            return
+        pack_files.append(filename)
+        print(f"Wrote {filename}: {len(frames) / BYTES_PER_SAMPLE / SPRITE_RATE:.1f}s")
+
+    manifest = {
+        'rate': SPRITE_RATE,
+        'packs': pack_files,
+        'keys': entries['keys'],
+        'syllables': entries['syllables'],
+    }
+    with open(MANIFEST_FILE, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+
+    print(f"Packed {len(entries['keys'])} key and {len(entries['syllables'])} syllable sounds into {len(pack_files)} pack(s).")
+    if failed:
+        print(f"Failed: {failed}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,312 @@
+import argparse
+import ast
+import datetime
+import glob
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+try:
+    from audio_jobs import default_jobs
+except ImportError:
+    sys.path.append(os.path.dirname(__file__))
+    from audio_jobs import default_jobs
+
+# Incremental build driver for the generated data and audio. Each task runs
+# one script; its inputs are files (globs allowed) plus the script and every
+# local module it imports, all compared by content hash against the last
+# successful run. Only stale tasks run; a task whose outputs come out
+# byte-identical doesn't make its dependents stale (editing one TSV row that
+# doesn't move any syllable weight stops at syllable_frequency.json).
+# Dependencies follow from outputs that are another task's inputs, and
+# independent tasks run in parallel.
+#
+#   python3 scripts/build_graph.py              # everything that is stale
+#   python3 scripts/build_graph.py lessons -n   # what would run for lessons, and why
+#
+# Per-file tasks (conditioning, which rewrites the OGGs in place) only get
+# the files that changed since they last ran. State and per-task timings are
+# kept in scripts/.build_state.json.
+#
+# A task with no recorded run whose outputs already exist (a fresh clone)
+# adopts the current files as its baseline instead of running: the committed
+# data and audio are taken as up to date until an input changes. Use --force
+# to rebuild one anyway. Conditioning is lossy and rewrites committed audio,
+# so it is opt-in: it only runs when named as a target or with --force.
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+STATE_FILE = os.path.join(SCRIPTS_DIR, '.build_state.json')
+TIMINGS_KEPT = 20
+
+AUDIO = ['public/audio/*.mp3', 'public/audio/syllables/*.mp3', 'public/audio/syllables_ogg/*.ogg']
+
+class Task:
+    """One script run: inputs -> outputs (paths or globs relative to the repo root)."""
+    def __init__(self, name, script, inputs=(), outputs=(), args=(), per_file=None, opt_in=False):
+        self.name = name
+        self.script = script
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.args = list(args)
+        self.per_file = per_file # glob of files passed on the command line, only the changed ones
+        self.opt_in = opt_in # only run when asked for by name
+        self.sources = module_closure(script)
+
+TASK_SPECS = [
+    ('frequency', 'process_frequency.py', {
+        # Not .reading_cache.json: it is machine-local and only caches what these determine
+        'inputs': ['scripts/frequency.tsv', 'scripts/polyphone_readings.json', 'scripts/moedict_audio_map.json'],
+        'outputs': ['src/data/syllable_frequency.json'],
+    }),
+    ('inventory', 'build_syllable_inventory.py', {
+        'inputs': ['src/data/syllable_frequency.json', 'src/data/keymap.ts', 'scripts/moedict_audio_map.json'],
+        'outputs': ['scripts/syllable_inventory.py', 'src/data/syllable_inventory.json'],
+    }),
+    ('lessons', 'generate_lessons.py', {'outputs': ['src/data/lessons.json']}),
+    ('condition', 'condition_audio.py', {
+        'per_file': 'public/audio/syllables_ogg/*.ogg', 'outputs': ['public/audio/syllables_ogg/*.ogg'], 'opt_in': True,
+    }),
+    ('loudness', 'normalize_audio.py', {'inputs': AUDIO, 'outputs': ['src/data/audio_loudness.json']}),
+    ('transcode', 'transcode_audio.py', {
+        'inputs': AUDIO[1:] + ['src/data/audio_loudness.json'], 'outputs': ['public/audio/syllables_opus/*'],
+    }),
+    ('manifest', 'build_audio_manifest.py', {
+        'inputs': AUDIO + ['src/data/audio_loudness.json', 'public/audio/syllables_opus/*'],
+        'outputs': ['src/data/audio_manifest.json'],
+    }),
+    ('sprites', 'build_audio_sprites.py', {
+        'inputs': AUDIO + ['src/data/audio_loudness.json'], 'outputs': ['public/audio/sprites/*'],
+    }),
+]
+
+def module_closure(script):
+    """The script plus every scripts/ module it imports, transitively (repo-relative paths)."""
+    seen = set()
+    todo = [script[:-3]]
+    while todo:
+        name = todo.pop()
+        path = os.path.join(SCRIPTS_DIR, f"{name}.py")
+        if name in seen or not os.path.exists(path):
+            continue
+        seen.add(name)
+        with open(path, 'r', encoding='utf-8') as f:
+            tree = ast.parse(f.read(), path)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                todo += [alias.name.split('.')[0] for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                todo.append(node.module.split('.')[0])
+    return sorted(f"scripts/{name}.py" for name in seen)
+
+def expand(patterns):
+    """Existing files matching paths/globs, repo-relative and sorted."""
+    files = set()
+    for pattern in patterns:
+        for path in glob.glob(os.path.join(ROOT, pattern)):
+            if os.path.isfile(path):
+                files.add(os.path.relpath(path, ROOT).replace(os.sep, '/'))
+    return sorted(files)
+
+class Hasher:
+    """sha1 per file, reusing the last digest while size and mtime are unchanged."""
+    def __init__(self, stamps):
+        self.stamps = stamps # path -> [size, mtime_ns, sha1]
+
+    def digest(self, rel_path):
+        path = os.path.join(ROOT, rel_path)
+        st = os.stat(path)
+        stamp = self.stamps.get(rel_path)
+        if stamp and stamp[0] == st.st_size and stamp[1] == st.st_mtime_ns:
+            return stamp[2]
+        with open(path, 'rb') as f:
+            sha = hashlib.sha1(f.read()).hexdigest()
+        self.stamps[rel_path] = [st.st_size, st.st_mtime_ns, sha]
+        return sha
+
+    def digests(self, patterns):
+        return {path: self.digest(path) for path in expand(patterns)}
+
+def load_state(path=STATE_FILE):
+    if os.path.exists(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            pass
+    return {'stamps': {}, 'tasks': {}}
+
+def save_state(state, path=STATE_FILE):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp, path)
+
+def dependencies(tasks):
+    """name -> names of the tasks producing one of its inputs."""
+    deps = {}
+    for task in tasks:
+        wanted = set(task.inputs) | set(task.sources) | ({task.per_file} if task.per_file else set())
+        deps[task.name] = [other.name for other in tasks if other is not task and wanted & set(other.outputs)]
+    return deps
+
+def _changed(old, new):
+    changed = sorted(set(old) ^ set(new) | {p for p in set(old) & set(new) if old[p] != new[p]})
+    return f"{changed[0]} changed" + (f" (+{len(changed) - 1} more)" if len(changed) > 1 else "")
+
+def check(task, record, hasher):
+    """(reason it is stale or None, per-file list to pass or None for a whole run)."""
+    inputs = hasher.digests(task.inputs + task.sources)
+    if record is None:
+        return "never built", None
+    if record['inputs'] != inputs:
+        return _changed(record['inputs'], inputs), None
+    if task.per_file:
+        files = hasher.digests([task.per_file])
+        stale = [path for path, sha in files.items() if record['files'].get(path) != sha]
+        return (f"{len(stale)} changed files", stale) if stale else (None, None)
+    outputs = hasher.digests(task.outputs)
+    if record['outputs'] != outputs:
+        return _changed(record['outputs'], outputs) if outputs else "outputs missing", None
+    return None, None
+
+def run_task(task, files):
+    cmd = [sys.executable, os.path.join(SCRIPTS_DIR, task.script), *task.args, *(files or [])]
+    start = time.perf_counter()
+    result = subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True)
+    return result.returncode == 0, time.perf_counter() - start, result.stdout + result.stderr
+
+def outputs_exist(task):
+    return all(expand([pattern]) for pattern in ([task.per_file] if task.per_file else task.outputs))
+
+def record_task(state, task, hasher, seconds=None):
+    previous = state['tasks'].get(task.name) or {}
+    timings = previous.get('timings', []) + ([round(seconds, 3)] if seconds is not None else [])
+    state['tasks'][task.name] = {
+        'inputs': hasher.digests(task.inputs + task.sources),
+        'outputs': {} if task.per_file else hasher.digests(task.outputs),
+        'files': hasher.digests([task.per_file]) if task.per_file else {},
+        'built': datetime.datetime.now().isoformat(timespec='seconds'),
+        'timings': timings[-TIMINGS_KEPT:],
+    }
+
+def upstream(names, deps):
+    wanted = set()
+    todo = list(names)
+    while todo:
+        name = todo.pop()
+        if name not in wanted:
+            wanted.add(name)
+            todo += deps[name]
+    return wanted
+
+def build(tasks, jobs=1, dry_run=False, force=(), verbose=False, state_file=STATE_FILE):
+    """Run every stale task once its dependencies are done; returns {name: (status, seconds, reason)}."""
+    state = load_state(state_file)
+    hasher = Hasher(state['stamps'])
+    deps = dependencies(tasks)
+    results = {}
+    pending = list(tasks)
+    running = {}
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        while pending or running:
+            progress = True
+            while progress:
+                progress = False
+                for task in list(pending):
+                    statuses = [results[d][0] for d in deps[task.name] if d in results]
+                    if len(statuses) < len(deps[task.name]):
+                        continue
+                    pending.remove(task)
+                    progress = True
+                    record = state['tasks'].get(task.name)
+                    if any(s in ('failed', 'blocked') for s in statuses):
+                        results[task.name] = ('blocked', 0.0, "an input task failed")
+                        continue
+                    if dry_run and any(s == 'stale' for s in statuses):
+                        results[task.name] = ('stale', 0.0, "an input task is stale")
+                        continue
+                    if task.name in force:
+                        reason, files = "forced", None
+                    elif record is None and outputs_exist(task) and 'built' not in statuses:
+                        if not dry_run:
+                            record_task(state, task, hasher)
+                        results[task.name] = ('adopted', 0.0, "no recorded run, existing outputs taken as the baseline")
+                        continue
+                    else:
+                        reason, files = check(task, record, hasher)
+                    if reason is None:
+                        results[task.name] = ('fresh', 0.0, "")
+                    elif dry_run:
+                        results[task.name] = ('stale', 0.0, reason)
+                    else:
+                        print(f"[{task.name}] {reason}, running {task.script}{f' on {len(files)} files' if files else ''}", flush=True)
+                        running[pool.submit(run_task, task, files)] = (task, reason)
+
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                task, reason = running.pop(future)
+                ok, seconds, output = future.result()
+                if verbose or not ok:
+                    print(f"--- {task.name} output ---\n{output.rstrip()}")
+                if ok:
+                    record_task(state, task, hasher, seconds)
+                    save_state(state, state_file)
+                results[task.name] = ('built' if ok else 'failed', seconds, reason)
+                print(f"[{task.name}] {'done' if ok else 'FAILED'} in {seconds:.2f}s", flush=True)
+
+    if not dry_run: # a dry run leaves .build_state.json as it was
+        save_state(state, state_file)
+    return results
+
+def main():
+    tasks = [Task(name, script, **spec) for name, script, spec in TASK_SPECS]
+    names = [task.name for task in tasks]
+
+    parser = argparse.ArgumentParser(description="Rebuild only the stale generated data and audio, in dependency order.")
+    parser.add_argument('targets', nargs='*', help=f"Tasks to bring up to date, with what they depend on (default: all but the opt-in {', '.join(t.name for t in tasks if t.opt_in)})")
+    parser.add_argument('-n', '--dry-run', action='store_true', help="Only show what is stale and why")
+    parser.add_argument('--force', action='append', default=[], metavar='TASK', help="Rerun a task even if it is fresh")
+    parser.add_argument('--list', action='store_true', help="Show the tasks, their dependencies and last timings")
+    parser.add_argument('-v', '--verbose', action='store_true', help="Show every task's output")
+    parser.add_argument('-j', '--jobs', type=int, default=default_jobs(), help="Tasks to run at once")
+    args = parser.parse_args()
+
+    unknown = set(args.targets + args.force) - set(names)
+    if unknown:
+        parser.error(f"unknown tasks: {', '.join(sorted(unknown))}")
+
+    deps = dependencies(tasks)
+    if args.list:
+        state = load_state()
+        for task in tasks:
+            timings = state['tasks'].get(task.name, {}).get('timings', [])
+            last = f"last {timings[-1]:.2f}s" if timings else "never built"
+            opt_in = " (opt-in)" if task.opt_in else ""
+            print(f"{task.name:<10} {task.script:<28} after: {', '.join(deps[task.name]) or '-':<22} {last}{opt_in}")
+        return
+
+    wanted = upstream(args.targets, deps) if args.targets else set(names)
+    # Opt-in tasks never run just because something downstream was asked for
+    named = set(args.targets) | set(args.force)
+    tasks = [task for task in tasks if task.name in wanted and (not task.opt_in or task.name in named)]
+
+    start = time.perf_counter()
+    results = build(tasks, args.jobs, args.dry_run, set(args.force), args.verbose)
+    print(f"\n{'task':<10} {'status':<8} {'seconds':>8}  reason")
+    for task in tasks:
+        status, seconds, reason = results[task.name]
+        print(f"{task.name:<10} {status:<8} {seconds:8.2f}  {reason}")
+    print(f"Total {time.perf_counter() - start:.2f}s")
+    if any(status == 'failed' for status, _, _ in results.values()):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+import json
+import os
+import re
+
+try:
+    from alias_table import build_alias_table
+    from moedict_index import SINGLE_SYLLABLE, load_index
+    from valid_syllables import VALID_SYLLABLES_NO_TONE
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(__file__))
+    from alias_table import build_alias_table
+    from moedict_index import SINGLE_SYLLABLE, load_index
+    from valid_syllables import VALID_SYLLABLES_NO_TONE
+
+# Generates the syllable inventory every consumer reads instead of re-deriving
+# it: scripts/syllable_inventory.py (tuples/frozensets for the scripts) and
+# src/data/syllable_inventory.json (flat arrays for the app). One id per base
+# syllable, with its components, attested tones, keystrokes and lesson weight,
+# plus the alias table the app draws weighted lessons from.
+#
+# Inputs: the curated list in valid_syllables.py, plus well-formed syllables
+# from syllable_frequency.json (so the two can't drift), tones attested in the
+# Moedict map, and the key layout in src/data/keymap.ts.
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+FREQUENCY_FILE = os.path.join(ROOT, 'src/data/syllable_frequency.json')
+KEYMAP_FILE = os.path.join(ROOT, 'src/data/keymap.ts')
+PY_OUTPUT = os.path.join(os.path.dirname(__file__), 'syllable_inventory.py')
+JSON_OUTPUT = os.path.join(ROOT, 'src/data/syllable_inventory.json')
+
+INVENTORY_VERSION = 2
+INITIALS = 'ㄅㄆㄇㄈㄉㄊㄋㄌㄍㄎㄏㄐㄑㄒㄓㄔㄕㄖㄗㄘㄙ'
+MEDIALS = 'ㄧㄨㄩ'
+FINALS = 'ㄚㄛㄜㄝㄞㄟㄠㄡㄢㄣㄤㄥㄦ'
+TONE_MARKS = 'ˊˇˋ˙' # tones 2-5; tone 1 is unmarked
+SYMBOLS = INITIALS + MEDIALS + FINALS + TONE_MARKS
+TONE_1_KEY = ' ' # space confirms a first-tone syllable
+
+def parse_keymap(path=KEYMAP_FILE):
+    """symbol -> key, from the ZHUYIN_KEYMAP literal the app uses."""
+    with open(path, 'r', encoding='utf-8') as f:
+        source = f.read()
+    body = source[source.index('ZHUYIN_KEYMAP'):]
+    body = body[:body.index('};')]
+    return {symbol: key for key, symbol in re.findall(r"'(.)':\s*'(.)'", body)}
+
+def split_syllable(syllable):
+    """(initial, medial, final), '' for an empty slot."""
+    initial = syllable[0] if syllable[0] in INITIALS else ''
+    rest = syllable[len(initial):]
+    medial = rest[0] if rest and rest[0] in MEDIALS else ''
+    final = rest[len(medial):]
+    return initial, medial, final
+
+def sort_key(syllable):
+    return tuple(SYMBOLS.index(part) if part else -1 for part in split_syllable(syllable))
+
+def build_inventory():
+    with open(FREQUENCY_FILE, 'r', encoding='utf-8') as f:
+        weights = {s: w for s, w in json.load(f)}
+
+    curated = set(VALID_SYLLABLES_NO_TONE)
+    attested = {s for s in weights if SINGLE_SYLLABLE.match(s) and s}
+    syllables = sorted(curated | attested, key=sort_key)
+
+    index = load_index()
+    tones = {}
+    for syllable in syllables:
+        tones[syllable] = sorted({c.tone for c in index.candidates(syllable)})
+
+    keymap = parse_keymap()
+    missing_keys = set(SYMBOLS) - set(keymap)
+    if missing_keys:
+        raise ValueError(f"No key for {''.join(sorted(missing_keys))} in {KEYMAP_FILE}")
+
+    return {
+        'syllables': syllables,
+        'added': sorted(attested - curated, key=sort_key),
+        'unweighted': [s for s in syllables if s not in weights],
+        'tones': tones,
+        'weights': [weights.get(s, 0) for s in syllables],
+        'keymap': keymap,
+    }
+
+def write_json(inventory, path=JSON_OUTPUT):
+    # Flat, index-aligned arrays: parts/tones/weights map straight onto
+    # Uint8Array/Uint8Array/Uint32Array on the app side
+    threshold, alias, total = build_alias_table(inventory['weights'])
+    parts = []
+    for syllable in inventory['syllables']:
+        parts += [SYMBOLS.index(p) + 1 if p else 0 for p in split_syllable(syllable)]
+    data = {
+        'version': INVENTORY_VERSION,
+        'symbols': SYMBOLS,
+        'keys': ''.join(inventory['keymap'][s] for s in SYMBOLS),
+        'tone1Key': TONE_1_KEY,
+        'syllables': inventory['syllables'],
+        'parts': parts,
+        'tones': [sum(1 << (t - 1) for t in inventory['tones'][s]) for s in inventory['syllables']],
+        'weights': inventory['weights'],
+        'aliasTotal': total,
+        'aliasThreshold': threshold,
+        'alias': alias,
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+        f.write('\n')
+
+def write_module(inventory, path=PY_OUTPUT):
+    keymap = inventory['keymap']
+    keys = {s: keymap[s] for s in SYMBOLS}
+    lines = [
+        "# Generated by build_syllable_inventory.py; do not edit, re-run it instead.",
+        "# Base syllables in id order (same order as src/data/syllable_inventory.json).",
+        "",
+        f"INVENTORY_VERSION = {INVENTORY_VERSION}",
+        "",
+        f"SYLLABLES = {tuple(inventory['syllables'])!r}",
+        "",
+        "# Attested tones per syllable (5 = neutral), from the Moedict map",
+        f"TONES = {tuple(tuple(inventory['tones'][s]) for s in inventory['syllables'])!r}",
+        "",
+        "# Lesson weights from syllable_frequency.json (0 = not in the frequency list)",
+        f"WEIGHTS = {tuple(inventory['weights'])!r}",
+        "",
+        f"INITIALS = {INITIALS!r}",
+        f"MEDIALS = {MEDIALS!r}",
+        f"FINALS = {FINALS!r}",
+        f"TONE_MARKS = {TONE_MARKS!r}",
+        f"SYMBOL_KEYS = {keys!r}",
+        f"TONE_KEYS = {dict([(1, TONE_1_KEY)] + [(i + 2, keymap[m]) for i, m in enumerate(TONE_MARKS)])!r}",
+        "",
+        "SYLLABLE_IDS = {s: i for i, s in enumerate(SYLLABLES)}",
+        "SYLLABLE_SET = frozenset(SYLLABLES)",
+        "",
+        "def split_syllable(syllable):",
+        "    initial = syllable[0] if syllable[0] in INITIALS else ''",
+        "    rest = syllable[len(initial):]",
+        "    medial = rest[0] if rest and rest[0] in MEDIALS else ''",
+        "    return initial, medial, rest[len(medial):]",
+        "",
+        "COMPONENTS = {s: split_syllable(s) for s in SYLLABLES}",
+        "KEYSTROKES = {s: ''.join(SYMBOL_KEYS[c] for c in s) for s in SYLLABLES}",
+        "",
+        "def toned(syllable, tone):",
+        "    return syllable if tone == 1 else syllable + TONE_MARKS[tone - 2]",
+        "",
+        "TONED_SYLLABLES = frozenset(toned(s, t) for s, tones in zip(SYLLABLES, TONES) for t in tones)",
+        "",
+        "def toned_keystrokes(syllable, tone):",
+        "    return KEYSTROKES[syllable] + TONE_KEYS[tone]",
+        "",
+    ]
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines))
+
+def main():
+    inventory = build_inventory()
+    write_module(inventory)
+    write_json(inventory)
+
+    syllables = inventory['syllables']
+    toned = sum(len(t) for t in inventory['tones'].values())
+    print(f"Wrote {len(syllables)} syllables ({toned} toned variants) to {PY_OUTPUT} and {JSON_OUTPUT}")
+    if inventory['added']:
+        print(f"Added from syllable_frequency.json (not in valid_syllables.py): {' '.join(inventory['added'])}")
+    if inventory['unweighted']:
+        print(f"No frequency weight (never drawn in weighted lessons): {' '.join(inventory['unweighted'])}")
+    untoned = [s for s in syllables if not inventory['tones'][s]]
+    if untoned:
+        print(f"No tones attested in the Moedict map: {' '.join(untoned)}")
+
+if __name__ == "__main__":
+    main()
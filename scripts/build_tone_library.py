@@ -0,0 +1,236 @@
+import argparse
+import filecmp
+import json
+import os
+import shutil
+
+try:
+    from audio_cache import AudioCache
+    from audio_fetch import FetchTask, add_fetch_arguments, fetch_all, journal_path, moedict_url
+    from audio_io import decode_pcm_native, encode_pcm
+    from audio_jobs import default_jobs, run_jobs, temp_path
+    from moedict_index import MAPPING_FILE, load_index
+    from syllable_inventory import SYLLABLES, TONES, toned
+    from syllable_vad import is_cut_safe
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(__file__))
+    from audio_cache import AudioCache
+    from audio_fetch import FetchTask, add_fetch_arguments, fetch_all, journal_path, moedict_url
+    from audio_io import decode_pcm_native, encode_pcm
+    from audio_jobs import default_jobs, run_jobs, temp_path
+    from moedict_index import MAPPING_FILE, load_index
+    from syllable_inventory import SYLLABLES, TONES, toned
+    from syllable_vad import is_cut_safe
+
+# Tone-complete syllable library: the best Moedict recording for every
+# syllable in each tone it has (up to five clips per syllable), instead of
+# migrate_audio_to_moedict.py's one clip per toneless syllable.
+#
+# Every candidate recording is indexed per syllable and tone. The best few by
+# word length are downloaded once into a pool (scripts/.moedict_pool/, by
+# Moedict id) and measured through the analysis cache. They are ranked with
+# SCORING, and the winners are copied into the library. Winners that hold
+# more than the syllable (a compound word, or speech after a gap) are cut at
+# their first-syllable boundary instead, if it is one condition_audio.py
+# would cut at (a gap, or a confident valley); otherwise they are kept whole.
+# Changing SCORING and re-running (or --offline) re-ranks from the pool and
+# the cache, with no downloads and no decodes.
+
+LIBRARY_DIR = os.path.join(os.path.dirname(__file__), '../public/audio/syllables_tones')
+POOL_DIR = os.path.join(os.path.dirname(__file__), '.moedict_pool')
+LIBRARY_FILE = 'library.json'
+
+DEFAULT_RATE = 10.0
+FETCH_PER_TONE = 3 # candidates downloaded per syllable and tone
+
+SCORING = {
+    'single_char': 2.0, # a one-character word is the syllable on its own
+    'per_extra_char': -0.5,
+    'duration': 1.0, # full inside ideal_sec, falling off outside it
+    'ideal_sec': [0.3, 0.9],
+    'boundary': 1.5, # x VAD confidence of the first syllable's end
+    'needs_cut': 0.5, # boundary factor when more speech follows it
+}
+
+def tone_targets(index, syllable, tones):
+    """Tones to build for a syllable: the inventory's, plus any Moedict has."""
+    available = {c.tone for c in index.candidates(syllable)} if syllable in index else set()
+    return sorted(set(tones) | available)
+
+def prerank(candidates):
+    """Metadata-only order (no audio needed): shorter words first, then source order."""
+    return sorted(candidates, key=lambda c: c.word_len)
+
+def pool_path(candidate, pool_dir=POOL_DIR):
+    return os.path.join(pool_dir, f"{candidate.id}.ogg")
+
+def score_candidate(candidate, measured, scoring=SCORING):
+    """Rank score for one downloaded candidate, or None if its audio is unusable."""
+    if not measured or measured.get('error') or not measured.get('vad'):
+        return None
+    score = scoring['single_char'] if candidate.word_len == 1 else scoring['per_extra_char'] * (candidate.word_len - 1)
+
+    lo, hi = scoring['ideal_sec']
+    duration = measured['vad']['end'] # the part that would be kept
+    distance = lo - duration if duration < lo else max(0.0, duration - hi)
+    score += scoring['duration'] * max(0.0, 1 - distance / lo)
+
+    boundary = measured['vad']['confidence']
+    if measured['vad']['method'] != 'single':
+        boundary *= scoring['needs_cut']
+    score += scoring['boundary'] * boundary
+    return round(score, 3)
+
+def plan_library(index, fetch_per_tone=FETCH_PER_TONE):
+    """{(syllable, tone): pre-ranked candidates to consider}, and the pairs with none."""
+    plan = {}
+    missing = []
+    for syllable, tones in zip(SYLLABLES, TONES):
+        for tone in tone_targets(index, syllable, tones):
+            candidates = prerank(index.candidates(syllable, tone))[:fetch_per_tone]
+            if candidates:
+                plan[(syllable, tone)] = candidates
+            else:
+                missing.append(toned(syllable, tone))
+    return plan, missing
+
+def cut_point(measured):
+    """Seconds to keep of a candidate, or None to keep it whole.
+
+    Only boundaries condition_audio would cut at too: a low-confidence
+    valley may be a dip inside the syllable, and cutting there would keep
+    half of it.
+    """
+    vad = measured.get('vad') if measured else None
+    if (not vad or not is_cut_safe(vad['method'], vad['confidence'])
+            or vad['end'] >= (measured.get('duration') or 0)):
+        return None
+    return vad['end']
+
+def cut_file(item):
+    """Write the first end_sec of source to dest with one encode; True on success."""
+    source, dest, end_sec = item
+    frames, rate = decode_pcm_native(source)
+    if frames is None:
+        return False
+    temp_out = temp_path(".ogg")
+    if not encode_pcm(frames[:int(end_sec * rate) * 2], rate, temp_out):
+        return False
+    shutil.move(temp_out, dest)
+    return True
+
+def materialize(choices, library_dir, pool_dir=POOL_DIR, cuts=None, previous=None, jobs=1):
+    """Copy the chosen pool files into the library, cutting those in cuts; returns (copied, removed).
+
+    cuts: {(syllable, tone): end_sec}. previous: the last library.json's
+    syllables, so cut clips that are already in place aren't re-encoded.
+    """
+    cuts = cuts or {}
+    previous = previous or {}
+    os.makedirs(library_dir, exist_ok=True)
+    copied = 0
+    wanted = set()
+    to_cut = []
+    for (syllable, tone), (candidate, _) in choices.items():
+        dest = os.path.join(library_dir, f"{toned(syllable, tone)}.ogg")
+        wanted.add(os.path.basename(dest))
+        source = pool_path(candidate, pool_dir)
+        end = cuts.get((syllable, tone))
+        if end is not None:
+            before = previous.get(syllable, {}).get(str(tone), {})
+            if not os.path.exists(dest) or before.get('id') != candidate.id or before.get('cut') != end:
+                to_cut.append((source, dest, end))
+        elif not os.path.exists(dest) or not filecmp.cmp(source, dest, shallow=False):
+            shutil.copyfile(source, dest)
+            copied += 1
+
+    for (source, dest, _), ok in run_jobs(cut_file, to_cut, jobs):
+        if ok:
+            copied += 1
+        else:
+            print(f"  FAILED to cut {source}")
+            if os.path.exists(dest):
+                os.remove(dest) # never leave the previous winner under the new entry
+
+    removed = 0
+    for f in os.listdir(library_dir):
+        if f.endswith('.ogg') and f not in wanted:
+            os.remove(os.path.join(library_dir, f))
+            removed += 1
+    return copied, removed
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a tone-complete Moedict syllable library from the best-scoring recordings.")
+    parser.add_argument('-o', '--output-dir', default=LIBRARY_DIR)
+    parser.add_argument('--fetch-per-tone', type=int, default=FETCH_PER_TONE,
+                        help=f"Candidates to download and score per syllable and tone (default: {FETCH_PER_TONE})")
+    parser.add_argument('--pool-dir', default=POOL_DIR, help="Downloaded candidates, by Moedict id")
+    parser.add_argument('--offline', action='store_true', help="Only re-rank what is already in the pool")
+    parser.add_argument('--measure-jobs', type=int, default=default_jobs(),
+                        help=f"Worker processes for measuring new downloads (default: {default_jobs()})")
+    add_fetch_arguments(parser, DEFAULT_RATE)
+    args = parser.parse_args()
+
+    if not os.path.exists(MAPPING_FILE):
+        print("Mapping file not found.")
+        return
+
+    index = load_index()
+    plan, missing = plan_library(index, args.fetch_per_tone)
+    candidates = {pool_path(c, args.pool_dir): c for options in plan.values() for c in options}
+    print(f"{len(plan)} syllable/tone pairs, {len(candidates)} candidate recordings, {len(missing)} pairs without any")
+
+    if not args.offline:
+        tasks = [FetchTask(moedict_url(c.id), path, f"{c.word} ({c.full})")
+                 for path, c in candidates.items() if not os.path.exists(path)]
+        print(f"Downloading {len(tasks)} new candidates...")
+        for task, result in fetch_all(tasks, args.jobs, args.rate, journal=journal_path('build_tone_library')):
+            if not result.ok:
+                print(f"  FAILED to download {task.label}: {result.error}")
+
+    # Measured once per recording; re-ranking only hashes the pool
+    pooled = [path for path in candidates if os.path.exists(path)]
+    cache = AudioCache()
+    measurements = cache.measure_all(pooled, args.measure_jobs)
+
+    choices = {}
+    for pair, options in plan.items():
+        scored = [(c, score_candidate(c, measurements.get(pool_path(c, args.pool_dir)))) for c in options]
+        scored = [(c, s) for c, s in scored if s is not None]
+        if scored:
+            choices[pair] = max(scored, key=lambda item: item[1])
+        else:
+            missing.append(toned(*pair))
+
+    library_file = os.path.join(args.output_dir, LIBRARY_FILE)
+    previous = {}
+    if os.path.exists(library_file):
+        with open(library_file, 'r', encoding='utf-8') as f:
+            previous = json.load(f).get('syllables', {})
+    cuts = {pair: cut_point(measurements.get(pool_path(candidate, args.pool_dir)))
+            for pair, (candidate, _) in choices.items()}
+    cuts = {pair: end for pair, end in cuts.items() if end is not None}
+    copied, removed = materialize(choices, args.output_dir, args.pool_dir, cuts, previous, args.measure_jobs)
+
+    library = {'scoring': SCORING, 'syllables': {}}
+    for (syllable, tone), (candidate, score) in sorted(choices.items()):
+        entry = {
+            'file': f"{toned(syllable, tone)}.ogg",
+            'word': candidate.word,
+            'id': candidate.id,
+            'score': score,
+        }
+        if (syllable, tone) in cuts:
+            entry['cut'] = cuts[(syllable, tone)] # seconds kept of the word's recording
+        library['syllables'].setdefault(syllable, {})[str(tone)] = entry
+    library['missing'] = sorted(missing)
+    with open(library_file, 'w', encoding='utf-8') as f:
+        json.dump(library, f, ensure_ascii=False, indent=1)
+
+    complete = sum(1 for tones in library['syllables'].values() if len(tones) >= 4)
+    print(f"Library: {len(choices)} clips for {len(library['syllables'])} syllables "
+          f"({complete} with 4+ tones, {len(cuts)} cut from longer words); {copied} updated, {removed} removed, {len(missing)} missing")
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,40 @@
 import os
 
+try:
+    from audio_cache import AudioCache
+    from audio_jobs import default_jobs
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(__file__))
+    from audio_cache import AudioCache
+    from audio_jobs import default_jobs
+
 AUDIO_DIR = os.path.join(os.path.dirname(__file__), '../public/audio/syllables_ogg')
 
-files = [f for f in os.listdir(AUDIO_DIR) if f.endswith('.ogg')]
-print(f"Found {len(files)} OGG files.")
+def main():
+    files = [f for f in os.listdir(AUDIO_DIR) if f.endswith('.ogg')]
+    print(f"Found {len(files)} OGG files.")
+
+    # Durations come from the analysis cache (no ffprobe for unchanged files)
+    paths = [os.path.join(AUDIO_DIR, f) for f in files]
+    measurements = AudioCache().measure_all(paths, default_jobs())
+
+    sizes = []
+    for f, path in zip(files, paths):
+        size = os.path.getsize(path)
+        duration = measurements[path].get('duration') or 0.0
+        sizes.append((f, size, duration))
 
-sizes = []
-for f in files:
-    path = os.path.join(AUDIO_DIR, f)
-    size = os.path.getsize(path)
-    sizes.append((f, size))
+    # Sort by size descending
+    sizes.sort(key=lambda x: x[1], reverse=True)
 
-# Sort by size descending
-sizes.sort(key=lambda x: x[1], reverse=True)
+    print("Top 10 largest files:")
+    for name, size, duration in sizes[:10]:
+        print(f"{name}: {size/1024:.2f} KB ({duration:.2f}s)")
 
-print("Top 10 largest files:")
-for name, size in sizes[:10]:
-    print(f"{name}: {size/1024:.2f} KB")
+    print("\nTop 10 smallest files:")
+    for name, size, duration in sizes[-10:]:
+        print(f"{name}: {size/1024:.2f} KB ({duration:.2f}s)")
 
-print("\nTop 10 smallest files:")
-for name, size in sizes[-10:]:
-    print(f"{name}: {size/1024:.2f} KB")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+import os
+import argparse
+import shutil
+
+import numpy as np
+
+try:
+    from audio_analysis import ONSET, head_trim_time, onset_time, pcm_samples, profile_trim_time
+    from audio_cache import AudioCache
+    from audio_io import decode_pcm_native, encode_pcm
+    from audio_jobs import add_jobs_argument, run_jobs, temp_path
+    from loudness import audio_key, content_hash, load_loudness, measure, save_loudness
+    from normalize_audio import gain_entry
+    from syllable_vad import CUT_CONFIDENCE, first_syllable
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(__file__))
+    from audio_analysis import ONSET, head_trim_time, onset_time, pcm_samples, profile_trim_time
+    from audio_cache import AudioCache
+    from audio_io import decode_pcm_native, encode_pcm
+    from audio_jobs import add_jobs_argument, run_jobs, temp_path
+    from loudness import audio_key, content_hash, load_loudness, measure, save_loudness
+    from normalize_audio import gain_entry
+    from syllable_vad import CUT_CONFIDENCE, first_syllable
+
+# Single-pass conditioning: decode each syllable once, plan every edit in
+# memory, then write it back with a single encode (or not at all).
+# Replaces running process_audio_trim -> batch_fix_long -> normalize_audio,
+# which re-encoded the same clip up to three times. Loudness is measured on
+# the kept window and recorded as a playback gain (see loudness.py), so
+# normalizing never costs an encode.
+
+AUDIO_DIR = os.path.join(os.path.dirname(__file__), '../public/audio/syllables_ogg')
+
+class Edit:
+    """Planned edit for one clip: a sample window, plus its measured loudness."""
+    def __init__(self, length):
+        self.start = 0
+        self.end = length
+        self.loudness = None
+
+    def is_noop(self, length):
+        return self.start == 0 and self.end == length
+
+class TrimHead:
+    """Cut leading silence, keeping pre_roll_ms before the speech onset."""
+    def __init__(self, pre_roll_ms=ONSET['pre_roll_ms'], min_cut_ms=10):
+        self.pre_roll_ms = pre_roll_ms
+        self.min_cut_ms = min_cut_ms
+
+    def plan(self, samples, rate, edit):
+        window = samples[edit.start:edit.end]
+        onset = onset_time(window.tobytes(), rate)
+        cut = head_trim_time(onset, self.pre_roll_ms)
+        if cut * 1000 < self.min_cut_ms:
+            return None
+        edit.start += int(cut * rate)
+        return f"trim head {cut * 1000:.0f} ms (onset {onset:.3f}s)"
+
+class TrimTail:
+    """process_audio_trim: cut after the first speech gap."""
+    def __init__(self, profile='trim', min_sec=0.2):
+        self.profile = profile
+        self.min_sec = min_sec
+
+    def plan(self, samples, rate, edit):
+        window = samples[edit.start:edit.end]
+        trim_point = profile_trim_time(window.tobytes(), rate, self.profile)
+        if not trim_point or trim_point < self.min_sec: # No gap / too short, suspicious
+            return None
+        end = min(edit.end, edit.start + int(trim_point * rate))
+        if end >= edit.end:
+            return None
+        edit.end = end
+        return f"trim tail at {trim_point:.2f}s"
+
+class SplitCompound:
+    """Cut a compound word ("tang shui") after its first syllable where no gap separates them.
+
+    Only clips still over min_sec (find_long_audio.py's threshold) are
+    considered: a single syllable with a dip in it (tone 3) can score as a
+    valley, and cutting it would drop its second half.
+    """
+    def __init__(self, min_confidence=CUT_CONFIDENCE, min_sec=0.8):
+        self.min_confidence = min_confidence
+        self.min_sec = min_sec
+
+    def plan(self, samples, rate, edit):
+        if (edit.end - edit.start) / rate <= self.min_sec:
+            return None
+        boundary = first_syllable(samples[edit.start:edit.end], rate)
+        if not boundary or boundary.method != 'valley' or boundary.confidence < self.min_confidence:
+            return None
+        edit.end = min(edit.end, edit.start + int(boundary.end * rate))
+        return f"split compound at {boundary.end:.2f}s (confidence {boundary.confidence:.2f})"
+
+class LimitLength:
+    """batch_fix_long: clips still over max_sec get a tighter gap trim, or a cut at the VAD boundary."""
+    def __init__(self, max_sec=1.0, profile='fix_long', floor_sec=0.2, floor_to=0.5, fallback_sec=0.8):
+        self.max_sec = max_sec
+        self.profile = profile
+        self.floor_sec = floor_sec
+        self.floor_to = floor_to
+        self.fallback_sec = fallback_sec
+
+    def plan(self, samples, rate, edit):
+        duration = (edit.end - edit.start) / rate
+        if duration <= self.max_sec:
+            return None
+        window = samples[edit.start:edit.end]
+        trim_point = profile_trim_time(window.tobytes(), rate, self.profile)
+        if trim_point:
+            if trim_point < self.floor_sec: trim_point = self.floor_to # Safety floor
+            note = f"long {duration:.2f}s, trim at {trim_point:.2f}s"
+        else:
+            # No gap: end of the first syllable by spectral VAD, blind cut only without speech
+            boundary = first_syllable(window, rate)
+            if boundary and boundary.end >= self.floor_sec:
+                trim_point = boundary.end
+                note = (f"long {duration:.2f}s, no gap, {boundary.method} boundary at {trim_point:.2f}s "
+                        f"(confidence {boundary.confidence:.2f})")
+            else:
+                trim_point = self.fallback_sec
+                note = f"long {duration:.2f}s, no gap, force trim at {trim_point:.2f}s"
+        edit.end = min(edit.end, edit.start + int(trim_point * rate))
+        return note
+
+class MeasureLoudness:
+    """normalize_audio: integrated loudness and true peak of the kept window (not rendered)."""
+    def plan(self, samples, rate, edit):
+        window = samples[edit.start:edit.end]
+        if len(window) == 0:
+            return None
+        edit.loudness = measure(window, rate)
+        if edit.loudness['lufs'] is None:
+            return None
+        return f"{edit.loudness['lufs']:.1f} LUFS"
+
+# Order matters: each stage sees the window left by the previous ones
+STAGES = [
+    TrimHead(),
+    TrimTail(),
+    SplitCompound(),
+    LimitLength(),
+    MeasureLoudness(),
+]
+
+def render(samples, edit):
+    """Apply an Edit to int16 samples, returning s16le bytes."""
+    return np.ascontiguousarray(samples[edit.start:edit.end], dtype='<i2').tobytes()
+
+def condition_file(item):
+    """Plan (and unless dry_run, apply) all stages for one file.
+
+    Returns (status, notes, loudness) where status is 'written', 'planned',
+    'unchanged' or 'error'.
+    """
+    path, dry_run, pre_roll_ms = item
+    frames, rate = decode_pcm_native(path)
+    if frames is None:
+        return 'error', ["decode failed"], None
+
+    samples = pcm_samples(frames)
+    edit = Edit(len(samples))
+    notes = []
+    # Options travel with the item, so workers see them under any start method
+    stages = [TrimHead(pre_roll_ms) if isinstance(stage, TrimHead) else stage for stage in STAGES]
+    for stage in stages:
+        note = stage.plan(samples, rate, edit)
+        if note:
+            notes.append(note)
+
+    if edit.is_noop(len(samples)):
+        return 'unchanged', notes, edit.loudness
+    if dry_run:
+        return 'planned', notes, edit.loudness
+
+    temp_out = temp_path(".ogg")
+    if not encode_pcm(render(samples, edit), rate, temp_out):
+        return 'error', notes + ["encode failed"], None
+    shutil.move(temp_out, path)
+    return 'written', notes, edit.loudness
+
+def main():
+    parser = argparse.ArgumentParser(description="Trim syllable OGGs with a single encode per file and record their loudness gains.")
+    parser.add_argument('files', nargs='*', help="Files to process (default: every .ogg in syllables_ogg)")
+    parser.add_argument('-n', '--dry-run', action='store_true', help="Only report the planned edits")
+    parser.add_argument('--pre-roll', type=float, default=ONSET['pre_roll_ms'],
+                        help=f"Milliseconds kept before the speech onset (default: {ONSET['pre_roll_ms']})")
+    add_jobs_argument(parser)
+    args = parser.parse_args()
+
+    paths = args.files or sorted(os.path.join(AUDIO_DIR, f) for f in os.listdir(AUDIO_DIR) if f.endswith('.ogg'))
+    print(f"Conditioning {len(paths)} files{' (dry run)' if args.dry_run else ''}...")
+
+    cache = AudioCache()
+    counts = {'written': 0, 'planned': 0, 'unchanged': 0, 'error': 0}
+    items = [(path, args.dry_run, args.pre_roll) for path in paths]
+
+    loudness = load_loudness()
+    for (path, _, _), (status, notes, measured) in run_jobs(condition_file, items, args.jobs):
+        counts[status] += 1
+        if notes:
+            print(f"{os.path.basename(path)}: {'; '.join(notes)}{' [ERROR]' if status == 'error' else ''}")
+        if status == 'written':
+            cache.invalidate(path)
+        # Keyed by the hash of the file as it is now, so a dry run records nothing stale
+        key = audio_key(path)
+        if key and measured and measured['lufs'] is not None and status in ('written', 'unchanged'):
+            loudness['files'][key] = gain_entry(
+                path, measured, loudness['target_lufs'], loudness['ceiling_dbtp'], content_hash(path))
+    cache.save()
+    if not args.dry_run:
+        save_loudness(loudness)
+
+    print("-" * 30)
+    print(f"Total: {len(paths)}")
+    if args.dry_run:
+        print(f"Would rewrite: {counts['planned']}")
+    else:
+        print(f"Rewritten: {counts['written']}")
+    print(f"Unchanged: {counts['unchanged']}")
+    print(f"Errors: {counts['error']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+import argparse
+import datetime
+import html
+import json
+import os
+
+import numpy as np
+
+try:
+    from audio_cache import AudioCache
+    from audio_jobs import add_jobs_argument
+    from loudness import PUBLIC_AUDIO_DIR, content_hash, load_loudness
+    from moedict_index import MAPPING_FILE, load_index
+    from normalize_audio import list_audio
+    from syllable_inventory import SYMBOL_KEYS, SYLLABLES
+    from valid_syllables import VALID_SYLLABLES_NO_TONE
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(__file__))
+    from audio_cache import AudioCache
+    from audio_jobs import add_jobs_argument
+    from loudness import PUBLIC_AUDIO_DIR, content_hash, load_loudness
+    from moedict_index import MAPPING_FILE, load_index
+    from normalize_audio import list_audio
+    from syllable_inventory import SYMBOL_KEYS, SYLLABLES
+    from valid_syllables import VALID_SYLLABLES_NO_TONE
+
+# Corpus coverage and health in one pass: a single (cached, parallel) scan of
+# the key MP3s, syllables/ and syllables_ogg/ answers what
+# check_moedict_coverage.py, find_long_audio.py, check_ogg_sizes.py and
+# analyze_audio_gap.py each rescanned for:
+#
+#   - syllables missing vs VALID_SYLLABLES_NO_TONE, the inventory and
+#     syllable_frequency.json (and whether Moedict has them)
+#   - duration and bytes/sec outliers, loudness spread
+#   - suspected compound clips (more speech after the first syllable)
+#
+# Writes JSON and a self-contained HTML summary.
+
+REPORT_DIR = os.path.join(os.path.dirname(__file__), '.corpus_report')
+FREQUENCY_FILE = os.path.join(os.path.dirname(__file__), '../src/data/syllable_frequency.json')
+
+# Same file names as the app (useAudioFeedback.ts)
+KEY_FILES = {'/': 'slash', ',': 'comma', '.': 'period', ';': 'semicolon', '-': 'minus'}
+
+LONG_SEC = 0.8 # find_long_audio.py's threshold
+OUTLIER_Z = 3.5 # robust z-score (median / MAD) that counts as an outlier
+LOUDNESS_SPREAD_LU = 6.0 # clips this far from the median loudness are listed
+SOURCES = {'': 'keys', 'syllables': 'syllables (mp3)', 'syllables_ogg': 'syllables (ogg)'}
+
+def source_of(key):
+    return SOURCES.get(key.rsplit('/', 1)[0] if '/' in key else '', 'other')
+
+def robust_z(values):
+    """(value - median) / (1.4826 * MAD); zeros where the spread is 0."""
+    values = np.asarray(values, dtype=np.float64)
+    median = np.median(values)
+    mad = 1.4826 * np.median(np.abs(values - median))
+    return (values - median) / mad if mad > 0 else np.zeros_like(values)
+
+def percentiles(values):
+    if not values:
+        return None
+    p = np.percentile(values, [0, 10, 50, 90, 100])
+    return {'min': round(p[0], 2), 'p10': round(p[1], 2), 'median': round(p[2], 2),
+            'p90': round(p[3], 2), 'max': round(p[4], 2), 'std': round(float(np.std(values)), 2)}
+
+def scan(paths, audio_dir, jobs):
+    """One row per file from the analysis cache (only new/changed files are decoded)."""
+    measurements = AudioCache().measure_all(paths, jobs)
+    rows = []
+    for path in paths:
+        m = measurements[path]
+        size = os.path.getsize(path)
+        duration = m.get('duration')
+        key = os.path.relpath(path, audio_dir).replace(os.sep, '/') # as in the manifest
+        rows.append({
+            'file': key,
+            'source': source_of(key),
+            'bytes': size,
+            'hash': content_hash(path), # as in the loudness sidecar
+            'duration': round(duration, 3) if duration else None,
+            'kbps': round(size * 8 / duration / 1000, 1) if duration else None,
+            'lufs': m.get('lufs'),
+            'true_peak_db': m.get('true_peak_db'),
+            'onset': m.get('onset'),
+            'vad': m.get('vad'),
+            'error': m.get('error'),
+        })
+    return rows
+
+def coverage(rows):
+    present = {}
+    for row in rows:
+        name = os.path.splitext(os.path.basename(row['file']))[0]
+        present.setdefault(row['source'], set()).add(name)
+    syllables = present.get('syllables (mp3)', set()) | present.get('syllables (ogg)', set())
+
+    frequency = []
+    if os.path.exists(FREQUENCY_FILE):
+        with open(FREQUENCY_FILE, 'r', encoding='utf-8') as f:
+            frequency = json.load(f) # [[syllable, weight], ...]
+    total_weight = sum(weight for _, weight in frequency) or 1
+    missing_frequency = [(s, w) for s, w in frequency if s not in syllables]
+
+    missing_inventory = [s for s in SYLLABLES if s not in syllables]
+    in_moedict = None
+    if os.path.exists(MAPPING_FILE):
+        index = load_index()
+        in_moedict = [s for s in missing_inventory if s in index]
+
+    expected_keys = {KEY_FILES.get(key, key) for key in SYMBOL_KEYS.values()}
+    return {
+        'syllables_with_audio': len(syllables),
+        'missing_valid': [s for s in VALID_SYLLABLES_NO_TONE if s not in syllables],
+        'missing_inventory': missing_inventory,
+        'missing_inventory_in_moedict': in_moedict,
+        'missing_frequency': [s for s, _ in missing_frequency],
+        'missing_frequency_share': round(sum(w for _, w in missing_frequency) / total_weight, 4),
+        'ogg_only': sorted(present.get('syllables (ogg)', set()) - present.get('syllables (mp3)', set())),
+        'missing_keys': sorted(expected_keys - present.get('keys', set())),
+    }
+
+def outliers(rows):
+    """Per source: long clips, and robust duration / bitrate outliers."""
+    found = []
+    for source in sorted({row['source'] for row in rows}):
+        group = [row for row in rows if row['source'] == source and row['duration']]
+        if not group:
+            continue
+        for field in ('duration', 'kbps'):
+            z_scores = robust_z([row[field] for row in group])
+            for row, z in zip(group, z_scores):
+                # Syllables over LONG_SEC are listed even when most of the corpus is long
+                too_long = field == 'duration' and source != 'keys' and row['duration'] > LONG_SEC
+                if abs(z) >= OUTLIER_Z or too_long:
+                    found.append({'file': row['file'], 'field': field, 'value': row[field], 'z': round(float(z), 1)})
+    return sorted(found, key=lambda o: (o['field'], o['file']))
+
+def loudness_report(rows):
+    measured = [row for row in rows if row['lufs'] is not None]
+    lufs = [row['lufs'] for row in measured]
+    report = {'measured': len(measured), 'lufs': percentiles(lufs), 'far_from_median': []}
+    if not lufs:
+        return report
+
+    median = float(np.median(lufs))
+    report['far_from_median'] = sorted(
+        ({'file': row['file'], 'lufs': row['lufs'], 'delta': round(row['lufs'] - median, 1)}
+         for row in measured if abs(row['lufs'] - median) >= LOUDNESS_SPREAD_LU),
+        key=lambda row: row['delta'])
+
+    # Spread after the recorded playback gains (normalize_audio.py), for files
+    # unchanged since they were measured (same content hash as file_gain uses)
+    sidecar = load_loudness()['files']
+    played = [row['lufs'] + sidecar[row['file']]['gain'] for row in measured
+              if row['file'] in sidecar and sidecar[row['file']]['gain'] is not None
+              and sidecar[row['file']]['hash'] == row['hash']]
+    report['after_gain'] = percentiles(played)
+    return report
+
+def compounds(rows):
+    """Syllable clips with more speech after the first syllable, most certain first."""
+    found = [{'file': row['file'], 'method': row['vad']['method'], 'end': row['vad']['end'],
+              'duration': row['duration'], 'confidence': row['vad']['confidence']}
+             for row in rows if row['source'] != 'keys' and row['vad'] and row['vad']['method'] != 'single']
+    return sorted(found, key=lambda row: -row['confidence'])
+
+def build_report(paths, audio_dir, jobs):
+    rows = scan(paths, audio_dir, jobs)
+    by_source = {}
+    for row in rows:
+        stats = by_source.setdefault(row['source'], {'files': 0, 'bytes': 0, 'seconds': 0.0})
+        stats['files'] += 1
+        stats['bytes'] += row['bytes']
+        stats['seconds'] = round(stats['seconds'] + (row['duration'] or 0.0), 2)
+    return {
+        'generated': datetime.datetime.now().isoformat(timespec='seconds'),
+        'sources': by_source,
+        'undecodable': [row['file'] for row in rows if row['error']],
+        'coverage': coverage(rows),
+        'outliers': outliers(rows),
+        'loudness': loudness_report(rows),
+        'compounds': compounds(rows),
+        'files': rows,
+    }
+
+def _table(headers, rows):
+    head = ''.join(f"<th>{html.escape(str(h))}</th>" for h in headers)
+    body = ''.join('<tr>' + ''.join(f"<td>{html.escape('' if v is None else str(v))}</td>" for v in row) + '</tr>'
+                   for row in rows)
+    return f"<table><tr>{head}</tr>{body}</table>"
+
+def _list(items):
+    return f"<p class=\"list\">{html.escape(' '.join(items))}</p>" if items else "<p>None.</p>"
+
+def render_html(report):
+    coverage = report['coverage']
+    loudness = report['loudness']
+    sections = [
+        ("Sources", _table(['source', 'files', 'MB', 'seconds'],
+                           [(s, v['files'], round(v['bytes'] / 1e6, 2), v['seconds']) for s, v in sorted(report['sources'].items())])),
+        (f"Missing vs VALID_SYLLABLES_NO_TONE ({len(coverage['missing_valid'])})", _list(coverage['missing_valid'])),
+        (f"Missing vs inventory ({len(coverage['missing_inventory'])})", _list(coverage['missing_inventory'])),
+        (f"Missing vs syllable_frequency.json ({len(coverage['missing_frequency'])}, "
+         f"{coverage['missing_frequency_share']:.1%} of usage)", _list(coverage['missing_frequency'])),
+        (f"Missing key sounds ({len(coverage['missing_keys'])})", _list(coverage['missing_keys'])),
+        (f"Undecodable ({len(report['undecodable'])})", _list(report['undecodable'])),
+        (f"Outliers ({len(report['outliers'])})",
+         _table(['file', 'field', 'value', 'robust z'], [(o['file'], o['field'], o['value'], o['z']) for o in report['outliers']])),
+        ("Loudness (LUFS)", _table(['', 'min', 'p10', 'median', 'p90', 'max', 'std'],
+                                   [(name, *stats.values()) for name, stats in
+                                    (('measured', loudness['lufs']), ('after gain', loudness.get('after_gain'))) if stats])
+         + _table(['file', 'LUFS', 'vs median'], [(r['file'], r['lufs'], r['delta']) for r in loudness['far_from_median']])),
+        (f"Suspected compound clips ({len(report['compounds'])})",
+         _table(['file', 'method', 'first syllable ends', 'duration', 'confidence'],
+                [(c['file'], c['method'], c['end'], c['duration'], c['confidence']) for c in report['compounds']])),
+    ]
+    body = ''.join(f"<h2>{html.escape(title)}</h2>{content}" for title, content in sections)
+    return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Audio corpus report</title>
+<style>
+body {{ font-family: sans-serif; margin: 2em; }}
+table {{ border-collapse: collapse; margin-bottom: 1em; }}
+th, td {{ border: 1px solid #ccc; padding: 2px 8px; text-align: left; }}
+.list {{ max-width: 60em; line-height: 1.6; }}
+</style></head>
+<body><h1>Audio corpus report</h1><p>Generated {html.escape(report['generated'])}</p>{body}</body></html>
+"""
+
+def main():
+    parser = argparse.ArgumentParser(description="Coverage and health report for the key and syllable audio, from one cached scan.")
+    parser.add_argument('-o', '--output', default=os.path.join(REPORT_DIR, 'report.json'))
+    parser.add_argument('--html', default=os.path.join(REPORT_DIR, 'report.html'))
+    parser.add_argument('--audio-dir', default=PUBLIC_AUDIO_DIR)
+    add_jobs_argument(parser)
+    args = parser.parse_args()
+
+    paths = list_audio(args.audio_dir)
+    print(f"Scanning {len(paths)} files...")
+    report = build_report(paths, args.audio_dir, args.jobs)
+
+    for path, content in ((args.output, json.dumps(report, ensure_ascii=False, indent=1)), (args.html, render_html(report))):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+
+    coverage = report['coverage']
+    for source, stats in sorted(report['sources'].items()):
+        print(f"{source}: {stats['files']} files, {stats['bytes'] / 1e6:.1f} MB, {stats['seconds']:.0f}s")
+    print(f"Syllables with audio: {coverage['syllables_with_audio']}; missing {len(coverage['missing_valid'])} valid, "
+          f"{len(coverage['missing_inventory'])} inventory, {len(coverage['missing_frequency'])} frequency-list "
+          f"({coverage['missing_frequency_share']:.1%} of usage), {len(coverage['missing_keys'])} key sounds")
+    if coverage['missing_inventory_in_moedict']:
+        print(f"  {len(coverage['missing_inventory_in_moedict'])} of the missing are in Moedict (migrate_audio_to_moedict.py)")
+    print(f"Undecodable: {len(report['undecodable'])}, outliers: {len(report['outliers'])}, "
+          f"suspected compounds: {len(report['compounds'])}")
+    if report['loudness']['lufs']:
+        lufs = report['loudness']['lufs']
+        print(f"Loudness: {lufs['min']} .. {lufs['max']} LUFS (median {lufs['median']}, std {lufs['std']})")
+    print(f"Wrote {args.output} and {args.html}")
+
+if __name__ == "__main__":
+    main()
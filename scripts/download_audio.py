@@ -1,5 +1,12 @@
+import argparse
 import os
-import requests
+
+try:
+    from audio_fetch import FetchTask, add_fetch_arguments, fetch_all, journal_path, tts_url
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(__file__))
+    from audio_fetch import FetchTask, add_fetch_arguments, fetch_all, journal_path, tts_url
 
 # Standard Zhuyin Layout Mapping with Keys
 KEYMAP = {
@@ -18,25 +25,19 @@ KEYMAP = {
 
 OUTPUT_DIR = os.path.join(os.path.dirname(__file__), '../public/audio')
 
-def download_audio(char, filename):
-    url = f"https://translate.google.com/translate_tts?ie=UTF-8&q={char}&tl=zh-TW&client=tw-ob"
-    try:
-        response = requests.get(url, headers={'User-Agent': 'Mozilla/5.0'})
-        if response.status_code == 200:
-            with open(filename, 'wb') as f:
-                f.write(response.content)
-            print(f"Downloaded: {char} -> {filename}")
-        else:
-            print(f"Failed to download {char}: Status {response.status_code}")
-    except Exception as e:
-        print(f"Error downloading {char}: {e}")
+DEFAULT_RATE = 2.0
 
 def main():
-    if not os.path.exists(OUTPUT_DIR):
-        os.makedirs(OUTPUT_DIR)
+    parser = argparse.ArgumentParser(description="Download Google TTS audio for every keyboard key.")
+    parser.add_argument('-o', '--output-dir', default=OUTPUT_DIR)
+    add_fetch_arguments(parser, DEFAULT_RATE)
+    args = parser.parse_args()
+
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    print(f"Downloading {len(KEYMAP)} audio files to {args.output_dir}...")
 
-    print(f"Downloading {len(KEYMAP)} audio files to {OUTPUT_DIR}...")
-    
+    tasks = []
     for key, char in KEYMAP.items():
         # Clean filename to be safe
         safe_key = key
@@ -46,10 +47,16 @@ def main():
         if key == ';': safe_key = 'semicolon'
         if key == '-': safe_key = 'minus'
         
-        filename = os.path.join(OUTPUT_DIR, f"{safe_key}.mp3")
-        
-        # Download only if not exists (or force overwrite)
-        download_audio(char, filename)
+        filename = os.path.join(args.output_dir, f"{safe_key}.mp3")
+
+        # Always overwrite; the journal only skips files this run already fetched
+        tasks.append(FetchTask(tts_url(char), filename, char))
+
+    for task, result in fetch_all(tasks, args.jobs, args.rate, journal=journal_path('download_audio')):
+        if result.ok:
+            print(f"Downloaded: {task.label} -> {task.dest}")
+        else:
+            print(f"Failed to download {task.label}: {result.error}")
 
 if __name__ == "__main__":
     main()
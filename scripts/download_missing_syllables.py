@@ -1,35 +1,31 @@
+import argparse
 import os
 import json
-import time
-import requests
+
+try:
+    from audio_fetch import FetchTask, add_fetch_arguments, fetch_all, journal_path, tts_url
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(__file__))
+    from audio_fetch import FetchTask, add_fetch_arguments, fetch_all, journal_path, tts_url
 
 # Paths
 FREQUENCY_FILE = os.path.join(os.path.dirname(__file__), '../src/data/syllable_frequency.json')
 AUDIO_DIR = os.path.join(os.path.dirname(__file__), '../public/audio/syllables')
 
-def download_audio(text, filename):
-    url = f"https://translate.google.com/translate_tts?ie=UTF-8&q={text}&tl=zh-TW&client=tw-ob"
-    try:
-        response = requests.get(url, headers={'User-Agent': 'Mozilla/5.0'})
-        if response.status_code == 200:
-            with open(filename, 'wb') as f:
-                f.write(response.content)
-            print(f"Downloaded: {text} -> {filename}")
-            return True
-        else:
-            print(f"Failed to download {text}: Status {response.status_code}")
-            return False
-    except Exception as e:
-        print(f"Error downloading {text}: {e}")
-        return False
+DEFAULT_RATE = 2.0 # Be nice to API
 
 def main():
+    parser = argparse.ArgumentParser(description="Download TTS audio for syllables in the frequency list that have none.")
+    parser.add_argument('-o', '--output-dir', default=AUDIO_DIR)
+    add_fetch_arguments(parser, DEFAULT_RATE)
+    args = parser.parse_args()
+
     if not os.path.exists(FREQUENCY_FILE):
         print(f"Frequency file not found: {FREQUENCY_FILE}")
         return
 
-    if not os.path.exists(AUDIO_DIR):
-        os.makedirs(AUDIO_DIR)
+    os.makedirs(args.output_dir, exist_ok=True)
 
     print("Loading syllable frequency data...")
     with open(FREQUENCY_FILE, 'r', encoding='utf-8') as f:
@@ -39,22 +35,24 @@ def main():
     syllables = [item[0] for item in data]
     print(f"Found {len(syllables)} syllables in frequency list.")
 
-    missing_count = 0
-    downloaded_count = 0
-
+    tasks = []
     for syllable in syllables:
-        filename = os.path.join(AUDIO_DIR, f"{syllable}.mp3")
-        
+        filename = os.path.join(args.output_dir, f"{syllable}.mp3")
+
         if not os.path.exists(filename):
             print(f"Missing audio for: {syllable}")
-            missing_count += 1
-            
-            if download_audio(syllable, filename):
-                downloaded_count += 1
-                time.sleep(0.5) # Be nice to API
-            
+            tasks.append(FetchTask(tts_url(syllable), filename, syllable))
+
+    downloaded_count = 0
+    for task, result in fetch_all(tasks, args.jobs, args.rate, journal=journal_path('download_missing_syllables')):
+        if result.ok:
+            print(f"Downloaded: {task.label} -> {task.dest}")
+            downloaded_count += 1
+        else:
+            print(f"Failed to download {task.label}: {result.error}")
+
     print(f"Scan complete.")
-    print(f"Missing files initially: {missing_count}")
+    print(f"Missing files initially: {len(tasks)}")
     print(f"Downloaded: {downloaded_count}")
 
 if __name__ == "__main__":
@@ -1,46 +1,47 @@
+import argparse
 import os
-import requests
-import time
-from valid_syllables import VALID_SYLLABLES_NO_TONE
+
+try:
+    from syllable_inventory import SYLLABLES
+    from audio_fetch import FetchTask, add_fetch_arguments, fetch_all, journal_path, tts_url
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(__file__))
+    from syllable_inventory import SYLLABLES
+    from audio_fetch import FetchTask, add_fetch_arguments, fetch_all, journal_path, tts_url
 
 OUTPUT_DIR = os.path.join(os.path.dirname(__file__), '../public/audio/syllables')
 
-def download_audio(text, filename):
-    # Google TTS URL
-    url = f"https://translate.google.com/translate_tts?ie=UTF-8&q={text}&tl=zh-TW&client=tw-ob"
-    try:
-        response = requests.get(url, headers={'User-Agent': 'Mozilla/5.0'})
-        if response.status_code == 200:
-            with open(filename, 'wb') as f:
-                f.write(response.content)
-            print(f"Downloaded: {text} -> {filename}")
-            return True
-        else:
-            print(f"Failed to download {text}: Status {response.status_code}")
-            return False
-    except Exception as e:
-        print(f"Error downloading {text}: {e}")
-        return False
+# Be nice to the API: the old script slept 0.5s between files
+DEFAULT_RATE = 2.0
 
 def main():
-    if not os.path.exists(OUTPUT_DIR):
-        os.makedirs(OUTPUT_DIR)
+    parser = argparse.ArgumentParser(description="Download Google TTS audio for every valid syllable.")
+    parser.add_argument('-o', '--output-dir', default=OUTPUT_DIR)
+    add_fetch_arguments(parser, DEFAULT_RATE)
+    args = parser.parse_args()
+
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    print(f"Downloading {len(SYLLABLES)} syllable audio files to {args.output_dir}...")
+
+    tasks = []
+    for syllable in SYLLABLES:
+        filename = os.path.join(args.output_dir, f"{syllable}.mp3")
 
-    print(f"Downloading {len(VALID_SYLLABLES_NO_TONE)} syllable audio files to {OUTPUT_DIR}...")
-    
-    count = 0
-    for syllable in VALID_SYLLABLES_NO_TONE:
-        filename = os.path.join(OUTPUT_DIR, f"{syllable}.mp3")
-        
         # Skip if exists to save bandwidth/time
         if os.path.exists(filename):
             continue
-            
-        if download_audio(syllable, filename):
+        tasks.append(FetchTask(tts_url(syllable), filename, syllable))
+
+    count = 0
+    for task, result in fetch_all(tasks, args.jobs, args.rate, journal=journal_path('download_syllables')):
+        if result.ok:
+            print(f"Downloaded: {task.label} -> {task.dest}")
             count += 1
-            # Be nice to the API
-            time.sleep(0.5)
-            
+        else:
+            print(f"Failed to download {task.label}: {result.error}")
+
     print(f"Finished. Downloaded {count} new files.")
 
 if __name__ == "__main__":
@@ -1,26 +1,33 @@
 import os
-import subprocess
-import re
+import argparse
 
-AUDIO_DIR = os.path.join(os.path.dirname(__file__), '../public/audio/syllables_ogg')
+try:
+    from audio_cache import AudioCache
+    from audio_jobs import add_jobs_argument
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(__file__))
+    from audio_cache import AudioCache
+    from audio_jobs import add_jobs_argument
 
-def get_duration(file_path):
-    cmd = ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "default=noprint_wrappers=1:nokey=1", file_path]
-    result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-    try:
-        return float(result.stdout.strip())
-    except:
-        return 0.0
+AUDIO_DIR = os.path.join(os.path.dirname(__file__), '../public/audio/syllables_ogg')
 
 def main():
+    parser = argparse.ArgumentParser(description="List syllable OGGs longer than 0.8s.")
+    add_jobs_argument(parser)
+    args = parser.parse_args()
+
     files = [f for f in os.listdir(AUDIO_DIR) if f.endswith('.ogg')]
     print(f"Checking {len(files)} files for duration > 0.8s...")
     
+    # Durations come from the analysis cache; only new/changed files get decoded
+    paths = [os.path.join(AUDIO_DIR, f) for f in files]
+    measurements = AudioCache().measure_all(paths, args.jobs)
+    
     long_files = []
     
-    for f in files:
-        path = os.path.join(AUDIO_DIR, f)
-        duration = get_duration(path)
+    for f, path in zip(files, paths):
+        duration = measurements[path].get('duration') or 0.0
         if duration > 0.8:
             long_files.append((f, duration))
             
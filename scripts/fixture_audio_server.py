@@ -0,0 +1,125 @@
+import argparse
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+# Local stand-in for the Google TTS and Moedict audio hosts, serving fixture
+# audio so the download scripts can be exercised offline:
+#
+#   python3 scripts/fixture_audio_server.py --port 8765 --fail-rate 0.2 &
+#   TTS_URL=http://127.0.0.1:8765/translate_tts \
+#   MOEDICT_AUDIO_URL=http://127.0.0.1:8765 \
+#       python3 scripts/download_syllables.py --output-dir /tmp/syllables
+#
+# /translate_tts?q=ㄅㄚ serves <fixtures>/ㄅㄚ.mp3 and /1220.ogg serves
+# <fixtures>/1220.ogg. Unknown names get any fixture with the same extension
+# unless --strict is set. Responses are HTTP/1.1 keep-alive, and the server
+# counts requests and connections so pooling is visible.
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), '../public/audio')
+
+CONTENT_TYPES = {'.mp3': 'audio/mpeg', '.ogg': 'audio/ogg', '.opus': 'audio/ogg'}
+
+def index_fixtures(fixture_dir):
+    """basename -> path for every audio file under fixture_dir (first one wins)."""
+    fixtures = {}
+    for root, _, files in sorted(os.walk(fixture_dir)):
+        for f in sorted(files):
+            if os.path.splitext(f)[1] in CONTENT_TYPES:
+                fixtures.setdefault(f, os.path.join(root, f))
+    return fixtures
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests += 1
+            server.connections.add(self.client_address)
+
+        if server.latency:
+            time.sleep(server.latency)
+        if server.fail_rate and server.rng.random() < server.fail_rate:
+            self._send(503, b'', {'Retry-After': '0'})
+            return
+
+        url = urlsplit(self.path)
+        if url.path.endswith('/translate_tts'):
+            name = parse_qs(url.query).get('q', [''])[0] + '.mp3'
+        else:
+            name = unquote(os.path.basename(url.path))
+
+        path = server.fixtures.get(name)
+        ext = os.path.splitext(name)[1]
+        if path is None and not server.strict:
+            path = server.fallbacks.get(ext)
+        if path is None:
+            self._send(404, b'')
+            return
+
+        with open(path, 'rb') as f:
+            self._send(200, f.read(), {'Content-Type': CONTENT_TYPES[ext]})
+
+    def _send(self, status, body, headers=None):
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+def make_server(fixture_dir=FIXTURE_DIR, port=0, fail_rate=0.0, latency=0.0, strict=False, seed=None, verbose=False):
+    """Create (not start) a server. port=0 picks a free port; see server.server_port."""
+    server = ThreadingHTTPServer(('127.0.0.1', port), FixtureHandler)
+    server.daemon_threads = True
+    server.fixtures = index_fixtures(fixture_dir)
+    server.fallbacks = {}
+    for name, path in server.fixtures.items():
+        server.fallbacks.setdefault(os.path.splitext(name)[1], path)
+    server.fail_rate = fail_rate
+    server.latency = latency
+    server.strict = strict
+    server.rng = random.Random(seed)
+    server.verbose = verbose
+    server.lock = threading.Lock()
+    server.requests = 0
+    server.connections = set()
+    return server
+
+def serve_in_background(**kwargs):
+    """Start a server on a daemon thread and return (server, base_url)."""
+    server = make_server(**kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve fixture audio in place of the TTS/Moedict hosts.")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--fixtures', default=FIXTURE_DIR, help="Directory of .mp3/.ogg fixtures (searched recursively)")
+    parser.add_argument('--fail-rate', type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds to wait before each response")
+    parser.add_argument('--strict', action='store_true', help="404 for names with no fixture")
+    parser.add_argument('--seed', type=int, help="Seed for --fail-rate")
+    parser.add_argument('-v', '--verbose', action='store_true', help="Log every request")
+    args = parser.parse_args()
+
+    server = make_server(args.fixtures, args.port, args.fail_rate, args.latency, args.strict, args.seed, args.verbose)
+    print(f"Serving {len(server.fixtures)} fixtures from {args.fixtures} on http://127.0.0.1:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"{server.requests} requests over {len(server.connections)} connections")
+
+if __name__ == "__main__":
+    main()
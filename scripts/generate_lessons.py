@@ -1,32 +1,100 @@
+import argparse
 import json
 import random
 import os
-from valid_syllables import VALID_SYLLABLES_NO_TONE
 
-def generate_random_lesson(count=20):
-    return random.choices(VALID_SYLLABLES_NO_TONE, k=count)
+try:
+    from adaptive_lessons import AdaptiveModel
+    from alias_table import AliasSampler
+    from syllable_inventory import SYLLABLES, WEIGHTS
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(__file__))
+    from adaptive_lessons import AdaptiveModel
+    from alias_table import AliasSampler
+    from syllable_inventory import SYLLABLES, WEIGHTS
 
-def generate_lessons():
+OUTPUT_FILE = os.path.join(os.path.dirname(__file__), "../src/data/lessons.json")
+
+# Draws are weighted by syllable frequency (alias table, O(1) per syllable),
+# or by an adaptive model's weights with --model
+_sampler = None
+
+def get_sampler():
+    global _sampler
+    if _sampler is None:
+        _sampler = AliasSampler(SYLLABLES, WEIGHTS)
+    return _sampler
+
+def use_weights(weights):
+    global _sampler
+    _sampler = AliasSampler(SYLLABLES, weights)
+
+def lesson_rng(seed, index):
+    # One stream per lesson: lesson N is the same whatever the bank size.
+    # String seeds are hashed with SHA-512, so this is stable across runs.
+    return random.Random(f"{seed}:{index}")
+
+def generate_random_lesson(count=20, rng=random):
+    return get_sampler().sample(count, rng)
+
+def generate_bank(count, length, seed):
+    """`count` weighted lessons of `length` syllables, reproducible from `seed`."""
+    return [
+        {
+            "id": f"bank-{seed}-{i + 1}",
+            "name": f"Weighted {length} Syllables #{i + 1}",
+            "content": generate_random_lesson(length, lesson_rng(seed, i)),
+        }
+        for i in range(count)
+    ]
+
+def generate_lessons(seed=0):
     lessons = [
         {
             "id": "syllables-20",
             "name": "Random 20 Syllables",
-            "content": generate_random_lesson(20) # Now returning list of strings
+            "content": generate_random_lesson(20, lesson_rng(seed, "syllables-20")) # Now returning list of strings
         },
         {
             "id": "syllables-50",
             "name": "Random 50 Syllables",
-            "content": generate_random_lesson(50)
+            "content": generate_random_lesson(50, lesson_rng(seed, "syllables-50"))
         }
     ]
-    
-    output_path = os.path.join(os.path.dirname(__file__), "../src/data/lessons.json")
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    
+    return lessons
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate weighted, seeded syllable lessons.")
+    parser.add_argument('-o', '--output', default=OUTPUT_FILE)
+    parser.add_argument('--seed', default=0, help="Same seed, same lessons (default: 0)")
+    parser.add_argument('--bank', type=int, metavar='N',
+                        help="Write a bank of N lessons instead of the app's default lessons")
+    parser.add_argument('--length', type=int, default=24, help="Syllables per bank lesson (default: 24)")
+    parser.add_argument('--model', help="Adaptive model (adaptive_lessons.py) to oversample weak keys with")
+    args = parser.parse_args(argv)
+
+    if args.model:
+        use_weights(AdaptiveModel.load(args.model).syllable_weights())
+
+    if args.bank is not None:
+        lessons = generate_bank(args.bank, args.length, args.seed)
+    else:
+        lessons = generate_lessons(args.seed)
+
+    output_path = args.output
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+
     with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(lessons, f, ensure_ascii=False, indent=2)
-    
+        if args.bank is not None:
+            # One lesson per line keeps large banks compact but still diffable
+            f.write("[\n")
+            f.write(",\n".join(json.dumps(lesson, ensure_ascii=False) for lesson in lessons))
+            f.write("\n]\n")
+        else:
+            json.dump(lessons, f, ensure_ascii=False, indent=2)
+
     print(f"Generated {len(lessons)} lessons to {output_path}")
 
 if __name__ == "__main__":
-    generate_lessons()
+    main()
@@ -1,26 +1,17 @@
 import json
 import os
-import requests
 import random
 
+try:
+    from audio_fetch import FetchTask, fetch_all, moedict_url
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(__file__))
+    from audio_fetch import FetchTask, fetch_all, moedict_url
+
 MAPPING_FILE = os.path.join(os.path.dirname(__file__), 'moedict_audio_map.json')
 OUTPUT_DIR = os.path.join(os.path.dirname(__file__), '../public/audio/moedict_test')
 
-def download_file(url, filename):
-    try:
-        r = requests.get(url, headers={'User-Agent': 'Mozilla/5.0'})
-        if r.status_code == 200:
-            with open(filename, 'wb') as f:
-                f.write(r.content)
-            print(f"Downloaded: {filename}")
-            return True
-        else:
-            print(f"Failed to download {url}: {r.status_code}")
-            return False
-    except Exception as e:
-        print(f"Error: {e}")
-        return False
-
 def main():
     if not os.path.exists(MAPPING_FILE):
         print("Mapping file not found.")
@@ -55,9 +46,9 @@ def main():
     
     # Actually, let's try to just download a few random ones from the list/dict
     
-    count = 0
+    tasks = []
     for key in data:
-        if count >= 3: break
+        if len(tasks) >= 3: break
         
         # If it's a dict, key is the word identifier
         # If list, key is an item
@@ -66,12 +57,17 @@ def main():
         if isinstance(data, dict):
             # key might be "町.ㄉㄧㄥ", value "1220"
             audio_id = data[key]
-            url = f"http://a.moedict.tw/{audio_id}.ogg"
+            url = moedict_url(audio_id)
             filename = os.path.join(OUTPUT_DIR, f"{audio_id}.ogg")
             print(f"Attempting to download {key} -> {url}")
-            download_file(url, filename)
-            count += 1
-            
+            tasks.append(FetchTask(url, filename))
+
+    for task, result in fetch_all(tasks):
+        if result.ok:
+            print(f"Downloaded: {task.dest}")
+        else:
+            print(f"Failed to download {task.url}: {result.error}")
+
     print("Done.")
 
 if __name__ == "__main__":
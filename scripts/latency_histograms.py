@@ -0,0 +1,127 @@
+import argparse
+import bisect
+import json
+import os
+
+try:
+    from adaptive_lessons import MAX_GAP_MS, read_sessions
+    from syllable_inventory import SYMBOL_KEYS
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(__file__))
+    from adaptive_lessons import MAX_GAP_MS, read_sessions
+    from syllable_inventory import SYMBOL_KEYS
+
+# Per-key inter-key latency histograms from session logs exported by the app
+# (keystroke times come from the engine's ring buffer, see
+# src/utils/KeystrokeRing.ts). The interval before each correct keystroke is
+# counted against the Zhuyin symbol it typed. Sessions are streamed and only
+# the bin counts are kept, so any number of exports can be aggregated;
+# percentiles are interpolated within bins.
+
+# Log-spaced bin edges, 20 ms .. MAX_GAP_MS, ~12% wide
+BIN_RATIO = 1.12
+MIN_MS = 20.0
+
+def bin_edges(lo=MIN_MS, hi=MAX_GAP_MS, ratio=BIN_RATIO):
+    edges = [lo]
+    while edges[-1] < hi:
+        edges.append(round(edges[-1] * ratio, 1))
+    return edges
+
+class Histogram:
+    def __init__(self, edges):
+        self.edges = edges
+        # counts[0] is below edges[0], counts[i] is edges[i-1]..edges[i]
+        self.counts = [0] * (len(edges) + 1)
+        self.total = 0
+        self.sum = 0.0
+
+    def add(self, ms):
+        self.counts[bisect.bisect_right(self.edges, ms)] += 1
+        self.total += 1
+        self.sum += ms
+
+    def percentile(self, q):
+        if not self.total:
+            return None
+        target = q * self.total
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= target:
+                lo = self.edges[i - 1] if i > 0 else 0.0
+                hi = self.edges[i] if i < len(self.edges) else self.edges[-1]
+                return lo + (hi - lo) * (target - seen) / n
+            seen += n
+        return self.edges[-1]
+
+    def to_json(self):
+        return {
+            'count': self.total,
+            'mean': round(self.sum / self.total, 1) if self.total else None,
+            'p50': round(self.percentile(0.5), 1) if self.total else None,
+            'p90': round(self.percentile(0.9), 1) if self.total else None,
+            'counts': self.counts,
+        }
+
+def aggregate(sessions, edges):
+    """({symbol: Histogram}, overall Histogram, sessions used)."""
+    histograms = {}
+    overall = Histogram(edges)
+    seen = set()
+    for session in sessions:
+        if session['id'] in seen:
+            continue # overlapping exports
+        seen.add(session['id'])
+
+        syllables = session['syllables']
+        prev_ms = None
+        for s, c, _key, ok, ms in session['keystrokes']:
+            interval = None if prev_ms is None else ms - prev_ms
+            prev_ms = ms
+            if not ok or interval is None or interval > MAX_GAP_MS:
+                continue
+            if s >= len(syllables) or c >= len(syllables[s]):
+                continue
+            symbol = syllables[s][c]
+            if symbol not in histograms:
+                histograms[symbol] = Histogram(edges)
+            histograms[symbol].add(interval)
+            overall.add(interval)
+    return histograms, overall, len(seen)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Aggregate exported session logs into per-key latency histograms.")
+    parser.add_argument('sessions', nargs='+', help="Session log JSON files (exports from the app)")
+    parser.add_argument('-o', '--output', help="Write the histograms as JSON")
+    parser.add_argument('--top', type=int, default=10, help="Slowest keys to list")
+    args = parser.parse_args(argv)
+
+    edges = bin_edges()
+    histograms, overall, count = aggregate(read_sessions(args.sessions), edges)
+    if not overall.total:
+        print("No keystroke intervals found.")
+        return
+
+    print(f"{count} sessions, {overall.total} intervals: "
+          f"p50 {overall.percentile(0.5):.0f} ms, p90 {overall.percentile(0.9):.0f} ms")
+    print("\nSlowest keys (by p50):")
+    ranked = sorted(histograms.items(), key=lambda item: -item[1].percentile(0.5))
+    for symbol, h in ranked[:args.top]:
+        print(f"  {symbol} [{SYMBOL_KEYS.get(symbol, '?')}]  p50 {h.percentile(0.5):4.0f} ms  "
+              f"p90 {h.percentile(0.9):4.0f} ms  n={h.total}")
+
+    if args.output:
+        data = {
+            'sessions': count,
+            'edges': edges,
+            'overall': overall.to_json(),
+            'keys': {symbol: dict(key=SYMBOL_KEYS.get(symbol), **h.to_json())
+                     for symbol, h in sorted(histograms.items())},
+        }
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=1)
+        print(f"\nWrote {args.output}")
+
+if __name__ == "__main__":
+    main()
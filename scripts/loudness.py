@@ -0,0 +1,168 @@
+import hashlib
+import json
+import math
+import os
+
+import numpy as np
+
+# Integrated loudness (ITU-R BS.1770-4 / EBU R128) and true peak, vectorized
+# with numpy, plus the loudness sidecar the app and sprite builder read.
+#
+# Gains are not rendered into the audio: normalize_audio.py and
+# condition_audio.py record a playback gain per file in LOUDNESS_FILE, and
+# build_audio_manifest.py / build_audio_sprites.py pick it up by content hash.
+
+PUBLIC_AUDIO_DIR = os.path.join(os.path.dirname(__file__), '../public/audio')
+LOUDNESS_FILE = os.path.join(os.path.dirname(__file__), '../src/data/audio_loudness.json')
+
+TARGET_LUFS = -18.0
+CEILING_DBTP = -1.0 # true-peak limit after gain
+LIMITER_MS = 5 # attack/release of the safety limiter in apply_gain_pcm
+
+BLOCK_SEC = 0.4
+STEP_SEC = 0.1 # 75% block overlap
+ABSOLUTE_GATE = -70.0
+RELATIVE_GATE = -10.0
+OVERSAMPLE = 4
+
+def _biquad_response(b, a, w):
+    z = np.exp(-1j * w)
+    return (b[0] + b[1] * z + b[2] * z * z) / (a[0] + a[1] * z + a[2] * z * z)
+
+def k_weighting_response(rate, n_bins, n_fft):
+    """Complex response of the BS.1770 K-weighting filter (shelf + high-pass) at rfft bins."""
+    w = 2 * np.pi * np.arange(n_bins) / n_fft
+
+    # Stage 1: high shelf, +4 dB above ~1.7 kHz (head diffraction)
+    gain_db, q, fc = 3.99984385397, 0.7071752369554193, 1681.9744509555319
+    k = math.tan(math.pi * fc / rate)
+    vh = 10 ** (gain_db / 20)
+    vb = vh ** 0.4996667741545416
+    a0 = 1 + k / q + k * k
+    shelf = _biquad_response(
+        [(vh + vb * k / q + k * k) / a0, 2 * (k * k - vh) / a0, (vh - vb * k / q + k * k) / a0],
+        [1.0, 2 * (k * k - 1) / a0, (1 - k / q + k * k) / a0], w)
+
+    # Stage 2: RLB high-pass at ~38 Hz
+    q, fc = 0.5003270373253953, 38.13547087613982
+    k = math.tan(math.pi * fc / rate)
+    a0 = 1 + k / q + k * k
+    highpass = _biquad_response([1.0, -2.0, 1.0], [1.0, 2 * (k * k - 1) / a0, (1 - k / q + k * k) / a0], w)
+    return shelf * highpass
+
+def k_weighted(x, rate):
+    """K-weight float samples by FFT; padded so the IIR tail doesn't wrap around."""
+    n_fft = 1 << int(len(x) + rate // 2 - 1).bit_length()
+    spectrum = np.fft.rfft(x, n_fft)
+    spectrum *= k_weighting_response(rate, len(spectrum), n_fft)
+    return np.fft.irfft(spectrum, n_fft)[:len(x)]
+
+def block_powers(y, rate):
+    """Mean square of every gating block (400 ms, 75% overlap) via a cumulative sum.
+
+    A clip shorter than one block is a single block, which is most syllables'
+    loudness over their whole length rather than no measurement at all.
+    """
+    block = int(BLOCK_SEC * rate)
+    if len(y) <= block:
+        return np.array([np.mean(y * y)])
+    energy = np.concatenate(([0.0], np.cumsum(y * y)))
+    starts = np.arange(0, len(y) - block + 1, int(STEP_SEC * rate))
+    return (energy[starts + block] - energy[starts]) / block
+
+def integrated_loudness(samples, rate):
+    """Gated integrated loudness in LUFS of int16 samples, or None for silence."""
+    if len(samples) == 0:
+        return None
+    x = samples.astype(np.float64) / 32768
+    powers = block_powers(k_weighted(x, rate), rate)
+    with np.errstate(divide='ignore'):
+        levels = -0.691 + 10 * np.log10(powers)
+
+    gated = powers[levels > ABSOLUTE_GATE]
+    if len(gated) == 0:
+        return None
+    relative = -0.691 + 10 * math.log10(gated.mean()) + RELATIVE_GATE
+    gated = powers[(levels > ABSOLUTE_GATE) & (levels > relative)]
+    return -0.691 + 10 * math.log10(gated.mean())
+
+def true_peak_db(samples, oversample=OVERSAMPLE):
+    """Peak of the signal oversampled by FFT interpolation (catches inter-sample peaks), in dBTP."""
+    if len(samples) == 0:
+        return None
+    x = np.concatenate((samples.astype(np.float64) / 32768, np.zeros(64))) # room for edge ringing
+    upsampled = np.fft.irfft(np.fft.rfft(x), len(x) * oversample) * oversample
+    peak = max(np.abs(upsampled).max(), np.abs(x).max())
+    return 20 * math.log10(peak) if peak > 0 else None
+
+def loudness_gain(lufs, peak_dbtp, target_lufs=TARGET_LUFS, ceiling_dbtp=CEILING_DBTP):
+    """Playback gain (dB) to reach target_lufs, limited so the true peak stays under the ceiling."""
+    if lufs is None or peak_dbtp is None:
+        return None
+    gain = target_lufs - lufs
+    return min(gain, ceiling_dbtp - peak_dbtp)
+
+def measure(samples, rate):
+    """{'lufs', 'true_peak_db'} of int16 samples."""
+    lufs = integrated_loudness(samples, rate)
+    peak = true_peak_db(samples)
+    return {
+        'lufs': round(lufs, 2) if lufs is not None else None,
+        'true_peak_db': round(peak, 2) if peak is not None else None,
+    }
+
+def limit_peaks(x, ceiling, window):
+    """Gain-reduce float samples so no sample exceeds ceiling, instead of clipping.
+
+    Each over-ceiling peak's reduction is held for window samples either side
+    and smoothed over window + 1 samples, so it ramps in and out (no hard
+    corners) and the smoothed gain never rises above what the peak needs.
+    """
+    needed = np.minimum(1.0, ceiling / np.maximum(np.abs(x), 1e-9))
+    if needed.min() >= 1.0:
+        return x
+    held = np.lib.stride_tricks.sliding_window_view(np.pad(needed, window, mode='edge'), 2 * window + 1).min(axis=1)
+    smoothing = window + 1 # odd, so 'valid' convolution of the padded curve keeps its length
+    smooth = np.convolve(np.pad(held, smoothing // 2, mode='edge'), np.ones(smoothing) / smoothing, mode='valid')
+    return x * np.minimum(smooth, needed)
+
+def apply_gain_pcm(frames, gain_db, rate, ceiling_dbtp=CEILING_DBTP, limiter_ms=LIMITER_MS):
+    """Scale s16le PCM by gain_db (for outputs that are encoded anyway, like sprites).
+
+    The recorded gains keep the measured true peak under the ceiling, but a
+    measurement can miss it, so anything the gain still pushes over is
+    limited rather than clipped.
+    """
+    samples = np.frombuffer(frames, dtype='<i2').astype(np.float32) * 10 ** (gain_db / 20)
+    window = max(1, int(rate * limiter_ms / 2000)) * 2 # even, about limiter_ms either side
+    samples = limit_peaks(samples, 32767 * 10 ** (ceiling_dbtp / 20), window)
+    return np.clip(np.round(samples), -32768, 32767).astype('<i2').tobytes()
+
+def content_hash(path):
+    # Same short hash build_audio_manifest.py puts in the app's URLs
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()[:10]
+
+def audio_key(path):
+    """Path relative to public/audio, as used in the manifest (None for files outside it)."""
+    key = os.path.relpath(os.path.abspath(path), os.path.abspath(PUBLIC_AUDIO_DIR)).replace(os.sep, '/')
+    return None if key.startswith('../') else key
+
+def load_loudness(path=LOUDNESS_FILE):
+    if not os.path.exists(path):
+        return {'target_lufs': TARGET_LUFS, 'ceiling_dbtp': CEILING_DBTP, 'files': {}}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_loudness(data, path=LOUDNESS_FILE):
+    data['files'] = dict(sorted(data['files'].items()))
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=1)
+
+def file_gain(data, path, digest=None):
+    """Recorded gain for an audio file, or 0.0 if it has none or changed since."""
+    entry = data['files'].get(audio_key(path) or '')
+    if not entry or entry['hash'] != (digest or content_hash(path)):
+        return 0.0
+    return entry['gain'] or 0.0
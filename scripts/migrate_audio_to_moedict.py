@@ -1,86 +1,55 @@
-import json
+import argparse
 import os
-import requests
-import re
 import time
 import shutil
 
-# Load our valid syllables
+# Load the generated syllable inventory
 try:
-    from valid_syllables import VALID_SYLLABLES_NO_TONE
+    from syllable_inventory import SYLLABLES
+    from moedict_index import MAPPING_FILE, load_index
+    from audio_fetch import FetchTask, add_fetch_arguments, fetch_all, journal_path, moedict_url
 except ImportError:
     import sys
     sys.path.append(os.path.dirname(__file__))
-    from valid_syllables import VALID_SYLLABLES_NO_TONE
+    from syllable_inventory import SYLLABLES
+    from moedict_index import MAPPING_FILE, load_index
+    from audio_fetch import FetchTask, add_fetch_arguments, fetch_all, journal_path, moedict_url
 
-MAPPING_FILE = os.path.join(os.path.dirname(__file__), 'moedict_audio_map.json')
 AUDIO_DIR_OGG = os.path.join(os.path.dirname(__file__), '../public/audio/syllables_ogg')
 AUDIO_DIR_MP3 = os.path.join(os.path.dirname(__file__), '../public/audio/syllables') # Legacy
 
-def get_bopomofo(key):
-    # Key format is "Word.Bopu" e.g. "焿.ㄍㄥ"
-    parts = key.split('.')
-    if len(parts) >= 2:
-        return parts[-1]
-    return ""
-
-def strip_tones(bopomofo):
-    # Remove tone marks: ˊ ˇ ˋ ˙
-    return re.sub(r'[ˊˇˋ˙]', '', bopomofo)
-
-def download_file(url, filename):
-    try:
-        r = requests.get(url, headers={'User-Agent': 'Mozilla/5.0'})
-        if r.status_code == 200:
-            with open(filename, 'wb') as f:
-                f.write(r.content)
-            return True
-        return False
-    except Exception as e:
-        print(f"Error: {e}")
-        return False
+DEFAULT_RATE = 10.0
 
 def main():
+    parser = argparse.ArgumentParser(description="Download a Moedict recording for every valid syllable.")
+    parser.add_argument('-o', '--output-dir', default=AUDIO_DIR_OGG)
+    add_fetch_arguments(parser, DEFAULT_RATE)
+    args = parser.parse_args()
+
     if not os.path.exists(MAPPING_FILE):
         print("Mapping file not found.")
         return
 
-    os.makedirs(AUDIO_DIR_OGG, exist_ok=True)
+    os.makedirs(args.output_dir, exist_ok=True)
     
-    print("Loading Moedict mapping...")
-    with open(MAPPING_FILE, 'r', encoding='utf-8') as f:
-        moedict_map = json.load(f)
+    print("Loading Moedict index...")
+    # toneless syllable -> candidates, rebuilt only when the mapping changes
+    available_audio = load_index()
 
-    # Pre-process map for fast lookup
-    # Map toneless -> [list of candidates]
-    available_audio = {}
-    for key, audio_id in moedict_map.items():
-        full_bopomofo = get_bopomofo(key)
-        if not full_bopomofo: continue
-        
-        toneless = strip_tones(full_bopomofo)
-        if toneless not in available_audio:
-            available_audio[toneless] = []
-        
-        available_audio[toneless].append({
-            'full': full_bopomofo,
-            'id': audio_id,
-            'word': key.split('.')[0]
-        })
-
-    print(f"Starting migration for {len(VALID_SYLLABLES_NO_TONE)} syllables...")
+    print(f"Starting migration for {len(SYLLABLES)} syllables...")
     
     downloaded_count = 0
     missing_count = 0
+    tasks = []
 
-    for idx, target in enumerate(VALID_SYLLABLES_NO_TONE):
-        filename = os.path.join(AUDIO_DIR_OGG, f"{target}.ogg")
+    for idx, target in enumerate(SYLLABLES):
+        filename = os.path.join(args.output_dir, f"{target}.ogg")
         if os.path.exists(filename):
-            print(f"[{idx+1}/{len(VALID_SYLLABLES_NO_TONE)}] Skipped (exists): {target}")
+            print(f"[{idx+1}/{len(SYLLABLES)}] Skipped (exists): {target}")
             continue
 
         if target in available_audio:
-            candidates = available_audio[target]
+            candidates = available_audio.candidates(target)
             
             # Selection Strategy:
             # 1. Exact match (First Tone, no mark)
@@ -90,28 +59,29 @@ def main():
             selected = None
             
             # Priority 1: Exact match with target (Tone 1)
-            exact_matches = [c for c in candidates if c['full'] == target]
+            exact_matches = [c for c in candidates if c.full == target]
             if exact_matches:
                 # Sub-sort by word length (shortest word = likely most common single char)
-                exact_matches.sort(key=lambda x: len(x['word']))
+                exact_matches.sort(key=lambda x: x.word_len)
                 selected = exact_matches[0]
             else:
                 # Priority 2: Sort by tone (1, 2, 3, 4, 5) if possible? 
                 # Or just shortest word again
-                candidates.sort(key=lambda x: len(x['word']))
+                candidates.sort(key=lambda x: x.word_len)
                 selected = candidates[0]
             
-            url = f"http://a.moedict.tw/{selected['id']}.ogg"
-            print(f"[{idx+1}/{len(VALID_SYLLABLES_NO_TONE)}] Downloading {target} from {selected['word']} ({selected['full']})...")
-            
-            if download_file(url, filename):
-                downloaded_count += 1
-                # time.sleep(0.1) 
-            else:
-                print(f"  FAILED to download {target}")
-                missing_count += 1
+            print(f"[{idx+1}/{len(SYLLABLES)}] Queued {target} from {selected.word} ({selected.full})")
+            tasks.append(FetchTask(moedict_url(selected.id), filename, target))
+        else:
+            print(f"[{idx+1}/{len(SYLLABLES)}] MISSING in Moedict: {target}")
+            missing_count += 1
+
+    print(f"Downloading {len(tasks)} files...")
+    for task, result in fetch_all(tasks, args.jobs, args.rate, journal=journal_path('migrate_audio_to_moedict')):
+        if result.ok:
+            downloaded_count += 1
         else:
-            print(f"[{idx+1}/{len(VALID_SYLLABLES_NO_TONE)}] MISSING in Moedict: {target}")
+            print(f"  FAILED to download {task.label}: {result.error}")
             missing_count += 1
 
     print("Migration Complete.")
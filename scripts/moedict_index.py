@@ -0,0 +1,169 @@
+import collections
+import json
+import mmap
+import os
+import re
+import struct
+
+# Compact, memory-mapped index over moedict_audio_map.json:
+#   toneless syllable -> candidate rows (full bopomofo, word, audio id, tone)
+# Built once from the JSON and rebuilt only when the JSON changes, so tools
+# don't have to json.load the whole map and re-split every key on each run.
+#
+# File layout (little-endian):
+#   header   MAGIC, version, source size, source mtime_ns, n_syllables, n_rows
+#   syllable table, sorted by key: key_off, key_len, row_start, row_count
+#   rows: tone, word_len, then (offset, length) of word / full / id strings
+#   string blob (UTF-8)
+
+MAPPING_FILE = os.path.join(os.path.dirname(__file__), 'moedict_audio_map.json')
+INDEX_FILE = os.path.join(os.path.dirname(__file__), '.moedict_audio_index.bin')
+
+MAGIC = b'MDIX'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sIqqII')
+SYLLABLE = struct.Struct('<IHII')
+ROW = struct.Struct('<BHIHIHIB')
+
+TONE_MARKS = {'ˊ': 2, 'ˇ': 3, 'ˋ': 4, '˙': 5}
+
+# One syllable: optional initial, optional medial, optional final.
+# Multi-syllable readings are often concatenated without separators
+# ("ㄒㄧㄚˋ˙ㄗ"), so this is how they are told apart.
+SINGLE_SYLLABLE = re.compile(r'^[ㄅ-ㄙ]?[ㄧㄨㄩ]?[ㄚ-ㄦ]?$')
+
+Candidate = collections.namedtuple('Candidate', ['full', 'word', 'id', 'tone', 'word_len'])
+
+def get_bopomofo(key):
+    # Key format is "Word.Bopu" e.g. "焿.ㄍㄥ"
+    parts = key.split('.')
+    if len(parts) >= 2:
+        return parts[-1]
+    return ""
+
+def strip_tones(bopomofo):
+    # Remove tone marks: ˊ ˇ ˋ ˙
+    return re.sub(r'[ˊˇˋ˙]', '', bopomofo)
+
+def get_tone(bopomofo):
+    """Tone number 1-5 of a single syllable (5 = neutral)."""
+    for mark, tone in TONE_MARKS.items():
+        if mark in bopomofo:
+            return tone
+    return 1
+
+def _source_stamp(mapping_file):
+    st = os.stat(mapping_file)
+    return st.st_size, st.st_mtime_ns
+
+def build_index(mapping_file=MAPPING_FILE, index_file=INDEX_FILE):
+    """Compile the JSON map into the binary index. Multi-syllable readings are skipped."""
+    with open(mapping_file, 'r', encoding='utf-8') as f:
+        moedict_map = json.load(f)
+
+    grouped = {}
+    for key, audio_id in moedict_map.items():
+        full_bopomofo = get_bopomofo(key)
+        if not full_bopomofo: continue
+
+        toneless = strip_tones(full_bopomofo)
+        if not toneless or not SINGLE_SYLLABLE.match(toneless):
+            continue
+        word = key.split('.')[0]
+        grouped.setdefault(toneless, []).append((full_bopomofo, word, audio_id))
+
+    blob = bytearray()
+    string_offsets = {}
+
+    def add_string(s):
+        if s not in string_offsets:
+            data = s.encode('utf-8')
+            string_offsets[s] = (len(blob), len(data))
+            blob.extend(data)
+        return string_offsets[s]
+
+    syllable_table = bytearray()
+    rows = bytearray()
+    n_rows = 0
+    for toneless in sorted(grouped):
+        key_off, key_len = add_string(toneless)
+        candidates = grouped[toneless]
+        syllable_table += SYLLABLE.pack(key_off, key_len, n_rows, len(candidates))
+        for full_bopomofo, word, audio_id in candidates:
+            word_off, word_nbytes = add_string(word)
+            full_off, full_nbytes = add_string(full_bopomofo)
+            id_off, id_nbytes = add_string(str(audio_id))
+            rows += ROW.pack(get_tone(full_bopomofo), len(word), word_off, word_nbytes, full_off, full_nbytes, id_off, id_nbytes)
+            n_rows += 1
+
+    size, mtime_ns = _source_stamp(mapping_file)
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, size, mtime_ns, len(grouped), n_rows)
+
+    tmp = f"{index_file}.{os.getpid()}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(header)
+        f.write(syllable_table)
+        f.write(rows)
+        f.write(blob)
+    os.replace(tmp, index_file)
+
+class MoedictIndex:
+    """Read-only view of an index file. Lookups are a dict hit plus a few struct reads."""
+    def __init__(self, index_file=INDEX_FILE):
+        with open(index_file, 'rb') as f:
+            self._buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self.source_size, self.source_mtime_ns, n_syllables, n_rows = HEADER.unpack_from(self._buf, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{index_file} is not a v{FORMAT_VERSION} Moedict index")
+
+        self._rows_off = HEADER.size + n_syllables * SYLLABLE.size
+        self._strings_off = self._rows_off + n_rows * ROW.size
+
+        self._syllables = {}
+        for i in range(n_syllables):
+            key_off, key_len, row_start, row_count = SYLLABLE.unpack_from(self._buf, HEADER.size + i * SYLLABLE.size)
+            self._syllables[self._string(key_off, key_len)] = (row_start, row_count)
+
+    def _string(self, offset, length):
+        start = self._strings_off + offset
+        return self._buf[start:start + length].decode('utf-8')
+
+    def __contains__(self, toneless):
+        return toneless in self._syllables
+
+    def __len__(self):
+        return len(self._syllables)
+
+    def syllables(self):
+        return self._syllables.keys()
+
+    def candidates(self, toneless, tone=None):
+        """Candidates for a toneless syllable in source order, optionally for one tone."""
+        row_start, row_count = self._syllables.get(toneless, (0, 0))
+        results = []
+        for i in range(row_start, row_start + row_count):
+            row_tone, word_len, word_off, word_nbytes, full_off, full_nbytes, id_off, id_nbytes = ROW.unpack_from(self._buf, self._rows_off + i * ROW.size)
+            if tone is not None and row_tone != tone:
+                continue
+            results.append(Candidate(
+                full=self._string(full_off, full_nbytes),
+                word=self._string(word_off, word_nbytes),
+                id=self._string(id_off, id_nbytes),
+                tone=row_tone,
+                word_len=word_len,
+            ))
+        return results
+
+def load_index(mapping_file=MAPPING_FILE, index_file=INDEX_FILE):
+    """Open the index, (re)building it first if the JSON map changed."""
+    stamp = _source_stamp(mapping_file)
+    if os.path.exists(index_file):
+        try:
+            index = MoedictIndex(index_file)
+            if (index.source_size, index.source_mtime_ns) == stamp:
+                return index
+        except (ValueError, struct.error):
+            pass
+    build_index(mapping_file, index_file)
+    return MoedictIndex(index_file)
@@ -1,55 +1,110 @@
 import os
-import subprocess
-import re
-import shutil
-
-AUDIO_DIR = os.path.join(os.path.dirname(__file__), '../public/audio/syllables_ogg')
-TEMP_OUT = "temp_norm.ogg"
-
-def get_max_volume(file_path):
-    cmd = ["ffmpeg", "-i", file_path, "-af", "volumedetect", "-f", "null", "-"]
-    result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
-    output = result.stderr
-    
-    # Parse max_volume: -20.5 dB
-    match = re.search(r"max_volume: ([\-\d\.]+) dB", output)
-    if match:
-        return float(match.group(1))
-    return None
-
-def normalize_file(file_path, target_peak=-1.0):
-    max_vol = get_max_volume(file_path)
-    if max_vol is None:
-        return False
-        
-    gain = target_peak - max_vol
-    if gain < 0.1: # Already loud enough
-        return True
-        
-    # Apply gain
-    # ffmpeg -i input -af "volume=10dB" output
-    cmd = ["ffmpeg", "-y", "-i", file_path, "-af", f"volume={gain}dB", "-c:a", "libvorbis", TEMP_OUT]
-    subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-    
-    if os.path.exists(TEMP_OUT):
-        shutil.move(TEMP_OUT, file_path)
-        return True
-    return False
+import argparse
+
+try:
+    from audio_analysis import pcm_samples
+    from audio_cache import AudioCache
+    from audio_io import decode_pcm_native
+    from audio_jobs import add_jobs_argument
+    from loudness import (
+        CEILING_DBTP, LOUDNESS_FILE, PUBLIC_AUDIO_DIR, TARGET_LUFS,
+        audio_key, content_hash, load_loudness, loudness_gain, measure, save_loudness,
+    )
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(__file__))
+    from audio_analysis import pcm_samples
+    from audio_cache import AudioCache
+    from audio_io import decode_pcm_native
+    from audio_jobs import add_jobs_argument
+    from loudness import (
+        CEILING_DBTP, LOUDNESS_FILE, PUBLIC_AUDIO_DIR, TARGET_LUFS,
+        audio_key, content_hash, load_loudness, loudness_gain, measure, save_loudness,
+    )
+
+# Loudness normalization without re-encoding: measures integrated loudness
+# (EBU R128) and true peak of every key and syllable sound, and records the
+# playback gain that brings it to the target in src/data/audio_loudness.json.
+# Replaces peak-normalizing to -1 dBFS with an ffmpeg volume re-encode, which
+# left syllables at very different perceived loudness.
+#
+# Measurements come from the analysis cache (the same decode as the trim
+# analysis), so unchanged files are not decoded again. That decode is 16 kHz,
+# so its true peak is floored at the source's native sample peak; the sprite
+# and transcode builders also limit anything a gain still pushes over.
+
+AUDIO_DIRS = ['', 'syllables', 'syllables_ogg'] # keys, TTS syllables, Moedict syllables
+
+def list_audio(audio_dir=PUBLIC_AUDIO_DIR):
+    paths = []
+    for subdir in AUDIO_DIRS:
+        directory = os.path.join(audio_dir, subdir)
+        if os.path.isdir(directory):
+            paths += sorted(os.path.join(directory, f) for f in os.listdir(directory)
+                            if f.endswith(('.mp3', '.ogg')))
+    return paths
+
+def gain_entry(path, measured, target_lufs=TARGET_LUFS, ceiling_dbtp=CEILING_DBTP, digest=None):
+    gain = loudness_gain(measured['lufs'], measured['true_peak_db'], target_lufs, ceiling_dbtp)
+    return {
+        'hash': digest or content_hash(path),
+        'lufs': measured['lufs'],
+        'true_peak_db': measured['true_peak_db'],
+        'gain': round(gain, 2) if gain is not None else None,
+    }
+
+def normalize_file(file_path, target_lufs=TARGET_LUFS, ceiling_dbtp=CEILING_DBTP):
+    """Measure one file at its native rate; returns its sidecar entry, or None if it couldn't be decoded."""
+    frames, rate = decode_pcm_native(file_path)
+    if frames is None:
+        return None
+    return gain_entry(file_path, measure(pcm_samples(frames), rate), target_lufs, ceiling_dbtp)
 
 def main():
-    files = [f for f in os.listdir(AUDIO_DIR) if f.endswith('.ogg')]
-    print(f"Normalizing {len(files)} files...")
-    
-    count = 0
-    for idx, f in enumerate(files):
-        if idx % 20 == 0:
-            print(f"Progress: {idx}/{len(files)}")
-            
-        path = os.path.join(AUDIO_DIR, f)
-        if normalize_file(path):
-            count += 1
-            
-    print(f"Normalized {count} files.")
+    parser = argparse.ArgumentParser(description="Record loudness-normalizing playback gains for the audio files.")
+    parser.add_argument('files', nargs='*', help="Files to measure (default: every key and syllable sound)")
+    parser.add_argument('--target', type=float, default=TARGET_LUFS, help=f"Target loudness in LUFS (default: {TARGET_LUFS})")
+    parser.add_argument('--ceiling', type=float, default=CEILING_DBTP, help=f"True-peak ceiling in dBTP (default: {CEILING_DBTP})")
+    parser.add_argument('-o', '--output', default=LOUDNESS_FILE)
+    add_jobs_argument(parser)
+    args = parser.parse_args()
+
+    paths = args.files or list_audio()
+    print(f"Measuring loudness of {len(paths)} files...")
+
+    cache = AudioCache()
+    measurements = cache.measure_all(paths, args.jobs)
+
+    data = load_loudness(args.output)
+    if (data['target_lufs'], data['ceiling_dbtp']) != (args.target, args.ceiling):
+        data = {'target_lufs': args.target, 'ceiling_dbtp': args.ceiling, 'files': {}}
+
+    limited = failed = 0
+    for path in paths:
+        measured = measurements[path]
+        if measured.get('lufs') is None:
+            failed += 1
+            continue
+        entry = gain_entry(path, measured, args.target, args.ceiling)
+        if entry['gain'] < args.target - measured['lufs'] - 0.005:
+            limited += 1
+        key = audio_key(path)
+        if key is None:
+            print(f"{path}: {measured['lufs']:.1f} LUFS, gain {entry['gain']:+.1f} dB (not under public/audio, not recorded)")
+            continue
+        data['files'][key] = entry
+
+    # Drop files that no longer exist
+    data['files'] = {key: entry for key, entry in data['files'].items()
+                     if os.path.exists(os.path.join(PUBLIC_AUDIO_DIR, key))}
+    save_loudness(data, args.output)
+
+    lufs = sorted(m['lufs'] for m in measurements.values() if m.get('lufs') is not None)
+    if lufs:
+        print(f"Loudness before: {lufs[0]:.1f} .. {lufs[-1]:.1f} LUFS (median {lufs[len(lufs) // 2]:.1f})")
+    print(f"Recorded gains for {len(paths) - failed} files to {args.output} "
+          f"(target {args.target} LUFS, {limited} limited by the {args.ceiling} dBTP ceiling, {failed} silent/failed)")
+    print("Run build_audio_manifest.py and build_audio_sprites.py to apply them.")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,86 @@
+import argparse
+import json
+import os
+
+import numpy as np
+
+try:
+    from audio_analysis import ONSET
+    from audio_cache import AudioCache
+    from audio_jobs import add_jobs_argument
+    from loudness import audio_key
+    from normalize_audio import list_audio
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(__file__))
+    from audio_analysis import ONSET
+    from audio_cache import AudioCache
+    from audio_jobs import add_jobs_argument
+    from loudness import audio_key
+    from normalize_audio import list_audio
+
+# Corpus-wide time-to-first-energy: how long after a keypress the learner
+# hears speech, per file, from the onsets in the analysis cache.
+#
+#   onset_report.py --save before.json     # snapshot, then condition_audio.py
+#   onset_report.py --compare before.json  # measured before vs after
+#
+# Without --compare it shows the current onsets next to what a head trim
+# with --pre-roll would leave.
+
+def summary(onsets_ms):
+    values = np.array(sorted(onsets_ms))
+    if len(values) == 0:
+        return "no onsets"
+    return (f"n={len(values)}  mean {values.mean():6.1f}  p50 {np.percentile(values, 50):6.1f}  "
+            f"p90 {np.percentile(values, 90):6.1f}  max {values.max():6.1f} ms")
+
+def current_onsets(paths, jobs):
+    """{audio key: onset ms} for every file with a detectable onset."""
+    cache = AudioCache()
+    measurements = cache.measure_all(paths, jobs)
+    return {audio_key(path) or path: measurements[path]['onset'] * 1000
+            for path in paths if measurements[path].get('onset') is not None}
+
+def main():
+    parser = argparse.ArgumentParser(description="Report time-to-first-energy (speech onset) across the audio corpus.")
+    parser.add_argument('files', nargs='*', help="Files to report on (default: every key and syllable sound)")
+    parser.add_argument('--pre-roll', type=float, default=ONSET['pre_roll_ms'],
+                        help=f"Pre-roll for the projected head trim (default: {ONSET['pre_roll_ms']} ms)")
+    parser.add_argument('--save', metavar='FILE', help="Write the current per-file onsets as a snapshot")
+    parser.add_argument('--compare', metavar='FILE', help="Compare against a snapshot from --save")
+    parser.add_argument('--top', type=int, default=10, help="Files to list with the largest onsets")
+    add_jobs_argument(parser)
+    args = parser.parse_args()
+
+    paths = args.files or list_audio()
+    onsets = current_onsets(paths, args.jobs)
+    print(f"Onsets found in {len(onsets)}/{len(paths)} files")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            before = json.load(f)
+        shared = sorted(set(before) & set(onsets))
+        print(f"Before: {summary([before[k] for k in shared])}")
+        print(f"After:  {summary([onsets[k] for k in shared])}")
+        changes = sorted(shared, key=lambda k: onsets[k] - before[k])
+        worse = [k for k in shared if onsets[k] > before[k] + ONSET['frame_ms']]
+        print(f"Improved: {sum(onsets[k] < before[k] - ONSET['frame_ms'] for k in shared)}, worse: {len(worse)}")
+        for key in changes[:args.top]:
+            print(f"  {key}: {before[key]:.0f} -> {onsets[key]:.0f} ms")
+    else:
+        # A head trim leaves at most the pre-roll before the onset
+        projected = {k: min(v, args.pre_roll) for k, v in onsets.items()}
+        print(f"Current:                     {summary(onsets.values())}")
+        print(f"After head trim ({args.pre_roll:.0f} ms pre-roll): {summary(projected.values())}")
+        print("\nLargest onsets:")
+        for key in sorted(onsets, key=lambda k: -onsets[k])[:args.top]:
+            print(f"  {key}: {onsets[key]:.0f} ms")
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(dict(sorted(onsets.items())), f, ensure_ascii=False, indent=1)
+        print(f"\nWrote {args.save}")
+
+if __name__ == "__main__":
+    main()
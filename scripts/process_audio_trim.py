@@ -1,107 +1,74 @@
 import os
+import argparse
 import subprocess
-import wave
-import struct
-import math
 import shutil
 
-AUDIO_DIR = os.path.join(os.path.dirname(__file__), '../public/audio/syllables_ogg')
-TEMP_WAV = "temp_process.wav"
+try:
+    from audio_analysis import ONSET, head_trim_time
+    from audio_cache import AudioCache
+    from audio_io import decode_pcm_native, encode_pcm
+    from audio_jobs import add_jobs_argument, run_jobs, temp_path
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(__file__))
+    from audio_analysis import ONSET, head_trim_time
+    from audio_cache import AudioCache
+    from audio_io import decode_pcm_native, encode_pcm
+    from audio_jobs import add_jobs_argument, run_jobs, temp_path
 
-def get_trim_point(ogg_path):
-    # Convert to WAV for analysis
-    cmd = ["ffmpeg", "-y", "-i", ogg_path, "-ac", "1", "-ar", "16000", TEMP_WAV]
-    subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-    
-    if not os.path.exists(TEMP_WAV):
-        return None
+AUDIO_DIR = os.path.join(os.path.dirname(__file__), '../public/audio/syllables_ogg')
 
-    try:
-        wav = wave.open(TEMP_WAV, 'r')
-        frames = wav.readframes(wav.getnframes())
-        framerate = wav.getframerate()
-        wav.close()
-        
-        samples = struct.unpack_from(f"{len(frames)//2}h", frames)
-        
-        chunk_ms = 20 # finer granularity
-        chunk_size = int(framerate * chunk_ms / 1000)
-        
-        max_amp = 0
-        rms_values = []
-        
-        for i in range(0, len(samples), chunk_size):
-            chunk = samples[i:i+chunk_size]
-            if not chunk: break
-            sum_sq = sum(s*s for s in chunk)
-            rms = math.sqrt(sum_sq / len(chunk))
-            rms_values.append(rms)
-            max_amp = max(max_amp, rms)
-        
-        if max_amp < 100: return None # Two quiet
-        
-        threshold = max_amp * 0.1
-        silence_threshold = max_amp * 0.05
-        
-        state = "WAIT_START"
-        consecutive_silence = 0
-        required_silence_chunks = int(300 / chunk_ms) # 300ms gap
-        
-        trim_time = None
-        
-        for idx, rms in enumerate(rms_values):
-            time_sec = idx * (chunk_ms / 1000)
-            
-            if state == "WAIT_START":
-                if rms > threshold:
-                    state = "SPEAKING"
-            elif state == "SPEAKING":
-                if rms < silence_threshold:
-                    consecutive_silence += 1
-                    if consecutive_silence >= required_silence_chunks:
-                        # Gap detected
-                        end_speech_idx = idx - consecutive_silence
-                        trim_time = (end_speech_idx * chunk_ms / 1000) + 0.1 # Add buffer
-                        break
-                else:
-                    consecutive_silence = 0
-        
-        return trim_time
-        
-    except Exception as e:
-        print(f"Error analyzing {ogg_path}: {e}")
-        return None
-    finally:
-        if os.path.exists(TEMP_WAV):
-            os.remove(TEMP_WAV)
+def trim_file(ogg_path, endpoint, start=0.0):
+    temp_out = temp_path(".ogg")
+    if start > 0:
+        # A stream copy can only start on a Vorbis packet boundary, which can
+        # land inside the attack: cut the head sample-exact and re-encode
+        frames, rate = decode_pcm_native(ogg_path)
+        if frames is None:
+            return False
+        if not encode_pcm(frames[int(start * rate) * 2:int(endpoint * rate) * 2], rate, temp_out):
+            return False
+    else:
+        # Tail only: ffmpeg -i input -t duration -c copy output
+        cmd = ["ffmpeg", "-y", "-i", ogg_path, "-t", str(endpoint), "-c", "copy", temp_out]
+        subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
 
-def trim_file(ogg_path, endpoint):
-    temp_out = "temp_trimmed.ogg"
-    # ffmpeg -i input -t duration -c copy output
-    cmd = ["ffmpeg", "-y", "-i", ogg_path, "-t", str(endpoint), "-c", "copy", temp_out]
-    subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-    
     if os.path.exists(temp_out):
         shutil.move(temp_out, ogg_path)
         return True
     return False
 
+def trim_item(item):
+    path, trim_point, start = item
+    return trim_file(path, trim_point, start)
+
 def main():
+    parser = argparse.ArgumentParser(description="Trim syllable OGGs: leading silence and everything after the first speech gap.")
+    parser.add_argument('--pre-roll', type=float, default=ONSET['pre_roll_ms'],
+                        help=f"Milliseconds kept before the speech onset (default: {ONSET['pre_roll_ms']})")
+    add_jobs_argument(parser)
+    args = parser.parse_args()
+
     files = [f for f in os.listdir(AUDIO_DIR) if f.endswith('.ogg')]
     print(f"Processing {len(files)} files...")
     
+    # Trim points come from the analysis cache; only new/changed files get decoded
+    cache = AudioCache()
+    paths = [os.path.join(AUDIO_DIR, f) for f in files]
+    measurements = cache.measure_all(paths, args.jobs)
+    
     processed = 0
     skipped = 0
     errors = 0
+    todo = []
     
-    for idx, f in enumerate(files):
-        path = os.path.join(AUDIO_DIR, f)
-        
+    for idx, (f, path) in enumerate(zip(files, paths)):
         # Helper logging
         if idx % 50 == 0:
             print(f"Progress: {idx}/{len(files)}")
             
-        trim_point = get_trim_point(path)
+        trim_point = measurements[path].get('trim', {}).get('trim')
+        start = head_trim_time(measurements[path].get('onset'), args.pre_roll)
         
         if trim_point:
             if trim_point < 0.2:
@@ -109,15 +76,19 @@ def main():
                 print(f"Skipping {f}: trim point too short ({trim_point:.2f}s)")
                 skipped += 1
             else:
-                if trim_file(path, trim_point):
-                    processed += 1
-                   # print(f"Trimmed {f} at {trim_point:.2f}s")
-                else:
-                    errors += 1
+                todo.append((path, trim_point, start if start < trim_point else 0.0))
         else:
             print(f"Skipping {f}: No clear gap found")
             skipped += 1
 
+    for (path, trim_point, start), ok in run_jobs(trim_item, todo, args.jobs):
+        if ok:
+            processed += 1
+            cache.invalidate(path)
+        else:
+            errors += 1
+    cache.save()
+
     print("-" * 30)
     print(f"Total: {len(files)}")
     print(f"Trimmed: {processed}")
@@ -1,3 +1,4 @@
+import argparse
 import sys
 import os
 import json
@@ -7,61 +8,35 @@ from collections import defaultdict
 # Add current dir to sys.path if needed
 sys.path.append(os.path.dirname(__file__))
 
-# Import pypinyin from venv if not in path (usually activated, but here we run with full path)
-from pypinyin import pinyin, Style
+from zhuyin_readings import CACHE_FILE, LEARNED_FILE, ReadingCache, convert, strip_tones
 
 INPUT_FILE = os.path.join(os.path.dirname(__file__), 'frequency.tsv')
 OUTPUT_FILE = os.path.join(os.path.dirname(__file__), '../src/data/syllable_frequency.json')
 
+# Characters past this rank are ignored; weights are max_rank - rank + 1
+MAX_RANK = 5000
+
+def toneless_syllable(char, reading):
+    """Reading without tone marks, or None if it isn't Zhuyin."""
+    # pypinyin returns the original char if it has no pinyin
+    # (e.g. number or punctuation), so if reading == char, it's not converted.
+    if not reading or reading == char:
+        return None
+    return strip_tones(reading)
+
 def get_zhuyin_syllable(char):
     """Convert char to a single Zhuyin syllable without tone."""
-    # Convert to Bopomofo with tones
-    result = pinyin(char, style=Style.BOPOMOFO)
-    if not result:
-        return None
-        
-    s = result[0][0] # First char, first pronunciation
-    
-    # Strip tone marks: ˊ ˇ ˋ ˙
-    for tone in ['ˊ', 'ˇ', 'ˋ', '˙']:
-        s = s.replace(tone, '')
-        
-    # Check if empty or not zhuyin (e.g. number or punctuation)
-    # Simple check: must contain at least one zhuyin symbol
-    # Actually pypinyin returns original char if no pinyin.
-    # So if s == char, it's not converted.
-    if s == char:
-        return None
-        
-    return s
-
-def main():
-    print(f"Reading {INPUT_FILE}...")
-    
-    syllable_weights = defaultdict(int)
-    
-    # The `notes.tsv` format: 
-    # Usually: Rank [tab] Character [tab] Pinyin [tab] Definition...
-    # Or just raw lines. Based on `head` output (which I'll see if I waited, but assuming TSV):
-    # If the file has a header, skip it.
-    
-    with open(INPUT_FILE, 'r', encoding='utf-8') as f:
+    return toneless_syllable(char, convert([char])[0])
+
+def read_ranked_chars(input_file, max_rank=MAX_RANK):
+    """Characters in rank order (1st line = most frequent), up to max_rank."""
+    chars = []
+    with open(input_file, 'r', encoding='utf-8') as f:
         reader = csv.reader(f, delimiter='\t')
-        
-        # Rank based weighting:
-        # Rank 1 character gets weight 3000
-        # Rank 3000 character gets weight 1
-        # Or raw frequency count if available.
-        
-        # Let's assume the order IS frequency rank (1st line = most frequent).
-        # We'll assign weights: 5000 - rank
-        
-        rank = 0
-        max_rank = 5000
-        
+
         for row in reader:
             if not row: continue
-            
+
             # Heuristic to find the character column
             # Look for a column with a single character
             char = None
@@ -69,33 +44,59 @@ def main():
                 if len(col) == 1 and '\u4e00' <= col <= '\u9fff':
                     char = col
                     break
-            
+
             if not char:
                 continue
-                
-            rank += 1
-            if rank > max_rank:
+
+            chars.append(char)
+            if len(chars) >= max_rank:
                 break
-                
-            syllable = get_zhuyin_syllable(char)
+    return chars
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build syllable_frequency.json from a rank-ordered character list.")
+    parser.add_argument('--input', default=INPUT_FILE)
+    parser.add_argument('--output', default=OUTPUT_FILE)
+    parser.add_argument('--max-rank', type=int, default=MAX_RANK)
+    parser.add_argument('--reading-cache', default=CACHE_FILE, help="char -> reading cache file")
+    parser.add_argument('--learned-readings', default=LEARNED_FILE, help="Polyphone reading counts from aggregate_frequency.py")
+    parser.add_argument('--first-reading', action='store_true', help="Give polyphones' whole weight to their first reading")
+    args = parser.parse_args(argv)
+
+    print(f"Reading {args.input}...")
+    chars = read_ranked_chars(args.input, args.max_rank)
+
+    # Batched pypinyin calls for characters not seen by a previous run
+    cache = ReadingCache(args.reading_cache, args.learned_readings)
+    readings = cache.lookup(chars)
+    # Polyphones split their weight across readings (learned from a corpus
+    # by aggregate_frequency.py if one was run, else a Moedict phrase prior)
+    shares = {} if args.first_reading else cache.distributions(chars)
+    cache.save()
+
+    # Rank based weighting:
+    # Rank 1 character gets weight max_rank, rank max_rank gets weight 1
+    syllable_weights = defaultdict(float)
+    for rank, char in enumerate(chars, 1):
+        weight = args.max_rank - rank + 1
+        for reading, share in shares.get(char, {readings[char]: 1.0}).items():
+            syllable = toneless_syllable(char, reading)
             if syllable:
-                weight = max_rank - rank + 1
-                syllable_weights[syllable] += weight
+                syllable_weights[syllable] += weight * share
 
     # Convert to list of [syllable, weight] for easy consumption
-    # Filter out very rare ones? Or keep all.
-    results = [[s, w] for s, w in syllable_weights.items()]
-    
+    results = [[s, round(w)] for s, w in syllable_weights.items() if round(w) > 0]
+
     # Sort by weight desc
     results.sort(key=lambda x: x[1], reverse=True)
-    
+
     # Ensure dir exists
-    os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
-    
-    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
         json.dump(results, f, ensure_ascii=False, indent=2)
-        
-    print(f"Generated {len(results)} distinct syllables with weights to {OUTPUT_FILE}")
+
+    print(f"Generated {len(results)} distinct syllables with weights to {args.output}")
     print(f"Top 5: {results[:5]}")
 
 if __name__ == "__main__":
@@ -0,0 +1,39 @@
+# Generated by build_syllable_inventory.py; do not edit, re-run it instead.
+# Base syllables in id order (same order as src/data/syllable_inventory.json).
+
+INVENTORY_VERSION = 2
+
+SYLLABLES = ('ㄚ', 'ㄛ', 'ㄜ', 'ㄞ', 'ㄠ', 'ㄡ', 'ㄢ', 'ㄣ', 'ㄤ', 'ㄦ', 'ㄧ', 'ㄧㄚ', 'ㄧㄛ', 'ㄧㄝ', 'ㄧㄠ', 'ㄧㄡ', 'ㄧㄢ', 'ㄧㄣ', 'ㄧㄤ', 'ㄧㄥ', 'ㄨ', 'ㄨㄚ', 'ㄨㄛ', 'ㄨㄞ', 'ㄨㄟ', 'ㄨㄢ', 'ㄨㄣ', 'ㄨㄤ', 'ㄨㄥ', 'ㄩ', 'ㄩㄝ', 'ㄩㄢ', 'ㄩㄣ', 'ㄩㄥ', 'ㄅㄚ', 'ㄅㄛ', 'ㄅㄞ', 'ㄅㄟ', 'ㄅㄠ', 'ㄅㄢ', 'ㄅㄣ', 'ㄅㄤ', 'ㄅㄥ', 'ㄅㄧ', 'ㄅㄧㄝ', 'ㄅㄧㄠ', 'ㄅㄧㄢ', 'ㄅㄧㄣ', 'ㄅㄧㄥ', 'ㄅㄨ', 'ㄆㄚ', 'ㄆㄛ', 'ㄆㄞ', 'ㄆㄟ', 'ㄆㄠ', 'ㄆㄡ', 'ㄆㄢ', 'ㄆㄣ', 'ㄆㄤ', 'ㄆㄥ', 'ㄆㄧ', 'ㄆㄧㄝ', 'ㄆㄧㄠ', 'ㄆㄧㄢ', 'ㄆㄧㄣ', 'ㄆㄧㄥ', 'ㄆㄨ', 'ㄇㄚ', 'ㄇㄛ', 'ㄇㄜ', 'ㄇㄞ', 'ㄇㄟ', 'ㄇㄠ', 'ㄇㄡ', 'ㄇㄢ', 'ㄇㄣ', 'ㄇㄤ', 'ㄇㄥ', 'ㄇㄧ', 'ㄇㄧㄝ', 'ㄇㄧㄠ', 'ㄇㄧㄡ', 'ㄇㄧㄢ', 'ㄇㄧㄣ', 'ㄇㄧㄥ', 'ㄇㄨ', 'ㄈㄚ', 'ㄈㄛ', 'ㄈㄟ', 'ㄈㄡ', 'ㄈㄢ', 'ㄈㄣ', 'ㄈㄤ', 'ㄈㄥ', 'ㄈㄨ', 'ㄉㄚ', 'ㄉㄜ', 'ㄉㄞ', 'ㄉㄟ', 'ㄉㄠ', 'ㄉㄡ', 'ㄉㄢ', 'ㄉㄤ', 'ㄉㄥ', 'ㄉㄧ', 'ㄉㄧㄝ', 'ㄉㄧㄠ', 'ㄉㄧㄡ', 'ㄉㄧㄢ', 'ㄉㄧㄥ', 'ㄉㄨ', 'ㄉㄨㄛ', 'ㄉㄨㄟ', 'ㄉㄨㄢ', 'ㄉㄨㄣ', 'ㄉㄨㄥ', 'ㄊㄚ', 'ㄊㄜ', 'ㄊㄞ', 'ㄊㄠ', 'ㄊㄡ', 'ㄊㄢ', 'ㄊㄤ', 'ㄊㄥ', 'ㄊㄧ', 'ㄊㄧㄝ', 'ㄊㄧㄠ', 'ㄊㄧㄢ', 'ㄊㄧㄥ', 'ㄊㄨ', 'ㄊㄨㄛ', 'ㄊㄨㄟ', 'ㄊㄨㄢ', 'ㄊㄨㄣ', 'ㄊㄨㄥ', 'ㄋㄚ', 'ㄋㄜ', 'ㄋㄞ', 'ㄋㄟ', 'ㄋㄠ', 'ㄋㄢ', 'ㄋㄣ', 'ㄋㄤ', 'ㄋㄥ', 'ㄋㄧ', 'ㄋㄧㄝ', 'ㄋㄧㄠ', 'ㄋㄧㄡ', 'ㄋㄧㄢ', 'ㄋㄧㄣ', 'ㄋㄧㄤ', 'ㄋㄧㄥ', 'ㄋㄨ', 'ㄋㄨㄛ', 'ㄋㄨㄟ', 'ㄋㄨㄢ', 'ㄋㄨㄣ', 'ㄋㄨㄥ', 'ㄋㄩ', 'ㄋㄩㄝ', 'ㄌㄚ', 'ㄌㄜ', 'ㄌㄞ', 'ㄌㄟ', 'ㄌㄠ', 'ㄌㄡ', 'ㄌㄢ', 'ㄌㄤ', 'ㄌㄥ', 'ㄌㄧ', 'ㄌㄧㄚ', 'ㄌㄧㄝ', 'ㄌㄧㄠ', 'ㄌㄧㄡ', 'ㄌㄧㄢ', 'ㄌㄧㄣ', 'ㄌㄧㄤ', 'ㄌㄧㄥ', 'ㄌㄨ', 'ㄌㄨㄛ', 'ㄌㄨㄢ', 'ㄌㄨㄣ', 'ㄌㄨㄥ', 'ㄌㄩ', 'ㄌㄩㄝ', 'ㄍㄚ', 'ㄍㄜ', 'ㄍㄞ', 'ㄍㄟ', 'ㄍㄠ', 'ㄍㄡ', 'ㄍㄢ', 'ㄍㄣ', 'ㄍㄤ', 'ㄍㄥ', 'ㄍㄨ', 'ㄍㄨㄚ', 'ㄍㄨㄛ', 'ㄍㄨㄞ', 'ㄍㄨㄟ', 'ㄍㄨㄢ', 'ㄍㄨㄣ', 'ㄍㄨㄤ', 'ㄍㄨㄥ', 'ㄎㄚ', 'ㄎㄜ', 'ㄎㄞ', 'ㄎㄟ', 'ㄎㄠ', 'ㄎㄡ', 'ㄎㄢ', 'ㄎㄣ', 'ㄎㄤ', 'ㄎㄥ', 'ㄎㄨ', 'ㄎㄨㄚ', 'ㄎㄨㄛ', 'ㄎㄨㄞ', 'ㄎㄨㄟ', 'ㄎㄨㄢ', 'ㄎㄨㄣ', 'ㄎㄨㄤ', 'ㄎㄨㄥ', 'ㄏㄚ', 'ㄏㄜ', 'ㄏㄞ', 'ㄏㄟ', 'ㄏㄠ', 'ㄏㄡ', 'ㄏㄢ', 'ㄏㄣ', 'ㄏㄤ', 'ㄏㄥ', 'ㄏㄨ', 'ㄏㄨㄚ', 'ㄏㄨㄛ', 'ㄏㄨㄞ', 'ㄏㄨㄟ', 'ㄏㄨㄢ', 'ㄏㄨㄣ', 'ㄏㄨㄤ', 'ㄏㄨㄥ', 'ㄐㄧ', 'ㄐㄧㄚ', 'ㄐㄧㄝ', 'ㄐㄧㄠ', 'ㄐㄧㄡ', 'ㄐㄧㄢ', 'ㄐㄧㄣ', 'ㄐㄧㄤ', 'ㄐㄧㄥ', 'ㄐㄩ', 'ㄐㄩㄝ', 'ㄐㄩㄢ', 'ㄐㄩㄣ', 'ㄐㄩㄥ', 'ㄑㄧ', 'ㄑㄧㄚ', 'ㄑㄧㄝ', 'ㄑㄧㄠ', 'ㄑㄧㄡ', 'ㄑㄧㄢ', 'ㄑㄧㄣ', 'ㄑㄧㄤ', 'ㄑㄧㄥ', 'ㄑㄩ', 'ㄑㄩㄝ', 'ㄑㄩㄢ', 'ㄑㄩㄣ', 'ㄑㄩㄥ', 'ㄒㄧ', 'ㄒㄧㄚ', 'ㄒㄧㄝ', 'ㄒㄧㄠ', 'ㄒㄧㄡ', 'ㄒㄧㄢ', 'ㄒㄧㄣ', 'ㄒㄧㄤ', 'ㄒㄧㄥ', 'ㄒㄩ', 'ㄒㄩㄝ', 'ㄒㄩㄢ', 'ㄒㄩㄣ', 'ㄒㄩㄥ', 'ㄓ', 'ㄓㄚ', 'ㄓㄜ', 'ㄓㄞ', 'ㄓㄟ', 'ㄓㄠ', 'ㄓㄡ', 'ㄓㄢ', 'ㄓㄣ', 'ㄓㄤ', 'ㄓㄥ', 'ㄓㄨ', 'ㄓㄨㄚ', 'ㄓㄨㄛ', 'ㄓㄨㄞ', 'ㄓㄨㄟ', 'ㄓㄨㄢ', 'ㄓㄨㄣ', 'ㄓㄨㄤ', 'ㄓㄨㄥ', 'ㄔ', 'ㄔㄚ', 'ㄔㄜ', 'ㄔㄞ', 'ㄔㄠ', 'ㄔㄡ', 'ㄔㄢ', 'ㄔㄣ', 'ㄔㄤ', 'ㄔㄥ', 'ㄔㄨ', 'ㄔㄨㄚ', 'ㄔㄨㄛ', 'ㄔㄨㄞ', 'ㄔㄨㄟ', 'ㄔㄨㄢ', 'ㄔㄨㄣ', 'ㄔㄨㄤ', 'ㄔㄨㄥ', 'ㄕ', 'ㄕㄚ', 'ㄕㄜ', 'ㄕㄞ', 'ㄕㄟ', 'ㄕㄠ', 'ㄕㄡ', 'ㄕㄢ', 'ㄕㄣ', 'ㄕㄤ', 'ㄕㄥ', 'ㄕㄨ', 'ㄕㄨㄚ', 'ㄕㄨㄛ', 'ㄕㄨㄞ', 'ㄕㄨㄟ', 'ㄕㄨㄢ', 'ㄕㄨㄣ', 'ㄕㄨㄤ', 'ㄖ', 'ㄖㄜ', 'ㄖㄠ', 'ㄖㄡ', 'ㄖㄢ', 'ㄖㄣ', 'ㄖㄤ', 'ㄖㄥ', 'ㄖㄨ', 'ㄖㄨㄛ', 'ㄖㄨㄟ', 'ㄖㄨㄢ', 'ㄖㄨㄣ', 'ㄖㄨㄥ', 'ㄗ', 'ㄗㄚ', 'ㄗㄜ', 'ㄗㄞ', 'ㄗㄟ', 'ㄗㄠ', 'ㄗㄡ', 'ㄗㄢ', 'ㄗㄣ', 'ㄗㄤ', 'ㄗㄥ', 'ㄗㄨ', 'ㄗㄨㄛ', 'ㄗㄨㄟ', 'ㄗㄨㄢ', 'ㄗㄨㄣ', 'ㄗㄨㄥ', 'ㄘ', 'ㄘㄚ', 'ㄘㄜ', 'ㄘㄞ', 'ㄘㄟ', 'ㄘㄠ', 'ㄘㄡ', 'ㄘㄢ', 'ㄘㄣ', 'ㄘㄤ', 'ㄘㄥ', 'ㄘㄨ', 'ㄘㄨㄛ', 'ㄘㄨㄟ', 'ㄘㄨㄢ', 'ㄘㄨㄣ', 'ㄘㄨㄥ', 'ㄙ', 'ㄙㄚ', 'ㄙㄜ', 'ㄙㄞ', 'ㄙㄠ', 'ㄙㄡ', 'ㄙㄢ', 'ㄙㄣ', 'ㄙㄤ', 'ㄙㄥ', 'ㄙㄨ', 'ㄙㄨㄛ', 'ㄙㄨㄟ', 'ㄙㄨㄢ', 'ㄙㄨㄣ', 'ㄙㄨㄥ')
+
+# Attested tones per syllable (5 = neutral), from the Moedict map
+TONES = ((1, 5), (1, 2), (1, 2, 3, 4), (1, 2, 3, 4), (1, 2, 3, 4), (1, 3, 4), (1, 3, 4), (1, 5), (1, 2, 4), (2, 3, 4), (1, 2, 3, 4), (1, 2, 3, 4, 5), (1,), (1, 2, 3, 4, 5), (1, 2, 3, 4), (1, 2, 3, 4), (1, 2, 3, 4), (1, 2, 3, 4), (1, 2, 3, 4), (1, 2, 3, 4), (1, 2, 3, 4), (1, 2, 3, 4, 5), (1, 3, 4), (1, 2, 3, 4), (1, 2, 3, 4), (1, 2, 3, 4), (1, 2, 3, 4), (1, 2, 3, 4), (1, 3, 4), (1, 2, 3, 4), (1, 4), (1, 2, 3, 4), (1, 2, 3, 4), (1, 2, 3, 4), (1, 2, 3, 4, 5), (1, 2, 3, 4), (1, 2, 3, 4), (1, 3, 4), (1, 2, 3, 4), (1, 3, 4), (1, 3, 4), (1, 3, 4), (1, 2, 3, 4), (1, 2, 3, 4), (1, 2, 3, 4), (1, 3, 4), (1, 3, 4), (1, 4), (1, 3, 4), (1, 3, 4), (1, 2, 4), (1, 2, 3, 4), (1, 2, 3, 4), (1, 2, 4), (1, 2, 3, 4), (3,), (1, 2, 4), (1, 2, 4), (1, 2, 4), (1, 2, 3, 4), (1, 2, 3, 4), (1, 3), (1, 2, 3, 4), (1, 2, 4), (1, 2, 3, 4), (1, 2, 4), (1, 2, 3, 4), (1, 2, 3, 4, 5), (1, 2, 3, 4), (5,), (2, 3, 4), (2, 3, 4), (1, 2, 3, 4), (2, 3), (1, 2, 3, 4), (1, 2, 4), (2, 3), (1, 2, 3, 4), (1, 2, 3, 4), (1, 4), (1, 2, 3, 4), (4,), (2, 3, 4), (2, 3), (2, 4), (3, 4), (1, 2, 3, 4), (2,), (1, 2, 3, 4), (3,), (1, 2, 3, 4), (1, 2, 3, 4), (1, 2, 3, 4), (1, 2, 4), (1, 2, 3, 4), (1, 2, 3, 4), (2, 5), (1, 3, 4), (3,), (1, 3, 4), (1, 3, 4), (1, 3, 4), (1, 3, 4), (1, 3, 4), (1, 2, 3, 4), (1, 2), (1, 3, 4), (1,), (1, 3, 4), (1, 3, 4), (1, 2, 3, 4), (1, 2, 3, 4), (1, 4), (1, 3, 4), (1, 3, 4), (1, 3, 4), (1, 3, 4), (4,), (1, 2, 4), (1, 2, 3, 4), (1, 2, 4), (1, 2, 3, 4), (1, 2, 3, 4), (2,), (1, 2, 3, 4), (1, 3, 4), (1, 2, 3, 4), (1, 2, 3), (1, 2, 3, 4), (1, 2, 3, 4), (1, 2, 3, 4), (1, 2, 3, 4), (1, 2, 4), (1, 2, 4), (1, 2, 3, 4), (1, 2, 3, 4, 5), (4, 5), (3, 4), (3, 4), (1, 2, 3, 4), (1, 2, 3, 4), (4,), (2, 3), (2,), (2, 3, 4), (1, 4), (3, 4), (1, 2, 3, 4), (2, 3, 4), (2,), (2, 4), (2, 3, 4), (2, 3, 4), (2, 4), (), (3,), (), (2,), (3, 4), (4,), (1, 2, 3, 4, 5), (4, 5), (2, 4), (2, 3, 4), (1, 2, 3, 4), (1, 2, 3, 4), (2, 3, 4), (1, 2, 3, 4), (2, 3, 4), (2, 3, 4, 5), (3,), (3, 4), (2, 3, 4), (1, 2, 3, 4), (2, 3, 4), (2, 3, 4), (2, 3, 4), (1, 2, 3, 4), (1, 2, 3, 4, 5), (1, 2, 3, 4), (2, 3, 4), (1, 2, 4), (2, 3, 4), (2, 3, 4), (4,), (1, 2, 4), (1, 2, 3, 4), (1, 3, 4), (3,), (1, 3, 4), (1, 3, 4), (1, 3, 4), (1, 3, 4), (1, 3, 4), (1, 3, 4), (1, 2, 3, 4), (1, 3, 4), (1, 2, 3, 4), (1, 3, 4), (1, 3, 4), (1, 3, 4), (3, 4), (1, 3, 4), (1, 3, 4), (1, 3), (1, 2, 3, 4), (1, 3, 4), (), (1, 3, 4), (1, 3, 4), (1, 3, 4), (3,), (1, 2, 4), (1,), (1, 3, 4), (1, 3, 4), (4,), (3, 4), (1, 2, 3, 4), (1, 3), (1, 3, 4), (1, 2, 4), (1, 3, 4), (1, 2, 3), (1, 2, 4), (1, 2, 3, 4), (1,), (1, 2, 3, 4), (2, 3, 4), (1, 2, 3, 4), (2, 3, 4), (1, 2, 4), (1, 2, 4), (1, 2, 3, 4), (1, 2, 4), (2, 3, 4, 5), (2, 4), (1, 2, 3, 4), (1, 2, 3, 4), (1, 2, 4), (1, 2, 3, 4), (1, 2, 3, 4), (1, 2, 3, 4), (1, 2, 3, 4), (1, 2, 3, 4), (1, 2, 3, 4), (1, 3, 4), (1, 3, 4), (1, 3, 4), (1, 3, 4), (1, 3, 4), (1, 2, 3, 4), (1, 2, 4), (1, 3, 4), (1, 4), (3,), (1, 2, 3, 4), (1, 3, 4), (1, 2, 3, 4), (1, 2, 3, 4), (1, 2, 3), (1, 2, 3, 4), (1, 2, 3, 4), (1, 2, 3, 4), (1, 2, 3, 4), (1, 2, 3, 4), (1, 2, 4), (1, 2, 3, 4), (1, 2), (1, 2), (1, 2, 3, 4), (1, 2, 4), (1, 2, 3, 4), (1, 3, 4), (1, 3, 4), (1, 2, 3, 4), (1, 4), (1, 2, 3, 4), (1, 2, 3, 4), (1, 2, 3, 4), (1, 2, 3, 4), (1, 2, 3, 4), (1, 2, 4), (1, 2, 4), (1, 2, 3, 4), (1, 2, 3, 4), (1, 2, 3, 4, 5), (1, 2, 3, 4), (), (1, 2, 3, 4), (1, 2, 3, 4), (1, 3, 4), (1, 3, 4), (1, 3, 4), (1, 3, 4), (1, 2, 3, 4), (1, 3), (1, 2), (3, 4), (1, 2, 4), (1, 3, 4), (1, 2, 3), (1, 4), (1, 3, 4), (1, 2, 3, 4), (1, 2, 4), (3, 4), (1, 2, 4), (1, 2, 3), (1, 2, 3, 4), (1, 2, 3, 4), (1, 2, 4), (1, 2, 3, 4), (1, 2, 3, 4), (1, 2, 3, 4), (3,), (1, 4), (3, 4), (1, 2), (1, 2, 3, 4), (1, 2, 3), (1, 2, 3, 4), (1, 2, 3, 4), (1, 2, 3, 4, 5), (1, 2, 3, 4), (1, 2, 3, 4), (1, 3, 4), (2,), (1, 2, 3, 4), (1, 2, 3, 4), (1, 3, 4), (1, 2, 3, 4), (1, 3, 4, 5), (1, 2, 3, 4), (1, 2, 3, 4), (1, 3), (1, 4), (1, 3, 4), (2, 3, 4), (1, 4), (2, 3, 4), (1, 3), (4,), (3, 4), (2, 3, 4), (2, 4), (2, 3), (2, 3, 4), (2, 3, 4), (1, 2), (2, 3, 4), (4,), (2, 3, 4), (3,), (2, 4), (2, 3), (1, 3, 4), (1, 2), (2, 4), (1, 3, 4), (2,), (1, 2, 3, 4), (1, 3, 4), (1, 2, 3, 4), (3, 4), (1, 4), (1, 4), (1, 2, 3, 4), (1, 2, 3, 4), (2, 3, 4), (1, 3, 4), (1, 3, 4), (1, 3, 4), (1, 2, 3, 4), (1,), (4,), (1, 2, 3, 4), (), (1, 2, 3), (4,), (1, 2, 3, 4), (1, 2), (1, 2), (1, 2, 4), (1, 2, 4), (1, 2, 4), (1, 3, 4), (1, 2, 4), (1, 2, 3, 4), (1, 2), (1, 3, 4), (1, 3, 4), (4,), (1, 4), (1, 3, 4), (1, 3, 4), (1, 3, 4), (1,), (1, 3, 4), (1,), (1, 2, 4), (1, 3, 4), (1, 2, 3, 4), (1, 4), (1, 3), (1, 3, 4))
+
+# Lesson weights from syllable_frequency.json (0 = not in the frequency list)
+WEIGHTS = (8812, 9468, 23800, 34410, 15960, 13961, 22482, 8389, 4662, 25567, 156367, 41610, 5845, 43163, 49102, 73283, 82269, 56304, 46187, 59201, 92420, 19162, 21397, 7551, 97823, 49835, 34397, 38868, 3126, 138861, 31042, 63994, 34641, 35565, 41805, 46819, 22567, 48867, 44099, 50828, 11697, 24687, 6332, 64825, 6646, 11598, 39807, 8620, 31549, 39014, 16327, 24373, 17969, 19320, 19937, 2221, 21871, 5742, 13225, 25888, 39424, 2406, 11643, 16965, 15616, 30994, 32303, 36465, 49774, 4887, 21058, 49788, 33902, 7327, 27026, 12827, 17409, 21837, 34417, 5928, 25673, 2629, 24308, 8394, 23562, 48714, 24245, 2078, 34292, 4650, 51440, 36315, 38169, 50117, 130451, 23751, 12828, 35620, 0, 43470, 25016, 40261, 22375, 20415, 54787, 17841, 27914, 3732, 32950, 27342, 43656, 19826, 18218, 19994, 16151, 30913, 27907, 4490, 34071, 31955, 16568, 45076, 26695, 9205, 40058, 10359, 12196, 19178, 31087, 41156, 26303, 13929, 4300, 7719, 32090, 19947, 2358, 15131, 4616, 12958, 13560, 2046, 2465, 4924, 34118, 2233, 7358, 13028, 20035, 4662, 5811, 6470, 11459, 10608, 0, 3021, 0, 10394, 4962, 3415, 23344, 8333, 11675, 23738, 15576, 15022, 40358, 17052, 3967, 103717, 1924, 20186, 27214, 31724, 42428, 24698, 36186, 43527, 37712, 39060, 8927, 14590, 19632, 39629, 6121, 5403, 53087, 23550, 2594, 21574, 24611, 40655, 8792, 26803, 9355, 60121, 18270, 23887, 10327, 35717, 44121, 6092, 11945, 49478, 7563, 44949, 10768, 0, 14260, 10521, 19792, 8821, 13697, 4498, 22607, 8434, 10501, 10579, 15105, 6923, 12458, 17637, 15746, 5036, 54432, 24047, 8672, 22886, 27206, 43736, 14365, 4186, 15666, 55974, 36971, 41446, 12218, 61039, 30254, 17494, 36200, 29522, 180358, 57046, 79992, 66327, 39133, 105945, 67854, 41390, 84450, 68753, 24273, 15192, 23708, 1962, 109937, 6509, 12304, 33860, 28720, 58686, 28054, 17086, 46842, 38705, 19897, 31001, 6557, 9213, 113530, 34723, 66302, 58221, 26144, 82043, 31076, 78331, 50897, 48329, 20780, 24338, 36618, 25508, 149698, 21952, 19806, 15905, 0, 40066, 41622, 41560, 37265, 40197, 51324, 80604, 4882, 21256, 0, 8564, 17649, 7649, 24281, 40614, 49110, 24013, 15706, 6938, 26710, 28792, 22415, 28144, 45776, 47507, 42370, 0, 4496, 2108, 11495, 21244, 17925, 17731, 24255, 174043, 30405, 37730, 4211, 2282, 24874, 43710, 30841, 49829, 24350, 42103, 82324, 5983, 11054, 12406, 14498, 3679, 6795, 10836, 4997, 7237, 9230, 10735, 11310, 27652, 8803, 6235, 21466, 8046, 6733, 4284, 2644, 24548, 36628, 9704, 15892, 26710, 2780, 33270, 10635, 12727, 4607, 10451, 10400, 26606, 29568, 15689, 2880, 6669, 20267, 36510, 2954, 18580, 43060, 0, 15876, 2657, 22455, 0, 16371, 7331, 10140, 16180, 16828, 2129, 16440, 15953, 50491, 9063, 10588, 7493, 8430, 9319, 11243, 3617, 7984, 2614, 38220, 22600, 29014, 9809, 8779, 25440)
+
+INITIALS = 'ㄅㄆㄇㄈㄉㄊㄋㄌㄍㄎㄏㄐㄑㄒㄓㄔㄕㄖㄗㄘㄙ'
+MEDIALS = 'ㄧㄨㄩ'
+FINALS = 'ㄚㄛㄜㄝㄞㄟㄠㄡㄢㄣㄤㄥㄦ'
+TONE_MARKS = 'ˊˇˋ˙'
+SYMBOL_KEYS = {'ㄅ': '1', 'ㄆ': 'q', 'ㄇ': 'a', 'ㄈ': 'z', 'ㄉ': '2', 'ㄊ': 'w', 'ㄋ': 's', 'ㄌ': 'x', 'ㄍ': 'e', 'ㄎ': 'd', 'ㄏ': 'c', 'ㄐ': 'r', 'ㄑ': 'f', 'ㄒ': 'v', 'ㄓ': '5', 'ㄔ': 't', 'ㄕ': 'g', 'ㄖ': 'b', 'ㄗ': 'y', 'ㄘ': 'h', 'ㄙ': 'n', 'ㄧ': 'u', 'ㄨ': 'j', 'ㄩ': 'm', 'ㄚ': '8', 'ㄛ': 'i', 'ㄜ': 'k', 'ㄝ': ',', 'ㄞ': '9', 'ㄟ': 'o', 'ㄠ': 'l', 'ㄡ': '.', 'ㄢ': '0', 'ㄣ': 'p', 'ㄤ': ';', 'ㄥ': '/', 'ㄦ': '-', 'ˊ': '6', 'ˇ': '3', 'ˋ': '4', '˙': '7'}
+TONE_KEYS = {1: ' ', 2: '6', 3: '3', 4: '4', 5: '7'}
+
+SYLLABLE_IDS = {s: i for i, s in enumerate(SYLLABLES)}
+SYLLABLE_SET = frozenset(SYLLABLES)
+
+def split_syllable(syllable):
+    initial = syllable[0] if syllable[0] in INITIALS else ''
+    rest = syllable[len(initial):]
+    medial = rest[0] if rest and rest[0] in MEDIALS else ''
+    return initial, medial, rest[len(medial):]
+
+COMPONENTS = {s: split_syllable(s) for s in SYLLABLES}
+KEYSTROKES = {s: ''.join(SYMBOL_KEYS[c] for c in s) for s in SYLLABLES}
+
+def toned(syllable, tone):
+    return syllable if tone == 1 else syllable + TONE_MARKS[tone - 2]
+
+TONED_SYLLABLES = frozenset(toned(s, t) for s, tones in zip(SYLLABLES, TONES) for t in tones)
+
+def toned_keystrokes(syllable, tone):
+    return KEYSTROKES[syllable] + TONE_KEYS[tone]
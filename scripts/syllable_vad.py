@@ -0,0 +1,197 @@
+import collections
+
+import numpy as np
+
+# Spectral voice-activity detection and first-syllable boundary for the
+# Moedict clips, some of which hold a whole compound word ("tang" ->
+# "tang shui"), often with no silence between the syllables.
+#
+# Short-time spectra of the clip give, per frame: energy, spectral flatness
+# (noise vs tonal), periodicity (voicing, from the autocorrelation of the
+# power spectrum) and spectral flux (how much new energy appears). Speech
+# frames are energetic and tonal or voiced; syllable nuclei are runs of
+# strongly voiced energy, and the first syllable ends in the valley before
+# the second nucleus, even where that valley never reaches silence.
+
+VAD = {
+    'frame_ms': 32,
+    'hop_ms': 10,
+    'band_hz': [80, 4000], # nucleus energy band
+    'pitch_hz': [70, 400], # voicing search range
+    'speech_db': 12, # speech frames: this far above the noise floor...
+    'max_flatness': 0.5, # ...and tonal, or voiced above min_voicing
+    'min_voicing': 0.4,
+    'smooth_ms': 20,
+    'min_syllable_ms': 120, # no boundary closer than this to the start of speech...
+    'min_nucleus_ms': 60, # ...or to its end
+    'flux_onset': 0.5, # spectral flux of a clear new onset
+    'dip_weight': 0.6, # boundary score: dip depth vs onset flux at the valley's far side
+    'min_score': 0.45, # score that separates two syllables
+    'gap_ms': 250, # silence that ends the word outright
+    'buffer_ms': 20, # kept after a valley cut (at most half the valley)
+    'gap_buffer_ms': 150, # kept after speech that ends in a gap
+    'max_syllable_sec': 0.7, # longer first syllables lower the confidence
+}
+
+Boundary = collections.namedtuple('Boundary', ['end', 'confidence', 'method', 'nuclei'])
+
+# Below this a valley boundary is only a guess (a tone-3 dip can score near
+# it), so nothing is cut there on its own; gap boundaries are always safe
+CUT_CONFIDENCE = 0.6
+
+def is_cut_safe(method, confidence, min_confidence=CUT_CONFIDENCE):
+    """Whether a boundary can be cut at without a listen: a gap, or a confident valley."""
+    return method == 'gap' or (method == 'valley' and confidence >= min_confidence)
+
+def _frames(samples, rate, vad):
+    frame = int(rate * vad['frame_ms'] / 1000)
+    hop = int(rate * vad['hop_ms'] / 1000)
+    x = samples.astype(np.float64) / 32768
+    if len(x) < frame:
+        x = np.concatenate((x, np.zeros(frame - len(x))))
+    return np.lib.stride_tricks.sliding_window_view(x, frame)[::hop] * np.hanning(frame), hop
+
+def frame_features(samples, rate, vad=VAD):
+    """Per-frame energy (dB), flatness, voicing and flux of int16 samples, all vectorized."""
+    frames, hop = _frames(samples, rate, vad)
+    n_fft = 1 << int(2 * frames.shape[1] - 1).bit_length() # room for non-circular autocorrelation
+    power = np.abs(np.fft.rfft(frames, n_fft, axis=1)) ** 2
+    freqs = np.fft.rfftfreq(n_fft, 1 / rate)
+
+    band = (freqs >= vad['band_hz'][0]) & (freqs <= vad['band_hz'][1])
+    band_power = power[:, band]
+    tiny = 1e-12
+    energy_db = 10 * np.log10(power.sum(axis=1) / n_fft + tiny)
+    band_db = 10 * np.log10(band_power.sum(axis=1) / n_fft + tiny)
+    flatness = np.exp(np.mean(np.log(band_power + tiny), axis=1)) / (band_power.mean(axis=1) + tiny)
+
+    # Wiener-Khinchin: autocorrelation is the inverse FFT of the power spectrum
+    autocorr = np.fft.irfft(power, n_fft, axis=1)
+    lo, hi = int(rate / vad['pitch_hz'][1]), int(rate / vad['pitch_hz'][0])
+    voicing = np.clip(autocorr[:, lo:hi + 1].max(axis=1) / (autocorr[:, 0] + tiny), 0, 1)
+
+    magnitude = np.sqrt(band_power)
+    rise = np.maximum(np.diff(magnitude, axis=0, prepend=magnitude[:1]), 0).sum(axis=1)
+    flux = rise / (magnitude.sum(axis=1) + tiny)
+
+    return {
+        'hop_sec': hop / rate,
+        'frame_sec': frames.shape[1] / rate,
+        'energy_db': energy_db,
+        'band_db': band_db,
+        'flatness': flatness,
+        'voicing': voicing,
+        'flux': flux,
+    }
+
+def _smooth(values, frames):
+    if frames <= 1:
+        return values
+    kernel = np.ones(frames) / frames
+    return np.convolve(np.pad(values, (frames // 2, frames - 1 - frames // 2), mode='edge'), kernel, mode='valid')
+
+def _runs(mask):
+    """(start, end) index pairs of the True runs in a boolean array (end exclusive)."""
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return list(zip(np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)))
+
+def speech_mask(features, vad=VAD):
+    energy = features['energy_db']
+    floor = np.percentile(energy, 10)
+    threshold = floor + max(vad['speech_db'], 0.25 * (energy.max() - floor))
+    tonal = (features['flatness'] < vad['max_flatness']) | (features['voicing'] > vad['min_voicing'])
+    return (energy > threshold) & tonal
+
+def nucleus_strength(features, vad=VAD):
+    """Voiced band energy above the floor, smoothed: peaks at vowels, dips between syllables."""
+    band = features['band_db']
+    above = np.clip(band - np.percentile(band, 10), 0, None)
+    strength = above * features['voicing']
+    return _smooth(strength, int(vad['smooth_ms'] / vad['hop_ms']))
+
+def first_syllable(samples, rate, vad=VAD):
+    """Boundary(end sec, confidence 0..1, method, nuclei) of the first syllable, or None if no speech.
+
+    method is 'valley' (cut between two syllables with no gap), 'gap' (speech
+    followed by silence, then more speech) or 'single' (nothing after it).
+    """
+    if len(samples) == 0:
+        return None
+    features = frame_features(samples, rate, vad)
+    hop = features['hop_sec']
+    mask = speech_mask(features, vad)
+    speech = _runs(mask)
+    if not speech:
+        return None
+
+    # Speech runs separated by less than gap_ms belong to the same word
+    gap_frames = int(vad['gap_ms'] / vad['hop_ms'])
+    word_start, word_end = speech[0]
+    next_start = None
+    for start, end in speech[1:]:
+        if start - word_end >= gap_frames:
+            next_start = start
+            break
+        word_end = end
+
+    strength = nucleus_strength(features, vad)
+    boundaries = []
+    best_rejected = 0.0
+    min_syllable = int(vad['min_syllable_ms'] / vad['hop_ms'])
+    min_nucleus = int(vad['min_nucleus_ms'] / vad['hop_ms'])
+    lo, hi = word_start + min_syllable, word_end - min_nucleus
+    if hi > lo:
+        # Candidate boundaries: where the nucleus strength stops falling
+        s = strength[lo - 1:hi + 1]
+        candidates = lo + np.flatnonzero((s[1:-1] < s[:-2]) & (s[1:-1] <= s[2:]))
+        valley_end = lo
+        for c in candidates:
+            if c < valley_end:
+                continue # inside the valley already scored
+            left_peak = strength[word_start:c].max()
+            right_peak = strength[c:word_end].max()
+            rim = min(left_peak, right_peak)
+            if rim <= 0:
+                continue
+
+            # The valley runs until the strength is halfway back up to the rim;
+            # its floor is the stretch within 10% of the bottom
+            rise = np.flatnonzero(strength[c:word_end] > (strength[c] + rim) / 2)
+            valley_end = c + (rise[0] if len(rise) else word_end - c)
+            valley = strength[c:valley_end]
+            bottom = valley.min()
+            depth = 1 - bottom / rim
+            low = c + np.flatnonzero(valley <= bottom + 0.1 * (rim - bottom))
+            first_low, last_low = low[0], low[-1]
+
+            # A new onset of spectral energy on the valley's far side backs up the cut,
+            # unless the valley stays voiced: a dip inside one syllable (a tone-3
+            # creak, a glide) re-rises with flux but no consonant, so only depth counts
+            onset = min(1.0, features['flux'][max(0, last_low - 3):last_low + 4].max() / vad['flux_onset'])
+            if features['voicing'][first_low:last_low + 1].min() > vad['min_voicing']:
+                onset = 0.0
+            score = vad['dip_weight'] * depth + (1 - vad['dip_weight']) * onset
+            if score < vad['min_score']:
+                best_rejected = max(best_rejected, score)
+                continue
+            boundaries.append((first_low, last_low, score))
+
+    if boundaries:
+        first_low, last_low, score = boundaries[0]
+        # Cut where the valley bottoms out, plus a short buffer that never
+        # reaches past the middle of the valley
+        cut = min(first_low + vad['buffer_ms'] / vad['hop_ms'], (first_low + last_low) / 2)
+        end = cut * hop + features['frame_sec'] / 2 # frame centre
+        confidence = score * min(1.0, vad['max_syllable_sec'] / ((first_low - word_start) * hop))
+        return Boundary(round(end, 3), round(float(np.clip(confidence, 0, 1)), 2), 'valley', len(boundaries) + 1)
+
+    # No syllable boundary inside the word: it ends at its last speech frame.
+    # Near-miss valleys and an overlong word lower the confidence.
+    duration = (word_end - word_start) * hop
+    confidence = (1 - best_rejected) * min(1.0, vad['max_syllable_sec'] / duration)
+    end = word_end * hop + vad['gap_buffer_ms'] / 1000
+    if next_start is not None:
+        end = min(end, (word_end + next_start) * hop / 2) # never into the next word
+    end = min(end, len(samples) / rate)
+    method = 'single' if next_start is None else 'gap'
+    return Boundary(round(end, 3), round(float(np.clip(confidence, 0, 1)), 2), method, 1)
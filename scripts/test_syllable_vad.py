@@ -0,0 +1,85 @@
+import os
+import unittest
+
+import numpy as np
+
+try:
+    from condition_audio import Edit, SplitCompound
+    from syllable_vad import first_syllable
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(__file__))
+    from condition_audio import Edit, SplitCompound
+    from syllable_vad import first_syllable
+
+# Synthetic clips for syllable_vad.first_syllable: a harmonic "vowel" with a
+# pitch contour and an amplitude envelope, padded with low noise.
+#
+#   python3 -m unittest discover scripts
+
+RATE = 16000
+
+def voiced(f0, amp):
+    phase = 2 * np.pi * np.cumsum(f0) / RATE
+    return amp * sum(np.sin(k * phase) / k for k in range(1, 12))
+
+def clip(x, pad_sec=0.1):
+    silence = np.zeros(int(pad_sec * RATE))
+    x = np.concatenate((silence, x, silence))
+    noise = np.random.default_rng(0).normal(0, 30, len(x))
+    return np.round(x * 8000 + noise).astype(np.int16)
+
+def tone3(duration, dip):
+    """One dipping-tone syllable: pitch falls then rises, loudness drops to dip at the turn."""
+    t = np.linspace(0, 1, int(duration * RATE))
+    f0 = np.interp(t, [0, 0.5, 1], [200, 110, 230])
+    amp = np.interp(t, [0, 0.05, 0.35, 0.5, 0.65, 0.95, 1], [0, 1, 1, dip, 1, 1, 0])
+    return clip(voiced(f0, amp))
+
+def compound(syllable_sec=0.35, burst_sec=0.03):
+    """Two syllables joined by a short unvoiced consonant, no silence between them."""
+    t = np.linspace(0, 1, int(syllable_sec * RATE))
+    first = voiced(np.full(len(t), 180.0), np.interp(t, [0, 0.1, 0.8, 1], [0, 1, 1, 0.1]))
+    burst = np.random.default_rng(1).normal(0, 0.6, int(burst_sec * RATE))
+    second = voiced(np.full(len(t), 150.0), np.interp(t, [0, 0.1, 0.8, 1], [0.1, 1, 1, 0]))
+    return clip(np.concatenate((first, burst, second)))
+
+class FirstSyllableTest(unittest.TestCase):
+    def test_single_syllable_with_dip_is_not_split(self):
+        for duration in (0.5, 0.6, 0.8):
+            for dip in (0.3, 0.1, 0.02):
+                with self.subTest(duration=duration, dip=dip):
+                    boundary = first_syllable(tone3(duration, dip), RATE)
+                    self.assertEqual(boundary.method, 'single')
+                    self.assertEqual(boundary.nuclei, 1)
+                    # The whole syllable is kept, tail included
+                    self.assertGreaterEqual(boundary.end, 0.1 + duration)
+
+    def test_compound_is_split_between_syllables(self):
+        boundary = first_syllable(compound(), RATE)
+        self.assertEqual(boundary.method, 'valley')
+        self.assertEqual(boundary.nuclei, 2)
+        self.assertGreaterEqual(boundary.confidence, SplitCompound().min_confidence)
+        # After the first syllable, before the second one's nucleus
+        self.assertGreater(boundary.end, 0.1 + 0.3)
+        self.assertLess(boundary.end, 0.1 + 0.35 + 0.03 + 0.05)
+
+class SplitCompoundTest(unittest.TestCase):
+    def plan(self, samples):
+        edit = Edit(len(samples))
+        return SplitCompound().plan(samples, RATE, edit), edit
+
+    def test_short_clip_is_left_alone(self):
+        samples = tone3(0.5, 0.02)
+        note, edit = self.plan(samples)
+        self.assertIsNone(note)
+        self.assertTrue(edit.is_noop(len(samples)))
+
+    def test_long_compound_is_cut(self):
+        samples = compound()
+        note, edit = self.plan(samples)
+        self.assertIsNotNone(note)
+        self.assertLess(edit.end, len(samples))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+import collections
+import os
+import unittest
+
+try:
+    import aggregate_frequency
+    from zhuyin_readings import load_phrases, read_phrases
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(__file__))
+    import aggregate_frequency
+    from zhuyin_readings import load_phrases, read_phrases
+
+# Polyphones in traditional text, read in context with Moedict's words
+# (scripts/moedict_audio_map.json).
+#
+#   python3 -m unittest discover scripts
+
+PHRASES = load_phrases()
+
+class ReadPhrasesTest(unittest.TestCase):
+    def test_traditional_text_is_read_in_context(self):
+        # 銀行 and 長處 are Moedict words; 行長 is not, so its chars stay unknown
+        self.assertEqual(read_phrases('銀行行長長處', PHRASES),
+                         ['ㄧㄣˊ', 'ㄏㄤˊ', None, None, 'ㄔㄤˊ', 'ㄔㄨˋ'])
+
+    def test_single_chars_have_no_context(self):
+        self.assertEqual(read_phrases('長', PHRASES), [None])
+
+class FlushContextsTest(unittest.TestCase):
+    def setUp(self):
+        readings = {'銀': 'ㄧㄣˊ', '行': 'ㄒㄧㄥˊ', '長': 'ㄓㄤˇ', '處': 'ㄔㄨˋ'}
+        aggregate_frequency._init_worker(readings, {'行', '長', '處'}, PHRASES)
+
+    def test_unmatched_windows_are_not_learned(self):
+        line = '銀行行長長處'
+        contexts = collections.Counter(aggregate_frequency.context_window(line, i) for i in range(1, len(line)))
+        reading_counts = collections.Counter()
+        unread = collections.Counter()
+        aggregate_frequency._flush_contexts(contexts, reading_counts, unread, collections.Counter())
+        self.assertEqual(reading_counts, {('行', 'ㄏㄤˊ'): 1, ('長', 'ㄔㄤˊ'): 1, ('處', 'ㄔㄨˋ'): 1})
+        # The first reading pypinyin gives traditional text is never counted
+        self.assertNotIn(('長', 'ㄓㄤˇ'), reading_counts)
+        self.assertEqual(unread, {'行': 1, '長': 1})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,198 @@
+import argparse
+import json
+import os
+import shutil
+
+import numpy as np
+
+try:
+    from audio_cache import AudioCache
+    from audio_io import decode_pcm_native, encode_pcm
+    from audio_jobs import add_jobs_argument, run_jobs, temp_path
+    from build_audio_sprites import collect_sources
+    from loudness import apply_gain_pcm, audio_key, content_hash, file_gain, load_loudness
+    from syllable_vad import is_cut_safe
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(__file__))
+    from audio_cache import AudioCache
+    from audio_io import decode_pcm_native, encode_pcm
+    from audio_jobs import add_jobs_argument, run_jobs, temp_path
+    from build_audio_sprites import collect_sources
+    from loudness import apply_gain_pcm, audio_key, content_hash, file_gain, load_loudness
+    from syllable_vad import is_cut_safe
+
+# Size-optimized copies of every syllable clip for slow networks: Opus (small,
+# made for speech) plus an MP3 fallback for browsers without Opus. The app
+# takes them from the manifest instead of the source OGG/MP3 when they are
+# present (build_audio_manifest.py lists them as variants).
+#
+# Each clip is decoded once, gets its loudness gain baked in (like the
+# sprites), and is encoded at the format's bitrate. Clips that come out over
+# the byte budget step down the bitrate ladder; clips over the duration
+# budget are cut at their first-syllable boundary with a short fade, if it is
+# one condition_audio.py would cut at (a gap or a confident valley), and at
+# the budget otherwise, so a long single syllable isn't cut at a dip. Unchanged sources with unchanged settings are skipped, using
+# the index in the output dir.
+
+PUBLIC_AUDIO_DIR = os.path.join(os.path.dirname(__file__), '../public/audio')
+OUTPUT_DIR = os.path.join(PUBLIC_AUDIO_DIR, 'syllables_opus')
+INDEX_FILE = 'transcode.json'
+
+# kbps is where encoding starts; clips over the byte budget step down the ladder
+FORMATS = {
+    'opus': {'ext': 'opus', 'rate': 48000, 'kbps': 24, 'ladder': [20, 16, 12],
+             'args': ['-c:a', 'libopus', '-application', 'voip', '-vbr', 'on']},
+    'mp3': {'ext': 'mp3', 'rate': 22050, 'kbps': 40, 'ladder': [32, 24], # MPEG-2 layer III rates
+            'args': ['-c:a', 'libmp3lame']},
+}
+
+BUDGET = {
+    'max_bytes': 6 * 1024, # per clip and format
+    'max_sec': 0.9,
+    'fade_ms': 20, # at a duration cut
+}
+
+SLOW_LINK_KBPS = 256 # for the first-play transfer estimate
+
+def bitrate_ladder(spec):
+    """Bitrates to try, from the starting one down."""
+    return [spec['kbps']] + [kbps for kbps in spec['ladder'] if kbps < spec['kbps']]
+
+def cut_to_budget(frames, rate, boundary_sec, max_sec, fade_ms):
+    """(frames, cut) with the clip shortened to max_sec, at the syllable boundary when it fits."""
+    samples = np.frombuffer(frames, dtype='<i2')
+    if len(samples) <= max_sec * rate:
+        return frames, False
+    end_sec = boundary_sec if boundary_sec and boundary_sec <= max_sec else max_sec
+    kept = samples[:int(end_sec * rate)].astype(np.float32)
+    fade = min(len(kept), int(rate * fade_ms / 1000))
+    if fade:
+        kept[-fade:] *= np.linspace(1, 0, fade, dtype=np.float32)
+    return np.round(kept).astype('<i2').tobytes(), True
+
+def transcode_item(item):
+    """Encode one clip in every format within the budget; {'duration', 'cut', 'formats'} or {'error'}."""
+    name, path, gain, boundary_sec, formats, budget = item
+    frames, rate = decode_pcm_native(path)
+    if frames is None or len(frames) == 0:
+        return {'error': "decode failed"}
+    if gain:
+        frames = apply_gain_pcm(frames, gain, rate)
+    frames, cut = cut_to_budget(frames, rate, boundary_sec, budget['max_sec'], budget['fade_ms'])
+
+    results = {}
+    for fmt, spec in formats.items():
+        out = None
+        for kbps in bitrate_ladder(spec):
+            out = temp_path(f".{spec['ext']}")
+            codec_args = [*spec['args'], '-b:a', f"{kbps}k", '-ar', str(spec['rate'])]
+            if not encode_pcm(frames, rate, out, codec_args):
+                return {'error': f"{fmt} encode failed"}
+            size = os.path.getsize(out)
+            if size <= budget['max_bytes']:
+                break
+        dest = os.path.join(OUTPUT_DIR, f"{name}.{spec['ext']}")
+        shutil.move(out, dest)
+        results[fmt] = {
+            'file': audio_key(dest),
+            'bytes': size,
+            'kbps': kbps,
+            'hash': content_hash(dest),
+            'over_budget': size > budget['max_bytes'],
+        }
+    return {'duration': round(len(frames) / 2 / rate, 3), 'cut': cut, 'formats': results}
+
+def load_index(path):
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {'clips': {}}
+
+def main():
+    parser = argparse.ArgumentParser(description="Transcode syllable clips to budgeted Opus with an MP3 fallback.")
+    parser.add_argument('--opus-kbps', type=int, default=FORMATS['opus']['kbps'], help="Opus bitrate to start from")
+    parser.add_argument('--mp3-kbps', type=int, default=FORMATS['mp3']['kbps'], help="MP3 bitrate to start from")
+    parser.add_argument('--max-kb', type=float, default=BUDGET['max_bytes'] / 1024, help="Byte budget per clip and format, in KB")
+    parser.add_argument('--max-sec', type=float, default=BUDGET['max_sec'], help="Duration budget per clip")
+    parser.add_argument('--ogg-only', action='store_true', help="Ignore Google TTS MP3 syllables")
+    parser.add_argument('--force', action='store_true', help="Re-encode unchanged clips too")
+    add_jobs_argument(parser)
+    args = parser.parse_args()
+
+    formats = {fmt: dict(spec) for fmt, spec in FORMATS.items()}
+    formats['opus']['kbps'] = args.opus_kbps
+    formats['mp3']['kbps'] = args.mp3_kbps
+    budget = dict(BUDGET, max_bytes=int(args.max_kb * 1024), max_sec=args.max_sec)
+    settings = {'formats': formats, 'budget': budget}
+
+    sources = [(name, path) for kind, name, path in collect_sources(prefer_mp3=not args.ogg_only) if kind == 'syllables']
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    index_path = os.path.join(OUTPUT_DIR, INDEX_FILE)
+    index = load_index(index_path)
+    if index.get('settings') != settings:
+        index['clips'] = {}
+    index['settings'] = settings
+
+    # Boundaries for the duration cuts come from the analysis cache
+    loudness = load_loudness()
+    measurements = AudioCache().measure_all([path for _, path in sources], args.jobs)
+
+    items = []
+    for name, path in sources:
+        digest = content_hash(path)
+        gain = file_gain(loudness, path, digest)
+        vad = measurements[path].get('vad')
+        boundary = vad['end'] if vad and is_cut_safe(vad['method'], vad['confidence']) else None
+        entry = index['clips'].get(name)
+        if (not args.force and entry and entry.get('source_hash') == digest and entry.get('gain') == gain
+                and entry.get('boundary') == boundary
+                and all(os.path.exists(os.path.join(PUBLIC_AUDIO_DIR, f['file'])) for f in entry['formats'].values())):
+            continue
+        items.append((name, path, gain, boundary, formats, budget))
+    print(f"{len(sources)} syllable clips, {len(items)} to transcode "
+          f"(Opus {args.opus_kbps}k, MP3 {args.mp3_kbps}k, budget {budget['max_bytes'] / 1024:.1f} KB / {budget['max_sec']}s)")
+
+    failed = 0
+    for (name, path, gain, boundary, _, _), result in run_jobs(transcode_item, items, args.jobs):
+        if 'error' in result:
+            print(f"  FAILED {name}: {result['error']}")
+            index['clips'].pop(name, None)
+            failed += 1
+            continue
+        result.update({'source': audio_key(path), 'source_hash': content_hash(path), 'gain': gain, 'boundary': boundary})
+        index['clips'][name] = result
+
+    # Drop clips whose source is gone
+    names = {name for name, _ in sources}
+    for name in [n for n in index['clips'] if n not in names]:
+        del index['clips'][name]
+    wanted = {os.path.basename(f['file']) for entry in index['clips'].values() for f in entry['formats'].values()}
+    for f in os.listdir(OUTPUT_DIR):
+        if f != INDEX_FILE and f not in wanted:
+            os.remove(os.path.join(OUTPUT_DIR, f))
+
+    index['clips'] = dict(sorted(index['clips'].items()))
+    with open(index_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, indent=1)
+
+    clips = index['clips'].values()
+    before = sum(os.path.getsize(os.path.join(PUBLIC_AUDIO_DIR, c['source'])) for c in clips)
+    print(f"\nPayload for {len(clips)} clips: sources {before / 1024:.0f} KB")
+    for fmt in formats:
+        sizes = np.array([c['formats'][fmt]['bytes'] for c in clips] or [0])
+        total = sizes.sum()
+        change = f" ({100 * (total / before - 1):+.0f}%)" if before else ""
+        print(f"  {fmt:<5} {total / 1024:.0f} KB{change}, median {np.median(sizes) / 1024:.1f} KB "
+              f"(~{np.median(sizes) * 8 / SLOW_LINK_KBPS:.0f} ms first play at {SLOW_LINK_KBPS} kbit/s), "
+              f"largest {sizes.max() / 1024:.1f} KB")
+
+    cut = sorted(name for name, c in index['clips'].items() if c['cut'])
+    over = sorted(f"{name}.{fmt}" for name, c in index['clips'].items() for fmt, f in c['formats'].items() if f['over_budget'])
+    print(f"Cut to the {budget['max_sec']}s budget: {len(cut)}" + (f" ({', '.join(cut[:10])}{' ...' if len(cut) > 10 else ''})" if cut else ""))
+    print(f"Over the byte budget at the lowest bitrate: {len(over)}" + (f" ({', '.join(over[:10])}{' ...' if len(over) > 10 else ''})" if over else ""))
+    if failed:
+        print(f"Failed: {failed}")
+
+if __name__ == "__main__":
+    main()
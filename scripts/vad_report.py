@@ -0,0 +1,76 @@
+import argparse
+import collections
+import json
+import os
+
+try:
+    from audio_cache import AudioCache
+    from audio_jobs import add_jobs_argument
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(__file__))
+    from audio_cache import AudioCache
+    from audio_jobs import add_jobs_argument
+
+# Review report for the first-syllable boundaries syllable_vad.py finds in
+# the Moedict clips (cached with the rest of the analysis). Lists the cuts
+# below --min-confidence, the ones worth listening to before
+# condition_audio.py applies them; replaces the find_long_audio.py ->
+# listen -> batch_fix_long.py loop.
+#
+#   vad_report.py                        # summary + low-confidence cuts
+#   vad_report.py -o vad_review.json     # the same, for every file, as JSON
+
+AUDIO_DIR = os.path.join(os.path.dirname(__file__), '../public/audio/syllables_ogg')
+LONG_SEC = 0.8 # find_long_audio.py's threshold
+
+def review_rows(paths, measurements):
+    """One row per file: name, duration, VAD boundary and whether the cut shortens it."""
+    rows = []
+    for path in paths:
+        m = measurements[path]
+        vad = m.get('vad')
+        duration = m.get('duration') or 0.0
+        rows.append({
+            'file': os.path.basename(path),
+            'duration': round(duration, 3),
+            'end': vad['end'] if vad else None,
+            'confidence': vad['confidence'] if vad else 0.0,
+            'method': vad['method'] if vad else 'no speech',
+            'syllables': vad['nuclei'] if vad else 0,
+            'cut_sec': round(duration - vad['end'], 3) if vad else 0.0,
+        })
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Report first-syllable boundaries and their confidence across the syllable clips.")
+    parser.add_argument('files', nargs='*', help="Files to report on (default: every .ogg in syllables_ogg)")
+    parser.add_argument('--min-confidence', type=float, default=0.6, help="List cuts below this confidence for review")
+    parser.add_argument('-o', '--output', help="Write every row (and the review list) as JSON")
+    add_jobs_argument(parser)
+    args = parser.parse_args()
+
+    paths = args.files or sorted(os.path.join(AUDIO_DIR, f) for f in os.listdir(AUDIO_DIR) if f.endswith('.ogg'))
+    rows = review_rows(paths, AudioCache().measure_all(paths, args.jobs))
+
+    methods = collections.Counter(row['method'] for row in rows)
+    print(f"{len(rows)} files: " + ', '.join(f"{count} {method}" for method, count in methods.most_common()))
+    long_rows = [row for row in rows if row['duration'] > LONG_SEC]
+    fixed = [row for row in long_rows if row['end'] is not None and row['end'] <= LONG_SEC]
+    print(f"Over {LONG_SEC}s: {len(long_rows)}, brought under it by the boundary cut: {len(fixed)}")
+
+    review = sorted((row for row in rows if row['confidence'] < args.min_confidence and (row['end'] is None or row['cut_sec'] > 0)),
+                    key=lambda row: row['confidence'])
+    print(f"\nLow-confidence cuts (< {args.min_confidence}): {len(review)}")
+    for row in review:
+        end = f"{row['end']:.2f}s" if row['end'] is not None else "-"
+        print(f"  {row['file']:<24} {row['confidence']:.2f}  {row['method']:<9} cut at {end} of {row['duration']:.2f}s")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'min_confidence': args.min_confidence, 'review': [row['file'] for row in review], 'files': rows},
+                      f, ensure_ascii=False, indent=1)
+        print(f"\nWrote {args.output}")
+
+if __name__ == "__main__":
+    main()
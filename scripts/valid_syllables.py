@@ -1,5 +1,7 @@
 # Common Valid Zhuyin Syllables (without tones for simplicity in typing practice)
 # Source: Standard Pinyin/Zhuyin tables
+# Curated input to build_syllable_inventory.py; scripts and the app read the
+# generated syllable_inventory.py / src/data/syllable_inventory.json instead.
 VALID_SYLLABLES_NO_TONE = [
     # A
     "ㄚ", "ㄞ", "ㄢ", "ㄤ", "ㄠ",
@@ -0,0 +1,257 @@
+import collections
+import hashlib
+import json
+import os
+import re
+
+try:
+    from moedict_index import MAPPING_FILE
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(__file__))
+    from moedict_index import MAPPING_FILE
+
+# Character -> Zhuyin reading lookups for the frequency builders. Readings come
+# from pypinyin in batched calls and are kept in a cache file, so re-runs
+# (and runs without pypinyin installed) skip conversion entirely.
+#
+# Polyphones (characters with several readings, e.g. 的 長 了) get a reading
+# distribution instead of just their first reading: learned from corpus
+# contexts when a corpus has been aggregated, otherwise a prior from how
+# often each reading occurs in Moedict's (traditional) words. The learned
+# counts are kept in LEARNED_FILE, which is committed, so the weights only
+# depend on files in the repo.
+#
+# Corpus text is read in context with Moedict's words, not pypinyin's phrase
+# dictionary: that one is keyed by simplified characters, so traditional
+# text would only ever get each polyphone's first reading.
+
+CACHE_FILE = os.path.join(os.path.dirname(__file__), '.reading_cache.json')
+LEARNED_FILE = os.path.join(os.path.dirname(__file__), 'polyphone_readings.json')
+
+# str.translate table that deletes the tone marks ˊ ˇ ˋ ˙
+TONE_TABLE = str.maketrans('', '', 'ˊˇˋ˙')
+
+# One toned syllable of a Moedict reading; several can run together ("ㄒㄧㄚˋ˙ㄗ")
+TONED_SYLLABLE = re.compile(r'˙?[ㄅ-ㄙ]?[ㄧㄨㄩ]?[ㄚ-ㄦ]?[ˊˇˋ]?')
+
+# Prior: this share of a polyphone's weight goes to its first (most common)
+# reading, the rest is split by how often each reading occurs in phrases
+PRIMARY_PRIOR = 0.5
+# Learned counts are smoothed towards the prior with this many pseudo-counts
+PRIOR_STRENGTH = 5
+# Longest Moedict word tried when reading text in context
+MAX_PHRASE = 8
+
+def strip_tones(reading):
+    return reading.translate(TONE_TABLE)
+
+def converter_version():
+    try:
+        import pypinyin
+    except ImportError:
+        return None
+    return pypinyin.__version__
+
+def convert(chars):
+    """First Bopomofo reading (with tone) of each char, from one pypinyin call.
+
+    Passing a list makes pypinyin treat every char as its own word, so
+    neighbours are never read as a phrase. A char with no reading is
+    returned unchanged, like pypinyin does.
+    """
+    return [readings[0] for readings in convert_heteronyms(chars, heteronym=False)]
+
+def convert_heteronyms(chars, heteronym=True):
+    """All Bopomofo readings of each char (first = most common), one pypinyin call."""
+    from pypinyin import pinyin, Style
+
+    chars = list(chars)
+    result = pinyin(chars, style=Style.BOPOMOFO, heteronym=heteronym)
+    if len(result) != len(chars):
+        # Only possible if non-CJK items got merged; fall back to one call each
+        result = [pinyin(char, style=Style.BOPOMOFO, heteronym=heteronym)[0] for char in chars]
+    return result
+
+def split_syllables(bopomofo):
+    """Toned syllables of a (possibly multi-syllable) Moedict reading, written like pypinyin's.
+
+    Moedict puts the neutral-tone dot first ("˙ㄗ"), pypinyin last ("ㄗ˙").
+    """
+    return [m[1:] + '˙' if m.startswith('˙') else m for m in TONED_SYLLABLE.findall(bopomofo) if strip_tones(m)]
+
+def mapping_hash(mapping_file=MAPPING_FILE):
+    with open(mapping_file, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()[:10]
+
+def load_phrases(mapping_file=MAPPING_FILE):
+    """{word: [readings per listing]} for Moedict's multi-character words.
+
+    A word listed with several readings (e.g. 長處 in two senses) has one
+    list of syllables per listing.
+    """
+    with open(mapping_file, 'r', encoding='utf-8') as f:
+        mapping = json.load(f)
+    phrases = {}
+    for key in mapping:
+        # Key format is "Word.Bopu" e.g. "一下.ㄧ　ㄒㄧㄚˋ"
+        word, _, bopomofo = key.partition('.')
+        if len(word) < 2:
+            continue
+        syllables = split_syllables(bopomofo)
+        if len(syllables) != len(word):
+            continue # unparseable (erhua, punctuation)
+        phrases.setdefault(word, []).append(syllables)
+    return phrases
+
+def read_phrases(text, phrases, max_len=MAX_PHRASE):
+    """Reading of each char of text, by longest Moedict word first from the left.
+
+    A char gets None where no multi-character word covers it, or where the
+    word's listings disagree on it: its reading in this context is unknown.
+    """
+    readings = [None] * len(text)
+    i = 0
+    while i < len(text):
+        for length in range(min(max_len, len(text) - i), 1, -1):
+            listings = phrases.get(text[i:i + length])
+            if listings:
+                for j, options in enumerate(zip(*listings)):
+                    if len(set(options)) == 1:
+                        readings[i + j] = options[0]
+                i += length
+                break
+        else:
+            i += 1
+    return readings
+
+def phrase_reading_counts(phrases):
+    """{char: {reading: n}} over every listing of Moedict's multi-character words."""
+    counts = {}
+    for word, listings in phrases.items():
+        for syllables in listings:
+            for char, reading in zip(word, syllables):
+                char_counts = counts.setdefault(char, {})
+                char_counts[reading] = char_counts.get(reading, 0) + 1
+    return counts
+
+def prior_distribution(readings, phrase_counts):
+    """{reading: share}: PRIMARY_PRIOR to the first reading, the rest by phrase counts."""
+    total = sum(phrase_counts.get(r, 0) for r in readings)
+    if not total:
+        return {readings[0]: 1.0}
+    shares = {r: (1 - PRIMARY_PRIOR) * phrase_counts.get(r, 0) / total for r in readings}
+    shares[readings[0]] += PRIMARY_PRIOR
+    return {r: share for r, share in shares.items() if share > 0}
+
+class ReadingCache:
+    def __init__(self, path=CACHE_FILE, learned_path=LEARNED_FILE, mapping_file=MAPPING_FILE):
+        self.path = path
+        self.learned_path = learned_path
+        self.mapping_file = mapping_file
+        self.version = converter_version()
+        self.readings = {}
+        self.heteronyms = {}
+        self.phrase_key = None
+        self.phrase_counts = {}
+        self.learned = {}
+        self.dirty = False
+        self.learned_dirty = False
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                # Without pypinyin we can't check the version, but can still use the cache
+                if self.version is None or data.get('version') == self.version:
+                    self.version = data.get('version')
+                    self.readings = data.get('readings', {})
+                    self.heteronyms = data.get('heteronyms', {})
+                    self.phrase_key = data.get('phrase_key')
+                    self.phrase_counts = data.get('phrase_counts', {})
+            except (OSError, ValueError):
+                pass
+        if os.path.exists(learned_path):
+            with open(learned_path, 'r', encoding='utf-8') as f:
+                self.learned = json.load(f)
+
+    def _mark_converted(self):
+        self.version = converter_version()
+        self.dirty = True
+
+    def lookup(self, chars):
+        """Return {char: reading}, converting only chars not already cached."""
+        missing = [c for c in dict.fromkeys(chars) if c not in self.readings]
+        if missing:
+            for char, reading in zip(missing, convert(missing)):
+                self.readings[char] = reading
+            self._mark_converted()
+        return {c: self.readings[c] for c in chars}
+
+    def lookup_heteronyms(self, chars):
+        """Return {char: [readings]}, converting only chars not already cached."""
+        missing = [c for c in dict.fromkeys(chars) if c not in self.heteronyms]
+        if missing:
+            for char, readings in zip(missing, convert_heteronyms(missing)):
+                self.heteronyms[char] = [r for r in readings if r != char]
+            self._mark_converted()
+        return {c: self.heteronyms[c] for c in chars}
+
+    def reading_counts(self):
+        """phrase_reading_counts of the Moedict map, cached by its content hash."""
+        key = f"{mapping_hash(self.mapping_file)}-{converter_version() or self.version}"
+        if key != self.phrase_key:
+            self.phrase_counts = phrase_reading_counts(load_phrases(self.mapping_file))
+            self.phrase_key = key
+            self.dirty = True
+        return self.phrase_counts
+
+    def polyphones(self, chars):
+        return {c for c, readings in self.lookup_heteronyms(chars).items() if len(readings) > 1}
+
+    def learn(self, reading_counts):
+        """Store per-reading counts of polyphones seen in context ({(char, reading): n})."""
+        learned = {}
+        for (char, reading), n in reading_counts.items():
+            learned.setdefault(char, {})
+            learned[char][reading] = learned[char].get(reading, 0) + n
+        if learned:
+            self.learned.update(learned) # the latest corpus replaces older counts
+            self.learned_dirty = True
+
+    def distributions(self, chars):
+        """{char: {reading: share}} for the polyphones among chars.
+
+        Learned corpus counts are used when there are any (smoothed towards
+        the prior), otherwise the phrase-dictionary prior alone.
+        """
+        polyphones = self.polyphones(chars)
+        phrase_counts = self.reading_counts() if polyphones else {}
+
+        results = {}
+        for char in sorted(polyphones):
+            prior = prior_distribution(self.heteronyms[char], phrase_counts.get(char, {}))
+            counts = self.learned.get(char, {})
+            total = sum(counts.values()) + PRIOR_STRENGTH
+            readings = set(prior) | set(counts)
+            results[char] = {r: (counts.get(r, 0) + PRIOR_STRENGTH * prior.get(r, 0)) / total for r in readings}
+        return results
+
+    def save(self):
+        if self.learned_dirty:
+            with open(self.learned_path, 'w', encoding='utf-8') as f:
+                json.dump(dict(sorted(self.learned.items())), f, ensure_ascii=False, indent=1, sort_keys=True)
+            self.learned_dirty = False
+        if not self.dirty:
+            return
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        data = {
+            'version': self.version,
+            'readings': self.readings,
+            'heteronyms': self.heteronyms,
+            'phrase_key': self.phrase_key,
+            'phrase_counts': self.phrase_counts,
+        }
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp, self.path)
+        self.dirty = False
@@ -6,6 +6,7 @@ import { VirtualKeyboard } from './components/VirtualKeyboard';
 import { Stats } from './components/Stats';
 import { ZHUYIN_KEYMAP } from './data/keymap';
 import { generateWeightedLesson } from './utils/LessonGenerator';
+import { saveSession, exportSessions } from './utils/SessionLog';
 
 // Fallback lesson if json not loaded yet
 const DEFAULT_LESSON = {
@@ -46,6 +47,8 @@ function App() {
     currentSyllableIndex,
     currentCharIndex,
     errors,
+    keystrokeLog,
+    startTime,
     wpm,
     accuracy,
     completed,
@@ -54,7 +57,13 @@ function App() {
     lastEvent
   } = useTypingEngine(currentLesson.content);
 
-  const { playKeySound, playSyllableSound } = useAudioFeedback();
+  // Upcoming syllables are decoded ahead of the cursor, so playback doesn't wait on the network
+  const { playKeySound, playSyllableSound } = useAudioFeedback(syllables, currentSyllableIndex);
+
+  // Keep finished lessons for the adaptive lesson model (exported on demand)
+  useEffect(() => {
+    if (completed && startTime) saveSession(syllables, keystrokeLog, startTime);
+  }, [completed, syllables, keystrokeLog, startTime]);
 
   // Handle Audio Logic based on Engine State
   useEffect(() => {
@@ -175,6 +184,14 @@ function App() {
             >
               🎲 New Random
             </button>
+
+            <button
+              onClick={exportSessions}
+              title="Download session logs for scripts/adaptive_lessons.py"
+              className="px-4 py-2 bg-gray-700 hover:bg-gray-600 text-white font-bold rounded shadow transition-all whitespace-nowrap w-full sm:w-auto"
+            >
+              📤 Export Sessions
+            </button>
           </div>
 
           {/* Right: Stats (Inline) */}
@@ -1,16 +1,129 @@
-import { useCallback } from 'react';
+import { useCallback, useEffect } from 'react';
+import { AudioSpritePlayer } from '../utils/AudioSprites';
+import { AudioBufferCache, DEFAULT_MAX_BYTES } from '../utils/AudioBufferCache';
+import audioManifest from '../data/audio_manifest.json';
 
-export const useAudioFeedback = () => {
-    // Get the base URL from Vite (handles the /zhuyin-tutor/ prefix on GitHub Pages)
-    const baseUrl = import.meta.env.BASE_URL;
+// Size-optimized copy made by scripts/transcode_audio.py (gain already baked in)
+interface AudioVariant {
+    file: string;
+    bytes: number;
+    hash: string;
+}
 
-    // Helper to ensure path is correct regardless of leading slash in base
-    const getPath = (path: string) => {
-        // Remove leading slash from path if base already ends with one
-        const cleanBase = baseUrl.endsWith('/') ? baseUrl.slice(0, -1) : baseUrl;
-        const cleanPath = path.startsWith('/') ? path : `/${path}`;
-        return `${cleanBase}${cleanPath}`;
-    };
+// Generated by scripts/build_audio_manifest.py: the file that actually exists
+// for each sound, so we never request a missing MP3 first.
+interface AudioAsset {
+    file: string;
+    format: string;
+    duration: number | null;
+    bytes: number;
+    hash: string;
+    gain?: number; // loudness-normalizing playback gain in dB (scripts/normalize_audio.py)
+    variants?: { opus?: AudioVariant; mp3?: AudioVariant };
+}
+
+const AUDIO_MANIFEST = audioManifest as {
+    keys: Record<string, AudioAsset>;
+    syllables: Record<string, AudioAsset>;
+};
+
+// Get the base URL from Vite (handles the /zhuyin-tutor/ prefix on GitHub Pages)
+const baseUrl = import.meta.env.BASE_URL;
+
+// Helper to ensure path is correct regardless of leading slash in base
+const getPath = (path: string) => {
+    // Remove leading slash from path if base already ends with one
+    const cleanBase = baseUrl.endsWith('/') ? baseUrl.slice(0, -1) : baseUrl;
+    const cleanPath = path.startsWith('/') ? path : `/${path}`;
+    return `${cleanBase}${cleanPath}`;
+};
+
+// Content hash in the query string: a changed file gets a new URL,
+// so the browser can keep unchanged ones cached indefinitely
+const getAssetPath = (asset: AudioAsset | AudioVariant) => getPath(`audio/${asset.file}?v=${asset.hash}`);
+
+// Opus where the browser decodes it, the MP3 fallback otherwise
+const canPlayOpus = typeof Audio !== 'undefined' && new Audio().canPlayType('audio/ogg; codecs=opus') !== '';
+
+// Fallback where Web Audio is missing or a file won't decode. An <audio>
+// element can only attenuate, so positive gains are capped at unity here.
+const playElement = (url: string, gainDb = 0) => {
+    const audio = new Audio(url);
+    if (gainDb) audio.volume = Math.min(1, Math.pow(10, gainDb / 20));
+    return audio.play();
+};
+
+// Shared across hook instances so the packs are fetched and decoded once
+const spritePlayer = new AudioSpritePlayer(getPath);
+
+// Decoded per-file sounds, for whatever the sprites don't cover
+const bufferCache = new AudioBufferCache();
+
+// Syllables ahead of the cursor to have decoded before they are reached
+export const PREFETCH_AHEAD = 8;
+
+// Smallest playable file for an asset: fewer bytes before the first play on
+// slow networks. Files that already failed to load or decode are passed over.
+const pickFile = (asset: AudioAsset): AudioAsset | AudioVariant => {
+    const candidates = [canPlayOpus && asset.variants?.opus, asset.variants?.mp3, asset];
+    return candidates.find((file): file is AudioAsset | AudioVariant =>
+        !!file && !bufferCache.hasFailed(getAssetPath(file))) ?? asset;
+};
+
+// Plays a URL from the decoded-buffer cache; resolves false if it can't be
+// loaded there, so the caller can fall back
+const playCached = (url: string, gainDb = 0) =>
+    bufferCache.available ? bufferCache.play(url, gainDb) : Promise.resolve(false);
+
+// Plays a manifest asset at its normalized loudness (sprites and transcoded
+// variants have the gain baked in already)
+const playAsset = async (asset: AudioAsset) => {
+    const file = pickFile(asset);
+    const gain = 'gain' in file ? file.gain ?? 0 : 0;
+    // Known failures skip the cache (no request per keypress) and go to <audio>
+    if (await playCached(getAssetPath(file), gain)) return;
+    await playElement(getAssetPath(asset), asset.gain);
+};
+
+export interface AudioFeedbackOptions {
+    prefetchAhead?: number;
+    maxCacheBytes?: number; // memory ceiling for decoded buffers
+}
+
+// syllables/cursor: the current lesson and position in it (TypingState),
+// whose upcoming syllables are fetched and decoded ahead of time
+export const useAudioFeedback = (
+    syllables: string[] = [],
+    cursor = 0,
+    { prefetchAhead = PREFETCH_AHEAD, maxCacheBytes = DEFAULT_MAX_BYTES }: AudioFeedbackOptions = {}
+) => {
+    useEffect(() => {
+        spritePlayer.load();
+    }, []);
+
+    useEffect(() => {
+        bufferCache.maxBytes = maxCacheBytes;
+    }, [maxCacheBytes]);
+
+    useEffect(() => {
+        const upcoming = syllables.slice(cursor, cursor + prefetchAhead);
+        // Superseded by the next cursor position: don't start, or stop before the next URL
+        let cancelled = false;
+        // Sprites (if they load) already hold every clip decoded
+        spritePlayer.load().then(() => {
+            if (cancelled || !bufferCache.available) return;
+            const urls = upcoming
+                .filter(syllable => !spritePlayer.has('syllables', syllable))
+                .map(syllable => AUDIO_MANIFEST.syllables[syllable])
+                .filter(asset => asset)
+                .map(asset => getAssetPath(pickFile(asset)));
+            if (urls.length) bufferCache.prefetch(urls);
+        });
+        return () => {
+            cancelled = true;
+            bufferCache.cancelPrefetch();
+        };
+    }, [syllables, cursor, prefetchAhead]);
 
     const playKeySound = useCallback((key: string) => {
         // Map special keys to filenames
@@ -21,33 +134,61 @@ export const useAudioFeedback = () => {
         if (key === ';') filename = 'semicolon';
         if (key === '-') filename = 'minus';
 
-        const audio = new Audio(getPath(`audio/${filename}.mp3`));
-        audio.play().catch(e => console.error("Error playing key audio:", e));
+        if (spritePlayer.play('keys', filename)) return;
+
+        const asset = AUDIO_MANIFEST.keys[filename];
+        const url = getPath(`audio/${filename}.mp3`);
+        const played = asset
+            ? playAsset(asset)
+            : playCached(url).then(ok => ok ? undefined : playElement(url));
+        played.catch(e => console.error("Error playing key audio:", e));
     }, []);
 
     const playSyllableSound = useCallback((syllable: string) => {
+        // Sprite packs first (already decoded, no request per keystroke)
+        if (spritePlayer.play('syllables', syllable)) return;
+
+        // Manifest knows which file exists, so no failed request per play
+        const asset = AUDIO_MANIFEST.syllables[syllable];
+        if (asset) {
+            playAsset(asset).catch(e => console.warn(`Error playing ${asset.file}:`, e));
+            return;
+        }
+
+        // Not in the manifest (e.g. added since it was generated):
         // Hybrid System: Try MP3 (Google TTS - High Quality) first
         // If not found (404), fallback to OGG (Moedict - Open Source)
         const mp3Path = getPath(`audio/syllables/${syllable}.mp3`);
         const oggPath = getPath(`audio/syllables_ogg/${syllable}.ogg`);
 
-        const audio = new Audio(mp3Path);
+        (async () => {
+            if (await playCached(mp3Path) || await playCached(oggPath)) return;
+            if (bufferCache.available) {
+                console.warn(`Both MP3 and OGG failed for ${syllable}`);
+                return;
+            }
 
-        audio.onerror = () => {
-            // MP3 failed (likely missing), try OGG
-            console.log(`MP3 missing for ${syllable}, falling back to OGG`);
-            const fallbackAudio = new Audio(oggPath);
-            fallbackAudio.play().catch(e => console.warn(`Both MP3 and OGG failed for ${syllable}`));
-        };
+            const audio = new Audio(mp3Path);
 
-        audio.play().catch(e => {
-            // This catch handles playback errors (e.g. autoplay), not loading errors (404)
-            // But sometimes 404 triggers this too depending on browser
-            console.log(`MP3 playback error for ${syllable}, trying OGG`);
-            const fallbackAudio = new Audio(oggPath);
-            fallbackAudio.play();
-        });
+            audio.onerror = () => {
+                // MP3 failed (likely missing), try OGG
+                console.log(`MP3 missing for ${syllable}, falling back to OGG`);
+                const fallbackAudio = new Audio(oggPath);
+                fallbackAudio.play().catch(e => console.warn(`Both MP3 and OGG failed for ${syllable}`));
+            };
+
+            audio.play().catch(e => {
+                // This catch handles playback errors (e.g. autoplay), not loading errors (404)
+                // But sometimes 404 triggers this too depending on browser
+                console.log(`MP3 playback error for ${syllable}, trying OGG`);
+                const fallbackAudio = new Audio(oggPath);
+                fallbackAudio.play();
+            });
+        })();
     }, []);
 
-    return { playKeySound, playSyllableSound };
+    // Hit/miss counters and memory use of the decoded-buffer cache
+    const getCacheStats = useCallback(() => bufferCache.stats(), []);
+
+    return { playKeySound, playSyllableSound, getCacheStats };
 };
@@ -1,12 +1,21 @@
-import { useState, useCallback, useEffect } from 'react';
+import { useState, useCallback, useEffect, useRef } from 'react';
 import { ZHUYIN_KEYMAP } from '../data/keymap';
+import { KeystrokeRing } from '../utils/KeystrokeRing';
+
+export interface TypingError {
+    syllableIndex: number;
+    charIndex: number;
+}
 
 export interface TypingState {
     syllables: string[];
     currentSyllableIndex: number;
     currentCharIndex: number;
-    errors: { syllableIndex: number; charIndex: number }[];
-    startTime: number | null;
+    // Running counters, so stats are O(1) per keystroke
+    correctChars: number;
+    errorCount: number;
+    startTime: number | null;  // epoch ms, identifies the session
+    startClock: number | null; // performance.now() at the first keystroke
     wpm: number;
     accuracy: number;
     completed: boolean;
@@ -14,125 +23,125 @@ export interface TypingState {
     lastEvent: 'none' | 'char-correct' | 'syllable-complete' | 'error';
 }
 
+const initialState = (syllables: string[]): TypingState => ({
+    syllables,
+    currentSyllableIndex: 0,
+    currentCharIndex: 0,
+    correctChars: 0,
+    errorCount: 0,
+    startTime: null,
+    startClock: null,
+    wpm: 0,
+    accuracy: 100,
+    completed: false,
+    lastEvent: 'none'
+});
+
+const calculateStats = (currState: TypingState, now: number) => {
+    if (currState.startClock === null) return { wpm: 0, accuracy: 100 };
+
+    const timeElapsedMin = (now - currState.startClock) / 60000;
+
+    const wpm = Math.round((currState.correctChars / 5) / timeElapsedMin) || 0;
+    const totalTyped = currState.correctChars + currState.errorCount;
+    const accuracy = totalTyped > 0
+        ? Math.round((currState.correctChars / totalTyped) * 100)
+        : 100;
+
+    return { wpm, accuracy };
+};
+
 export const useTypingEngine = (lessonContent: string[]) => {
-    const [state, setState] = useState<TypingState>({
-        syllables: lessonContent,
-        currentSyllableIndex: 0,
-        currentCharIndex: 0,
-        errors: [],
-        startTime: null,
-        wpm: 0,
-        accuracy: 100,
-        completed: false,
-        lastEvent: 'none'
-    });
+    const [state, setState] = useState<TypingState>(() => initialState(lessonContent));
+
+    // The handler reads and writes this ref rather than using a setState
+    // updater, so the keystroke log is written exactly once per keypress
+    // (StrictMode runs updaters twice)
+    const stateRef = useRef(state);
+    // Lazy init: the ring's typed arrays are allocated once, not on every render
+    const [keystrokeLog] = useState(() => new KeystrokeRing());
+    // Error positions are appended in place (O(1) per wrong keystroke, not a
+    // copy of the list); every append also bumps errorCount, which re-renders
+    const [errors] = useState<TypingError[]>(() => []);
+
+    const reset = useCallback(() => {
+        stateRef.current = initialState(lessonContent);
+        keystrokeLog.clear();
+        errors.length = 0;
+        setState(stateRef.current);
+    }, [lessonContent, keystrokeLog, errors]);
 
     useEffect(() => {
-        setState({
-            syllables: lessonContent,
-            currentSyllableIndex: 0,
-            currentCharIndex: 0,
-            errors: [],
-            startTime: null,
-            wpm: 0,
-            accuracy: 100,
-            completed: false,
-            lastEvent: 'none'
-        });
-    }, [lessonContent]);
-
-    const calculateStats = useCallback((currState: TypingState) => {
-        if (!currState.startTime) return { wpm: 0, accuracy: 100 };
-
-        const timeElapsedMin = (Date.now() - currState.startTime) / 60000;
-
-        // Calculate total chars typed correctly
-        let correctChars = 0;
-        for (let i = 0; i < currState.currentSyllableIndex; i++) {
-            correctChars += currState.syllables[i].length;
-        }
-        correctChars += currState.currentCharIndex;
-
-        const wpm = Math.round((correctChars / 5) / timeElapsedMin) || 0;
-        const totalTyped = correctChars + currState.errors.length;
-        const accuracy = totalTyped > 0
-            ? Math.round(((totalTyped - currState.errors.length) / totalTyped) * 100)
-            : 100;
-
-        return { wpm, accuracy };
-    }, []);
+        reset();
+    }, [reset]);
 
     const handleKeyPress = useCallback((key: string) => {
-        if (state.completed) return { event: 'none', currentSyllable: '' };
+        const prev = stateRef.current;
+        if (prev.completed) return { event: 'none', justCompletedSyllable: '' };
 
+        const now = performance.now();
         let event: TypingState['lastEvent'] = 'none';
         let justCompletedSyllable = '';
+        const newState = { ...prev };
 
-        setState(prev => {
-            let newState = { ...prev };
+        if (newState.startClock === null) {
+            newState.startTime = Date.now();
+            newState.startClock = now;
+        }
 
-            if (!newState.startTime) {
-                newState.startTime = Date.now();
-            }
+        const currentSyllable = newState.syllables[newState.currentSyllableIndex];
+        const targetChar = currentSyllable[newState.currentCharIndex];
 
-            const currentSyllable = newState.syllables[newState.currentSyllableIndex];
-            const targetChar = currentSyllable[newState.currentCharIndex];
+        const mappedChar = ZHUYIN_KEYMAP[key];
+        const isCorrect = mappedChar === targetChar;
 
-            const mappedChar = ZHUYIN_KEYMAP[key];
-            const isCorrect = mappedChar === targetChar;
+        keystrokeLog.push(newState.currentSyllableIndex, newState.currentCharIndex, key, isCorrect, now);
 
-            if (isCorrect) {
-                newState.currentCharIndex += 1;
-                event = 'char-correct';
+        if (isCorrect) {
+            newState.currentCharIndex += 1;
+            newState.correctChars += 1;
+            event = 'char-correct';
 
-                // Check if syllable complete
-                if (newState.currentCharIndex >= currentSyllable.length) {
-                    justCompletedSyllable = currentSyllable;
-                    newState.currentSyllableIndex += 1;
-                    newState.currentCharIndex = 0;
-                    event = 'syllable-complete';
+            // Check if syllable complete
+            if (newState.currentCharIndex >= currentSyllable.length) {
+                justCompletedSyllable = currentSyllable;
+                newState.currentSyllableIndex += 1;
+                newState.currentCharIndex = 0;
+                event = 'syllable-complete';
 
-                    if (newState.currentSyllableIndex >= newState.syllables.length) {
-                        newState.completed = true;
-                    }
-                }
-            } else {
-                // Record error if not already recorded for this specific position
-                const errorExists = newState.errors.some(e =>
-                    e.syllableIndex === newState.currentSyllableIndex &&
-                    e.charIndex === newState.currentCharIndex
-                );
-                if (!errorExists) {
-                    newState.errors = [...newState.errors, {
-                        syllableIndex: newState.currentSyllableIndex,
-                        charIndex: newState.currentCharIndex
-                    }];
+                if (newState.currentSyllableIndex >= newState.syllables.length) {
+                    newState.completed = true;
                 }
-                event = 'error';
             }
+        } else {
+            // Record error if not already recorded for this specific position.
+            // The position only moves forward, so only the last error can match.
+            const lastError = errors[errors.length - 1];
+            const errorExists = lastError !== undefined &&
+                lastError.syllableIndex === newState.currentSyllableIndex &&
+                lastError.charIndex === newState.currentCharIndex;
+            if (!errorExists) {
+                errors.push({
+                    syllableIndex: newState.currentSyllableIndex,
+                    charIndex: newState.currentCharIndex
+                });
+                newState.errorCount += 1;
+            }
+            event = 'error';
+        }
 
-            const stats = calculateStats(newState);
-            return { ...newState, ...stats, lastEvent: event };
-        });
+        const next = { ...newState, ...calculateStats(newState, now), lastEvent: event };
+        stateRef.current = next;
+        setState(next);
 
         return { event, justCompletedSyllable };
-    }, [state.completed, calculateStats]);
+    }, [keystrokeLog, errors]);
 
     return {
         ...state,
+        errors,
+        keystrokeLog,
         handleKeyPress,
-        restart: () => {
-            setState({
-                syllables: lessonContent,
-                currentSyllableIndex: 0,
-                currentCharIndex: 0,
-                errors: [],
-                startTime: null,
-                wpm: 0,
-                accuracy: 100,
-                completed: false,
-                lastEvent: 'none'
-            });
-        }
+        restart: reset
     };
 };
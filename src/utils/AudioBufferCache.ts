@@ -0,0 +1,169 @@
+// Decoded per-file audio for Web Audio playback: each URL is fetched and
+// decoded once, then played from memory as an AudioBufferSourceNode (no
+// <audio> element, HTTP cache lookup or re-decode per keystroke). Buffers are
+// kept in least-recently-played order and evicted past a memory ceiling.
+
+import { getAudioContext, getDecodeContext, hasWebAudio, resumeAudioContext } from './SharedAudioContext';
+
+export const DEFAULT_MAX_BYTES = 16 * 1024 * 1024; // ~130 one-second clips at 32 kHz
+
+export interface AudioCacheStats {
+    hits: number;    // played straight from a decoded buffer
+    misses: number;  // had to fetch/decode (or wait for a prefetch) first
+    evictions: number;
+    entries: number;
+    bytes: number;
+    maxBytes: number;
+}
+
+// Decoded PCM is float32 per channel, whatever the file's codec
+const bufferBytes = (buffer: AudioBuffer) => buffer.length * buffer.numberOfChannels * 4;
+
+export class AudioBufferCache {
+    // Map iteration order is insertion order: re-inserting on use keeps the LRU entry first
+    private buffers = new Map<string, AudioBuffer>();
+    private loading = new Map<string, Promise<AudioBuffer | null>>();
+    // URLs the server refused or the browser couldn't decode (e.g. Opus where
+    // canPlayType says yes but decodeAudioData rejects it): never retried
+    private failed = new Set<string>();
+    private bytes = 0;
+    private hits = 0;
+    private misses = 0;
+    private evictions = 0;
+    private prefetchGeneration = 0;
+
+    constructor(public maxBytes: number = DEFAULT_MAX_BYTES) { }
+
+    // False where Web Audio is missing, so callers can fall back to <audio>.
+    // Doesn't create the shared context; the first play does.
+    get available(): boolean {
+        return hasWebAudio();
+    }
+
+    has(url: string): boolean {
+        return this.buffers.has(url);
+    }
+
+    // Whether a URL already failed to load, so callers can go straight to a fallback
+    hasFailed(url: string): boolean {
+        return this.failed.has(url);
+    }
+
+    // Fetch and decode a URL once; concurrent calls share the request.
+    // Resolves null if it can't be fetched or decoded. An HTTP error or a
+    // failed decode is remembered; a network error is not (it may pass).
+    load(url: string): Promise<AudioBuffer | null> {
+        const cached = this.buffers.get(url);
+        if (cached) return Promise.resolve(cached);
+        if (this.failed.has(url)) return Promise.resolve(null);
+        const pending = this.loading.get(url);
+        if (pending) return pending;
+
+        const context = getDecodeContext();
+        if (!context) return Promise.resolve(null);
+
+        const request = (async () => {
+            try {
+                const response = await fetch(url);
+                if (!response.ok) {
+                    this.failed.add(url);
+                    return null;
+                }
+                const data = await response.arrayBuffer();
+                try {
+                    const buffer = await context.decodeAudioData(data);
+                    this.store(url, buffer);
+                    return buffer;
+                } catch (e) {
+                    console.warn(`Could not decode ${url}`, e);
+                    this.failed.add(url);
+                    return null;
+                }
+            } catch (e) {
+                console.warn(`Could not fetch ${url}`, e);
+                return null;
+            } finally {
+                this.loading.delete(url);
+            }
+        })();
+        this.loading.set(url, request);
+        return request;
+    }
+
+    // Load URLs in order, one at a time, so the nearest ones are ready first
+    // and prefetching never competes with itself for a slow connection.
+    // A newer prefetch supersedes this one: it stops before its next URL.
+    async prefetch(urls: string[]): Promise<void> {
+        const generation = ++this.prefetchGeneration;
+        for (const url of urls) {
+            if (generation !== this.prefetchGeneration) return;
+            if (!this.buffers.has(url)) await this.load(url);
+        }
+    }
+
+    // Stop the running prefetch before its next URL (one already loading finishes)
+    cancelPrefetch() {
+        this.prefetchGeneration++;
+    }
+
+    // Play a URL at gainDb (Web Audio can amplify, unlike <audio>.volume).
+    // Resolves false if it couldn't be loaded.
+    async play(url: string, gainDb = 0): Promise<boolean> {
+        if (this.failed.has(url)) return false;
+        const context = getAudioContext();
+        if (!context) return false;
+
+        let buffer = this.buffers.get(url);
+        if (buffer) {
+            this.hits++;
+            this.touch(url, buffer);
+        } else {
+            this.misses++;
+            buffer = await this.load(url) ?? undefined;
+            if (!buffer) return false;
+        }
+
+        resumeAudioContext(context);
+
+        const source = context.createBufferSource();
+        source.buffer = buffer;
+        if (gainDb) {
+            const gain = context.createGain();
+            gain.gain.value = Math.pow(10, gainDb / 20);
+            source.connect(gain).connect(context.destination);
+        } else {
+            source.connect(context.destination);
+        }
+        source.start();
+        return true;
+    }
+
+    stats(): AudioCacheStats {
+        return {
+            hits: this.hits,
+            misses: this.misses,
+            evictions: this.evictions,
+            entries: this.buffers.size,
+            bytes: this.bytes,
+            maxBytes: this.maxBytes,
+        };
+    }
+
+    private touch(url: string, buffer: AudioBuffer) {
+        this.buffers.delete(url);
+        this.buffers.set(url, buffer);
+    }
+
+    private store(url: string, buffer: AudioBuffer) {
+        if (this.buffers.has(url)) return;
+        this.buffers.set(url, buffer);
+        this.bytes += bufferBytes(buffer);
+        // Evict least recently played, but never the buffer just added
+        for (const [oldUrl, oldBuffer] of this.buffers) {
+            if (this.bytes <= this.maxBytes || oldUrl === url) break;
+            this.buffers.delete(oldUrl);
+            this.bytes -= bufferBytes(oldBuffer);
+            this.evictions++;
+        }
+    }
+}
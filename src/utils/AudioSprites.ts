@@ -0,0 +1,85 @@
+// Plays key and syllable sounds as slices of pre-decoded sprite packs
+// (built by scripts/build_audio_sprites.py). One fetch + decode at startup,
+// then every keystroke is just an AudioBufferSourceNode over memory.
+
+import { getAudioContext, getDecodeContext, hasWebAudio, resumeAudioContext } from './SharedAudioContext';
+
+export type SpriteKind = 'keys' | 'syllables';
+
+interface SpriteEntry {
+    pack: number;
+    offset: number;
+    duration: number;
+}
+
+interface SpriteManifest {
+    rate: number;
+    packs: string[];
+    keys: Record<string, SpriteEntry>;
+    syllables: Record<string, SpriteEntry>;
+}
+
+export class AudioSpritePlayer {
+    private manifest: SpriteManifest | null = null;
+    private buffers: (AudioBuffer | null)[] = [];
+    private loading: Promise<boolean> | null = null;
+
+    constructor(private resolveUrl: (path: string) => string) { }
+
+    // Fetch the manifest and decode all packs. Resolves false if sprites
+    // aren't available (e.g. not built), so callers can fall back.
+    load(): Promise<boolean> {
+        if (this.loading) return this.loading;
+
+        this.loading = (async () => {
+            if (!hasWebAudio()) return false;
+
+            try {
+                const response = await fetch(this.resolveUrl('audio/sprites/manifest.json'));
+                if (!response.ok) return false;
+                const manifest: SpriteManifest = await response.json();
+
+                const context = getDecodeContext();
+                if (!context) return false;
+                const buffers = await Promise.all(manifest.packs.map(async (file) => {
+                    const packResponse = await fetch(this.resolveUrl(`audio/sprites/${file}`));
+                    if (!packResponse.ok) return null;
+                    return context.decodeAudioData(await packResponse.arrayBuffer());
+                }));
+
+                this.manifest = manifest;
+                this.buffers = buffers;
+                return true;
+            } catch (e) {
+                console.warn('Audio sprites unavailable, using per-file audio', e);
+                return false;
+            }
+        })();
+
+        return this.loading;
+    }
+
+    // Whether play() would succeed right now
+    has(kind: SpriteKind, name: string): boolean {
+        const entry = this.manifest?.[kind][name];
+        return !!(entry && this.buffers[entry.pack]);
+    }
+
+    // Play a sprite slice. Returns false if it isn't loaded or doesn't exist.
+    play(kind: SpriteKind, name: string): boolean {
+        const entry = this.manifest?.[kind][name];
+        if (!entry) return false;
+
+        const buffer = this.buffers[entry.pack];
+        const context = buffer && getAudioContext();
+        if (!context) return false;
+
+        resumeAudioContext(context);
+
+        const source = context.createBufferSource();
+        source.buffer = buffer;
+        source.connect(context.destination);
+        source.start(0, entry.offset, entry.duration);
+        return true;
+    }
+}
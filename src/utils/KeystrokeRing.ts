@@ -0,0 +1,70 @@
+// Fixed-size ring buffer of keystroke timings: typed arrays allocated once,
+// so recording a keypress is O(1) and allocation-free however long the
+// lesson. When full, the oldest entries are overwritten (and counted).
+
+export type Keystroke = [number, number, string, number, number];
+
+export class KeystrokeRing {
+    readonly capacity: number;
+    private times: Float64Array;     // ms since the first keystroke (performance.now)
+    private syllables: Uint16Array;
+    private chars: Uint8Array;
+    private keys: Uint16Array;       // UTF-16 code of the key
+    private ok: Uint8Array;
+    private next = 0;
+    private size = 0;
+    private origin = 0;
+    dropped = 0;
+
+    constructor(capacity: number = 4096) {
+        this.capacity = capacity;
+        this.times = new Float64Array(capacity);
+        this.syllables = new Uint16Array(capacity);
+        this.chars = new Uint8Array(capacity);
+        this.keys = new Uint16Array(capacity);
+        this.ok = new Uint8Array(capacity);
+    }
+
+    get length(): number {
+        return this.size;
+    }
+
+    clear() {
+        this.next = 0;
+        this.size = 0;
+        this.dropped = 0;
+    }
+
+    push(syllableIndex: number, charIndex: number, key: string, ok: boolean, now: number = performance.now()) {
+        if (this.size === 0 && this.dropped === 0) {
+            this.origin = now;
+        }
+        const i = this.next;
+        this.times[i] = now - this.origin;
+        this.syllables[i] = syllableIndex;
+        this.chars[i] = charIndex;
+        this.keys[i] = key.charCodeAt(0);
+        this.ok[i] = ok ? 1 : 0;
+
+        this.next = (i + 1) % this.capacity;
+        if (this.size < this.capacity) this.size++;
+        else this.dropped++;
+    }
+
+    // Oldest first, as [syllableIndex, charIndex, key, ok, ms since start]
+    toKeystrokes(): Keystroke[] {
+        const result: Keystroke[] = [];
+        const start = (this.next - this.size + this.capacity) % this.capacity;
+        for (let n = 0; n < this.size; n++) {
+            const i = (start + n) % this.capacity;
+            result.push([
+                this.syllables[i],
+                this.chars[i],
+                String.fromCharCode(this.keys[i]),
+                this.ok[i],
+                Math.round(this.times[i] * 10) / 10
+            ]);
+        }
+        return result;
+    }
+}
@@ -0,0 +1,46 @@
+import type { Keystroke, KeystrokeRing } from './KeystrokeRing';
+
+// Completed lessons are kept in localStorage as session logs and can be
+// exported as JSON for scripts/adaptive_lessons.py, which learns the weak
+// keys from them.
+
+export interface SessionLog {
+    id: string;
+    started: number; // epoch ms
+    syllables: string[];
+    keystrokes: Keystroke[];
+    dropped?: number; // oldest keystrokes lost to the ring buffer
+}
+
+const STORAGE_KEY = 'zhuyin-sessions';
+const MAX_SESSIONS = 500; // oldest are dropped; export regularly
+
+export const loadSessions = (): SessionLog[] => {
+    try {
+        return JSON.parse(localStorage.getItem(STORAGE_KEY) || '[]');
+    } catch {
+        return [];
+    }
+};
+
+export const saveSession = (syllables: string[], log: KeystrokeRing, started: number) => {
+    if (log.length === 0) return;
+    const sessions = loadSessions();
+    const id = `${started}-${Math.random().toString(36).slice(2, 8)}`;
+    sessions.push({ id, started, syllables, keystrokes: log.toKeystrokes(), dropped: log.dropped });
+    try {
+        localStorage.setItem(STORAGE_KEY, JSON.stringify(sessions.slice(-MAX_SESSIONS)));
+    } catch {
+        // Storage full or unavailable: the session just isn't kept
+    }
+};
+
+export const exportSessions = () => {
+    const blob = new Blob([JSON.stringify(loadSessions())], { type: 'application/json' });
+    const url = URL.createObjectURL(blob);
+    const link = document.createElement('a');
+    link.href = url;
+    link.download = `zhuyin-sessions-${new Date().toISOString().slice(0, 10)}.json`;
+    link.click();
+    URL.revokeObjectURL(url);
+};
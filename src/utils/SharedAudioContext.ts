@@ -0,0 +1,47 @@
+// The one AudioContext the sprite player and the decoded-buffer cache share:
+// each context holds its own output stream (and browsers cap how many may
+// exist). It is only created to play a sound, which follows a keystroke, so
+// the autoplay policy never leaves it suspended on mount. Decoding ahead of
+// that (sprite packs, prefetch) goes through an OfflineAudioContext, which
+// has no output; its AudioBuffers play in the live context all the same.
+
+type AudioContextCtor = typeof AudioContext;
+
+// Decode rate before the live context exists: the usual output rate, so
+// playback rarely has to resample
+const DECODE_RATE = 48000;
+
+let context: AudioContext | null = null;
+let decodeContext: BaseAudioContext | null = null;
+
+const audioContextCtor = (): AudioContextCtor | undefined =>
+    typeof window === 'undefined'
+        ? undefined
+        : window.AudioContext || (window as unknown as { webkitAudioContext?: AudioContextCtor }).webkitAudioContext;
+
+// Whether Web Audio exists at all, without creating a context
+export const hasWebAudio = (): boolean => audioContextCtor() !== undefined;
+
+// The live context, created on first call; call it only to play
+export const getAudioContext = (): AudioContext | null => {
+    if (context) return context;
+    const Ctor = audioContextCtor();
+    context = Ctor ? new Ctor() : null;
+    return context;
+};
+
+// A context to decode with: the live one once it exists, an offline one before
+export const getDecodeContext = (): BaseAudioContext | null => {
+    if (context) return context;
+    if (!decodeContext && typeof OfflineAudioContext !== 'undefined') {
+        decodeContext = new OfflineAudioContext(1, 1, DECODE_RATE);
+    }
+    return decodeContext ?? getAudioContext();
+};
+
+// A context created outside a user gesture may still start suspended
+export const resumeAudioContext = (audioContext: AudioContext) => {
+    if (audioContext.state === 'suspended') {
+        audioContext.resume();
+    }
+};
@@ -0,0 +1,58 @@
+import inventory from '../data/syllable_inventory.json';
+
+// Typed view over the syllable inventory generated by
+// scripts/build_syllable_inventory.py. Everything is indexed by syllable id,
+// the same ids the Python side uses.
+
+interface InventoryData {
+    version: number;
+    symbols: string;
+    keys: string;
+    tone1Key: string;
+    syllables: string[];
+    parts: number[];   // [initial, medial, final] per id, symbol index + 1 (0 = empty)
+    tones: number[];   // bit t-1 set when tone t is attested
+    weights: number[]; // lesson weight, 0 = never drawn
+    aliasTotal: number;
+    aliasThreshold: number[];
+    alias: number[];
+}
+
+const DATA = inventory as InventoryData;
+
+export const SYLLABLES: readonly string[] = DATA.syllables;
+export const PARTS = Uint8Array.from(DATA.parts);
+export const TONE_MASKS = Uint8Array.from(DATA.tones);
+export const WEIGHTS = Uint32Array.from(DATA.weights);
+
+// Alias table (scripts/alias_table.py): cell i keeps itself with probability
+// ALIAS_CUTOFF[i], otherwise it yields ALIAS[i]
+export const ALIAS = Uint16Array.from(DATA.alias);
+export const ALIAS_CUTOFF = Float64Array.from(DATA.aliasThreshold, t => t / DATA.aliasTotal);
+
+const SYLLABLE_IDS = new Map(SYLLABLES.map((s, i) => [s, i]));
+const SYMBOL_KEYS = new Map([...DATA.symbols].map((symbol, i) => [symbol, DATA.keys[i]]));
+const TONE_MARKS = DATA.symbols.slice(-4); // ˊˇˋ˙ = tones 2-5
+
+export const syllableId = (syllable: string): number => SYLLABLE_IDS.get(syllable) ?? -1;
+
+export const isValidSyllable = (syllable: string): boolean => SYLLABLE_IDS.has(syllable);
+
+export const hasTone = (id: number, tone: number): boolean => (TONE_MASKS[id] & (1 << (tone - 1))) !== 0;
+
+// [initial, medial, final], '' for an empty slot
+export const components = (id: number): [string, string, string] => {
+    const part = (slot: number) => {
+        const code = PARTS[id * 3 + slot];
+        return code ? DATA.symbols[code - 1] : '';
+    };
+    return [part(0), part(1), part(2)];
+};
+
+// Keys to type a syllable; with a tone, the tone key (space for tone 1) follows
+export const keystrokes = (syllable: string, tone?: number): string => {
+    let keys = '';
+    for (const symbol of syllable) keys += SYMBOL_KEYS.get(symbol) ?? '';
+    if (tone === undefined) return keys;
+    return keys + (tone === 1 ? DATA.tone1Key : SYMBOL_KEYS.get(TONE_MARKS[tone - 2]) ?? '');
+};